@@ -29,11 +29,32 @@ class Settings:
     QDRANT_URL = os.getenv("QDRANT_URL", "https://your-qdrant-endpoint")
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", "your-qdrant-api-key")
     COLLECTION_NAME = os.getenv("COLLECTION_NAME", "school_info")
+    COURSE_COLLECTION_NAME = os.getenv("COURSE_COLLECTION_NAME", "school_courses")
     QDRANT_TIMEOUT_SECONDS = float(os.getenv("QDRANT_TIMEOUT_SECONDS", 90))
     QDRANT_UPSERT_MAX_RETRIES = int(os.getenv("QDRANT_UPSERT_MAX_RETRIES", 6))
     QDRANT_UPSERT_BASE_DELAY_SECONDS = float(
         os.getenv("QDRANT_UPSERT_BASE_DELAY_SECONDS", 1.0)
     )
+    # Shared client transport (src/core/database.py): gRPC on QDRANT_GRPC_PORT when enabled,
+    # QDRANT_POOL_SIZE gRPC channels / HTTP connections, idle keepalive in seconds
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "0").strip().lower() in ("1", "true", "yes")
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+    QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", 8))
+    QDRANT_KEEPALIVE_SECONDS = float(os.getenv("QDRANT_KEEPALIVE_SECONDS", 30))
+    QDRANT_VERIFY_SSL = os.getenv("QDRANT_VERIFY_SSL", "1").strip().lower() not in ("0", "false", "no")
+
+    # Ingestion pipeline (worker processes, threads per stage, bounded queue size between stages)
+    INGEST_PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", 1))
+    INGEST_ENRICH_WORKERS = int(os.getenv("INGEST_ENRICH_WORKERS", 1))
+    INGEST_CHUNK_WORKERS = int(os.getenv("INGEST_CHUNK_WORKERS", 1))
+    INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", 2))
+    INGEST_UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", 2))
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 4))
+    INGEST_ENRICH_BATCH_DOCS = int(os.getenv("INGEST_ENRICH_BATCH_DOCS", 16))
+    # Rule extractor confidence at or above which LLM metadata enrichment is skipped
+    RULE_CONFIDENCE_THRESHOLD = float(os.getenv("RULE_CONFIDENCE_THRESHOLD", 0.7))
+    # --bulk-load: max wait for the rebuilt collection to finish indexing before the alias swap
+    BULK_LOAD_GREEN_TIMEOUT_SECONDS = float(os.getenv("BULK_LOAD_GREEN_TIMEOUT_SECONDS", 3600))
     
     # Email Configuration
     SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -55,6 +76,15 @@ class Settings:
     
     # Search Configuration
     CHUNK_SIZE = 900
+    # Chunker: token (token-budgeted children/parents with source offsets) or legacy (CHUNK_SIZE chars)
+    CHUNKER = os.getenv("CHUNKER", "token")
+    CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 500))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 64))
+    PARENT_MAX_TOKENS = int(os.getenv("PARENT_MAX_TOKENS", 2500))
+    # Point layout: full (embedded parents, full payload per point) or slim (see src/etl/layout.py)
+    COLLECTION_LAYOUT = os.getenv("COLLECTION_LAYOUT", "full")
+    # Storage / HNSW / quantization profile for new collections (src/etl/collection_profiles.py)
+    COLLECTION_PROFILE = os.getenv("COLLECTION_PROFILE", "balanced")
     BATCH_SIZE = 10
 
 
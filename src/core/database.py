@@ -1,38 +1,76 @@
-from qdrant_client import QdrantClient, models
+from typing import Any, Dict, Optional
+
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from src.core.config import settings
+from src.etl.collection_profiles import get_profile, record_profile
+from src.etl.payload_indexes import ensure_payload_indexes
+
+
+def _client_kwargs(timeout: Optional[float], cloud_inference: bool, prefer_grpc: Optional[bool]) -> Dict[str, Any]:
+    """Connection settings shared by every Qdrant client (ingestion, retrieval, maintenance)."""
+    grpc = settings.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+    pool = max(1, settings.QDRANT_POOL_SIZE)
+    keepalive = settings.QDRANT_KEEPALIVE_SECONDS
+    kwargs: Dict[str, Any] = {
+        "url": settings.QDRANT_URL,
+        "api_key": settings.QDRANT_API_KEY,
+        "timeout": int(timeout if timeout is not None else settings.QDRANT_TIMEOUT_SECONDS),
+        "cloud_inference": cloud_inference,
+    }
+    if grpc:
+        kwargs.update(
+            prefer_grpc=True,
+            grpc_port=settings.QDRANT_GRPC_PORT,
+            pool_size=pool,
+            grpc_options={
+                "grpc.keepalive_time_ms": int(keepalive * 1000),
+                "grpc.keepalive_timeout_ms": 10_000,
+                "grpc.keepalive_permit_without_calls": 1,
+                "grpc.http2.max_pings_without_data": 0,
+                "grpc.max_send_message_length": 64 * 1024 * 1024,
+                "grpc.max_receive_message_length": 64 * 1024 * 1024,
+            },
+        )
+    else:
+        kwargs["limits"] = httpx.Limits(
+            max_connections=pool,
+            max_keepalive_connections=pool,
+            keepalive_expiry=keepalive,
+        )
+    if not settings.QDRANT_VERIFY_SSL:
+        kwargs["verify"] = False
+    return kwargs
+
+
+def get_client(
+    timeout: Optional[float] = None,
+    cloud_inference: bool = False,
+    prefer_grpc: Optional[bool] = None,
+) -> QdrantClient:
+    return QdrantClient(**_client_kwargs(timeout, cloud_inference, prefer_grpc))
+
+
+def get_async_client(
+    timeout: Optional[float] = None,
+    cloud_inference: bool = False,
+    prefer_grpc: Optional[bool] = None,
+) -> AsyncQdrantClient:
+    return AsyncQdrantClient(**_client_kwargs(timeout, cloud_inference, prefer_grpc))
 
-def get_client():
-    return QdrantClient(
-        url=settings.QDRANT_URL,
-        api_key=settings.QDRANT_API_KEY,
-        timeout=60,
-        verify=False
-    )
 
 def init_collection(client: QdrantClient):
     if not client.collection_exists(settings.COLLECTION_NAME):
         print(f"Creating collection: {settings.COLLECTION_NAME}")
+        # Same profile-driven config as ingestion (src/etl/collection_profiles.py).
+        profile = get_profile()
         client.create_collection(
             collection_name=settings.COLLECTION_NAME,
-            vectors_config={
-                "dense": models.VectorParams(
-                    size=1024, 
-                    distance=models.Distance.COSINE,
-                    quantization_config=models.ScalarQuantization(
-                        scalar=models.ScalarQuantizationConfig(
-                            type=models.ScalarType.INT8, 
-                            always_ram=True
-                        )
-                    )
-                )
-            },
-            sparse_vectors_config={
-                "sparse": models.SparseVectorParams(
-                    index=models.SparseIndexParams(
-                        on_disk=True,
-                        full_scan_threshold=1000,
-                        datatype="float32"
-                    )
-                )
-            }
-        )
\ No newline at end of file
+            vectors_config={"dense": profile.dense_params()},
+            sparse_vectors_config={"sparse": profile.sparse_params()},
+            quantization_config=profile.quantization_config(),
+            hnsw_config=profile.hnsw_config(),
+        )
+        record_profile(client, settings.COLLECTION_NAME, settings.COLLECTION_PROFILE.strip().lower())
+
+    ensure_payload_indexes(client, settings.COLLECTION_NAME)
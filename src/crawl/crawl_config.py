@@ -1,12 +1,13 @@
 import os
 import re
-import json
 from datetime import date, timedelta
 from pathlib import Path
 try:
     from core.config import Settings
+    from etl import codec
 except ImportError:
     from src.core.config import Settings
+    from src.etl import codec
 
 CURRENT_FILE = Path(__file__).resolve()
 PROJECT_ROOT = CURRENT_FILE.parent.parent.parent
@@ -63,17 +64,17 @@ def get_last_crawled_date(file_name: str) -> str:
         return last_date
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             for line in f:
                 try:
                     line = line.strip()
                     if not line:
                         continue
                     
-                    data = json.loads(line)
+                    data = codec.decode_notice(line)
                     if data.get('date') and data['date'] > last_date:
                         last_date = data['date']
-                except json.JSONDecodeError:
+                except codec.DecodeError:
                     continue
     except Exception as e:
         print(f"[Warning] Failed to read last date from {file_name}: {e}")
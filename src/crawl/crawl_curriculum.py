@@ -3,9 +3,15 @@ import json
 import hashlib
 import pandas as pd
 import asyncio
+import os
 from bs4 import BeautifulSoup
 from playwright.async_api import async_playwright
 
+try:
+    from crawl_config import CONFIG
+except ImportError:
+    from src.crawl.crawl_config import CONFIG
+
 class KnuCurriculumScraper:
     def __init__(self):
         self.url = "https://knuin.knu.ac.kr/public/stddm/edu.knu"
@@ -295,8 +301,9 @@ class KnuCurriculumScraper:
             await browser.close()
 
         # 저장
-        pd.DataFrame(self.guidelines).to_csv("knu_guide_final.csv", index=False, encoding="utf-8-sig")
-        pd.DataFrame(self.roadmaps).to_csv("knu_road_final.csv", index=False, encoding="utf-8-sig")
+        out_dir = CONFIG["curriculum_dir"]
+        pd.DataFrame(self.guidelines).to_csv(os.path.join(out_dir, "knu_guide_final.csv"), index=False, encoding="utf-8-sig")
+        pd.DataFrame(self.roadmaps).to_csv(os.path.join(out_dir, "knu_road_final.csv"), index=False, encoding="utf-8-sig")
 
 if __name__ == "__main__":
     scraper = KnuCurriculumScraper()
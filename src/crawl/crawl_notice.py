@@ -36,6 +36,11 @@ except ImportError:
         sanitize_filename,
     )
 
+try:
+    from etl import codec, notice_archive, zstd_jsonl
+except ImportError:
+    from src.etl import codec, notice_archive, zstd_jsonl
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 file_lock = threading.Lock()
@@ -237,6 +242,16 @@ class BaseCrawler:
         school_dir = Path(CONFIG["data_dir"]) / self.school_id
         school_dir.mkdir(parents=True, exist_ok=True)
         self.file_path = school_dir / f"{self.dept_id}.jsonl"
+        if not self.file_path.exists():
+            for candidate in (
+                notice_archive.compact_path_for(self.file_path),
+                zstd_jsonl.zst_path_for(self.file_path),
+            ):
+                if candidate.exists():
+                    self.file_path = candidate
+                    break
+        self.is_compact = notice_archive.is_compact_path(self.file_path)
+        self.is_zst = zstd_jsonl.is_zst_path(self.file_path)
         self.last_crawled_date = CONFIG["cutoff_date"]
 
         self.session = requests.Session()
@@ -246,10 +261,10 @@ class BaseCrawler:
         if self.file_path.exists():
             with file_lock:
                 try:
-                    with self.file_path.open("r", encoding="utf-8") as f:
+                    with notice_archive.open_binary(self.file_path) as f:
                         for line in f:
                             try:
-                                data = json.loads(line)
+                                data = codec.decode_notice(line)
                                 if "url" in data:
                                     self.collected_links.add(data["url"])
                                 canonical_url = _canonicalize_url(data.get("canonical_url") or data.get("url", ""))
@@ -312,8 +327,13 @@ class BaseCrawler:
 
         with file_lock:
             try:
-                with self.file_path.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(post_data, ensure_ascii=False) + "\n")
+                if self.is_compact:
+                    notice_archive.append_compact_row(self.file_path, post_data)
+                elif self.is_zst:
+                    zstd_jsonl.append_lines(self.file_path, [codec.dumps_line(post_data)])
+                else:
+                    with self.file_path.open("a", encoding="utf-8") as f:
+                        f.write(codec.dumps_line(post_data))
                 self.collected_links.add(post_data["url"])
                 self.doc_state[doc_id] = {"version": version, "content_hash": content_hash}
             except Exception as e:
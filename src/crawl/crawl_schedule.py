@@ -3,6 +3,11 @@ from playwright.async_api import async_playwright
 import asyncio
 import os
 
+try:
+    from crawl_config import CONFIG
+except ImportError:
+    from src.crawl.crawl_config import CONFIG
+
 # ==============================================================================
 # 1. 컬럼 매핑 정의 (WebSquare 내부 변수명 -> 한글 헤더)
 # ==============================================================================
@@ -208,7 +213,7 @@ async def scrape_knu_full_mode(target_year="2025", target_semester="1학기"):
         print(f"총 강좌 수: {len(df_final)}")
         print(f"수집된 컬럼: {list(df_final.columns)}")
         
-        filename = f"knu_full_data_{target_year}_{target_semester}.csv"
+        filename = os.path.join(CONFIG["schedules_dir"], f"knu_full_data_{target_year}_{target_semester}.csv")
         df_final.to_csv(filename, index=False, encoding="utf-8-sig")
         print(f"저장 완료: {os.path.abspath(filename)}")
     else:
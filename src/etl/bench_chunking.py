@@ -0,0 +1,101 @@
+"""Micro-benchmark notice chunkers on the crawled corpus.
+
+Reports docs/sec and MB/sec per chunker (best of `--repeat` runs), the
+number of parents/children, child size in tokens and, for chunkers that
+record `source_span`, how many spans do not cover their chunk text.
+
+    python -m src.etl.bench_chunking --input data --limit 2000 --chunkers legacy,token
+"""
+
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.etl.chunking import build_chunker, estimate_tokens
+from src.etl.utils import classify_block_type, iter_metadata_files, iter_notice_rows, normalize_whitespace
+
+
+def load_notices(input_dir: str, limit: int) -> List[Tuple[str, str]]:
+    docs: List[Tuple[str, str]] = []
+    for path in sorted(iter_metadata_files(input_dir)):
+        for row in iter_notice_rows(path):
+            content = str(row.get("content") or "")
+            if not content.strip():
+                continue
+            docs.append((content, str(row.get("title") or "")))
+            if len(docs) >= limit:
+                return docs
+    return docs
+
+
+def run_chunker(name: str, docs: List[Tuple[str, str]], repeat: int) -> Dict:
+    chunker = build_chunker(name)
+    best = float("inf")
+    chunks = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        chunks = [chunker.chunk(content, title=title) for content, title in docs]
+        best = min(best, time.perf_counter() - started)
+
+    children = [c for doc_chunks in chunks for c in doc_chunks if c.level == "child"]
+    parents = sum(1 for doc_chunks in chunks for c in doc_chunks if c.level == "parent")
+    span_errors = 0
+    for (content, _), doc_chunks in zip(docs, chunks):
+        for c in doc_chunks:
+            if c.source_span is None:
+                continue
+            start, end = c.source_span
+            if normalize_whitespace(content[start:end]) != normalize_whitespace(c.text):
+                span_errors += 1
+    return {
+        "seconds": best,
+        "parents": parents,
+        "children": children,
+        "tokens": np.asarray([c.token_count or estimate_tokens(c.text) for c in children] or [0]),
+        "spans": any(c.source_span is not None for c in children),
+        "span_errors": span_errors,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Notice chunker micro-benchmark")
+    parser.add_argument("--input", default="data", help="Notice jsonl root directory")
+    parser.add_argument("--limit", type=int, default=2000, help="Number of notices to chunk")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per chunker (best is reported)")
+    parser.add_argument("--chunkers", default="legacy,token", help="Comma separated CHUNKER values")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    docs = load_notices(args.input, args.limit)
+    if not docs:
+        print(f"[ERROR] No notices found under: {args.input}")
+        return
+    mb = sum(len(content.encode("utf-8")) for content, _ in docs) / 1e6
+    print(f"[INFO] docs={len(docs)}, content={mb:.2f}MB")
+
+    for name in [c.strip() for c in args.chunkers.split(",") if c.strip()]:
+        res = run_chunker(name, docs, args.repeat)
+        tokens = res["tokens"]
+        print(
+            f"[OK] {name}: {len(docs) / res['seconds']:.0f} docs/s {mb / res['seconds']:.2f} MB/s "
+            f"elapsed={res['seconds']:.3f}s parents={res['parents']} children={len(res['children'])} "
+            f"child_tokens p50={np.percentile(tokens, 50):.0f} p95={np.percentile(tokens, 95):.0f} "
+            f"max={tokens.max()}"
+        )
+        if res["spans"]:
+            print(f"[INFO] {name}: source_span mismatches={res['span_errors']}")
+
+        texts = [(c.section_header, c.text) for c in res["children"]]
+        started = time.perf_counter()
+        for header, text in texts:
+            classify_block_type(header, text)
+        elapsed = time.perf_counter() - started
+        print(f"[INFO] {name}: classify_block_type {len(texts) / max(elapsed, 1e-9):.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark dense encoder backends on real notice chunks.
+
+Reports vectors/sec per backend and cosine agreement against a reference
+backend (default: the GPU fp16 path). The embedding cache is disabled so
+every backend really encodes.
+
+    python -m src.etl.bench_dense --input data --limit 512 --backends onnx_cpu,local_gpu
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.config import settings
+from src.etl.chunking import build_chunker
+from src.etl.encoders import ConditionalDenseEncoder
+from src.etl.utils import iter_metadata_files, iter_notice_rows
+
+
+def load_chunk_texts(input_dir: str, limit: int) -> List[str]:
+    chunker = build_chunker()
+    texts: List[str] = []
+    for path in sorted(iter_metadata_files(input_dir)):
+        for row in iter_notice_rows(path):
+            content = str(row.get("content") or "")
+            if not content.strip():
+                continue
+            for chunk in chunker.chunk(content, title=str(row.get("title") or "")):
+                texts.append(chunk.text)
+                if len(texts) >= limit:
+                    return texts
+    return texts
+
+
+def run_backend(name: str, texts: List[str], batch_size: int) -> Dict:
+    encoder = ConditionalDenseEncoder(
+        cf_account_id=settings.CLOUDFLARE_ACCOUNT_ID,
+        cf_api_token=settings.CLOUDFLARE_API_TOKEN,
+        cache_path="",
+        backend=name,
+    )
+    encoder.encode(texts[:2])  # model load / session warm-up
+    vectors: List[List[float]] = []
+    started = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(encoder.encode(texts[i : i + batch_size]))
+    elapsed = time.perf_counter() - started
+    return {
+        "backend": encoder.backend,
+        "vectors": np.asarray(vectors, dtype=np.float32),
+        "seconds": elapsed,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Dense encoder throughput/agreement benchmark")
+    parser.add_argument("--input", default="data", help="Notice jsonl root directory")
+    parser.add_argument("--limit", type=int, default=512, help="Number of chunks to encode")
+    parser.add_argument("--batch-size", type=int, default=16, help="Texts per encode() call")
+    parser.add_argument(
+        "--backends",
+        default="onnx_cpu,local_gpu",
+        help="Comma separated DENSE_BACKEND values (local_gpu, onnx_cpu, cloudflare)",
+    )
+    parser.add_argument("--reference", default="local_gpu", help="Backend used as cosine reference")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    texts = load_chunk_texts(args.input, args.limit)
+    if not texts:
+        print(f"[ERROR] No notice chunks found under: {args.input}")
+        return
+    print(f"[INFO] chunks={len(texts)}, avg_chars={sum(map(len, texts)) / len(texts):.0f}")
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if args.reference not in backends:
+        backends.append(args.reference)
+
+    results: Dict[str, Dict] = {}
+    for name in backends:
+        try:
+            results[name] = run_backend(name, texts, args.batch_size)
+        except Exception as exc:
+            print(f"[WARN] {name}: {exc}")
+            continue
+        res = results[name]
+        zero = int((np.abs(res["vectors"]).sum(axis=1) == 0).sum())
+        print(
+            f"[OK] {name} ({res['backend']}): {len(texts) / res['seconds']:.1f} vectors/s "
+            f"elapsed={res['seconds']:.2f}s zero_vectors={zero}"
+        )
+
+    reference = results.get(args.reference)
+    if reference is None:
+        print(f"[WARN] Reference backend {args.reference} unavailable; skipping agreement")
+        return
+    ref = reference["vectors"]
+    ref_ok = np.abs(ref).sum(axis=1) > 0
+    for name, res in results.items():
+        if name == args.reference:
+            continue
+        vec = res["vectors"]
+        ok = ref_ok & (np.abs(vec).sum(axis=1) > 0)
+        if not ok.any():
+            print(f"[WARN] {name}: no comparable vectors")
+            continue
+        a = ref[ok] / np.linalg.norm(ref[ok], axis=1, keepdims=True)
+        b = vec[ok] / np.linalg.norm(vec[ok], axis=1, keepdims=True)
+        cos = (a * b).sum(axis=1)
+        print(
+            f"[INFO] {name} vs {args.reference}: cosine mean={cos.mean():.4f} "
+            f"p5={np.percentile(cos, 5):.4f} min={cos.min():.4f} (n={int(ok.sum())})"
+        )
+
+
+if __name__ == "__main__":
+    main()
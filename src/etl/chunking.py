@@ -0,0 +1,398 @@
+"""Notice chunkers.
+
+`token` (default, `CHUNKER` / `--chunker`) splits a notice into sections at
+header lines, packs each section into parents of at most
+`PARENT_MAX_TOKENS` and children of at most `CHUNK_TOKENS` with
+`CHUNK_OVERLAP_TOKENS` of line overlap. Every chunk records `source_span`,
+the [start, end) character offsets of its text in the notice content.
+
+Token counts come from the BGE-M3 `tokenizer.json` when `CHUNK_TOKENIZER`
+points at one (e.g. models/bge-m3-onnx/tokenizer.json), otherwise from a
+fast estimate tuned to the XLM-R vocabulary (~2 Hangul syllables or ~3 ASCII
+characters per token).
+
+`legacy` is the original character-based chunker (`CHUNK_SIZE` chars),
+kept so existing collections can be re-ingested without changing point ids.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.etl.utils import chunk_text, classify_block_type
+
+CHUNKERS = ("token", "legacy")
+
+# Bump when the token chunker's output changes; part of the ingestion fingerprint.
+TOKEN_CHUNKER_VERSION = 2
+
+SECTION_HEADER_RE = re.compile(
+    r"^\s*(?:\d+[.)]|[가-힣A-Za-z]{1,20}\s*[:.)]|[■●◆▶▷※]+|[0-9]+\s*-\s*)"
+)
+LIST_ITEM_RE = re.compile(r"^(\-|\*|\d+[.)])\s+")
+_LINE_RE = re.compile(r"[^\n]+")
+_WORD_RE = re.compile(r"\S+")
+
+
+@dataclass
+class Chunk:
+    text: str
+    level: str
+    block_type: str
+    chunk_type: str
+    section_header: str
+    node_path: str
+    parent_path: str
+    node_type: str
+    parent_index: int
+    chunk_index: int
+    total_chunks: int
+    parent_text: str
+    source_span: Optional[Tuple[int, int]] = None
+    token_count: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    # Built from C-level str ops only. Hangul syllables are the 3-byte UTF-8
+    # characters (~2 per token, plus a half token per word boundary); the
+    # remaining non-space characters are ASCII letters/digits/symbols (~3 per token).
+    chars = len(text)
+    wide = (len(text.encode("utf-8")) - chars) // 2
+    words = len(text.split())
+    narrow = chars - wide - text.count(" ") - text.count("\t")
+    return (wide + words) // 2 + (narrow + 2) // 3
+
+
+def load_token_counter(tokenizer_path: Optional[str] = None) -> Tuple[str, Callable[[str], int]]:
+    """(name, count_fn). Falls back to `estimate_tokens` when no tokenizer is configured."""
+    path = tokenizer_path if tokenizer_path is not None else os.getenv("CHUNK_TOKENIZER", "")
+    if not path:
+        return "estimate", estimate_tokens
+    try:
+        from tokenizers import Tokenizer
+
+        tokenizer = Tokenizer.from_file(path)
+    except Exception as exc:
+        print(f"[WARN] Chunk tokenizer unavailable ({path}): {exc}; using estimate")
+        return "estimate", estimate_tokens
+
+    def count(text: str) -> int:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+    return f"tokenizer:{os.path.basename(path)}", count
+
+
+def detect_node_type(text: str) -> str:
+    s = text.strip()
+    if LIST_ITEM_RE.match(s):
+        return "list_item"
+    if "|" in s and len(s) < 500:
+        return "table_row"
+    return "paragraph"
+
+
+def is_section_header(line: str) -> bool:
+    return len(line) <= 60 and SECTION_HEADER_RE.match(line) is not None
+
+
+class KoreanNoticeChunker:
+    """Legacy chunker: sections at header lines, children of `chunk_size` characters."""
+
+    name = "legacy"
+    # Chunks the whitespace-normalized content, as when its point ids were minted.
+    keeps_lines = False
+
+    def __init__(self, chunk_size: int = 900):
+        self.chunk_size = chunk_size
+
+    def fingerprint_params(self) -> Dict:
+        return {"chunk_size": self.chunk_size}
+
+    @staticmethod
+    def _split_sections(text: str) -> List[Tuple[int, str, str]]:
+        sections: List[Tuple[str, List[str]]] = []
+        current_header = "본문"
+        current_lines: List[str] = []
+
+        for line in text.split("\n"):
+            ln = line.strip()
+            if not ln:
+                continue
+            if is_section_header(ln):
+                if current_lines:
+                    sections.append((current_header, current_lines))
+                current_header = ln[:60]
+                current_lines = []
+            else:
+                current_lines.append(ln)
+
+        if current_lines:
+            sections.append((current_header, current_lines))
+
+        if not sections:
+            sections = [("본문", [text])]
+
+        return [
+            (s_idx, header, "\n".join(body_lines))
+            for s_idx, (header, body_lines) in enumerate(sections)
+        ]
+
+    @staticmethod
+    def _detect_node_type(text: str) -> str:
+        return detect_node_type(text)
+
+    def chunk(self, text: str, title: str = "") -> List[Chunk]:
+        sections = self._split_sections(text)
+        chunks: List[Chunk] = []
+
+        for s_idx, header, section_text in sections:
+            section_header = header or (title[:60] if title else "본문")
+            section_text_for_parent = section_text.strip() or section_header
+            pieces = chunk_text(section_text_for_parent, chunk_size=self.chunk_size, overlap=120)
+            if not pieces:
+                pieces = [section_text_for_parent]
+
+            parent_block_type = classify_block_type(section_header, section_text_for_parent)
+            chunks.append(
+                Chunk(
+                    text=section_text_for_parent,
+                    level="parent",
+                    block_type=parent_block_type,
+                    chunk_type="parent",
+                    section_header=section_header,
+                    node_path=f"s{s_idx}",
+                    parent_path=f"s{s_idx}",
+                    node_type="section",
+                    parent_index=s_idx,
+                    chunk_index=0,
+                    total_chunks=len(pieces),
+                    parent_text=section_text_for_parent,
+                )
+            )
+
+            for p_idx, piece in enumerate(pieces):
+                node_type = detect_node_type(piece)
+                block_type = classify_block_type(section_header, piece)
+                chunks.append(
+                    Chunk(
+                        text=piece,
+                        level="child",
+                        block_type=block_type,
+                        chunk_type=node_type,
+                        section_header=section_header,
+                        node_path=f"s{s_idx}.n{p_idx}",
+                        parent_path=f"s{s_idx}",
+                        node_type=node_type,
+                        parent_index=s_idx,
+                        chunk_index=p_idx,
+                        total_chunks=len(pieces),
+                        parent_text=section_text_for_parent,
+                    )
+                )
+
+        return chunks
+
+
+# (start, end, text, tokens, line index) of one line, or of a word run of an oversized line.
+_Atom = Tuple[int, int, str, int, int]
+
+
+class TokenNoticeChunker:
+    """Token-budgeted chunker that tracks source offsets.
+
+    Lines are the packing unit; a line longer than the parent or child budget
+    is split into word runs at that level. A section within the child budget becomes one parent
+    with a single child. Header detection follows the legacy chunker.
+    """
+
+    name = "token"
+    # Header detection and packing need the content's line breaks.
+    keeps_lines = True
+
+    def __init__(
+        self,
+        chunk_tokens: int = 500,
+        overlap_tokens: int = 64,
+        parent_max_tokens: int = 2500,
+        min_chunk_chars: int = 10,
+        tokenizer_path: Optional[str] = None,
+    ):
+        self.chunk_tokens = max(16, int(chunk_tokens))
+        self.overlap_tokens = max(0, min(int(overlap_tokens), self.chunk_tokens // 2))
+        self.parent_max_tokens = max(self.chunk_tokens, int(parent_max_tokens))
+        self.min_chunk_chars = min_chunk_chars
+        self.counter_name, self.count_tokens = load_token_counter(tokenizer_path)
+
+    def fingerprint_params(self) -> Dict:
+        return {
+            "chunker": self.name,
+            "version": TOKEN_CHUNKER_VERSION,
+            "chunk_tokens": self.chunk_tokens,
+            "overlap_tokens": self.overlap_tokens,
+            "parent_max_tokens": self.parent_max_tokens,
+            "token_counter": self.counter_name,
+        }
+
+    def _sections(self, text: str) -> List[Tuple[str, List[_Atom]]]:
+        sections: List[Tuple[str, List[_Atom]]] = []
+        header = "본문"
+        lines: List[_Atom] = []
+        header_lines: List[_Atom] = []
+        for m in _LINE_RE.finditer(text):
+            raw = m.group()
+            ln = raw.strip()
+            if not ln:
+                continue
+            start = m.start() + (len(raw) - len(raw.lstrip()))
+            if is_section_header(ln):
+                if lines:
+                    sections.append((header, lines))
+                header = ln[:60]
+                lines = []
+                if not sections:
+                    header_lines.append((start, start + len(ln), ln, self.count_tokens(ln), len(header_lines)))
+                continue
+            lines.append((start, start + len(ln), ln, self.count_tokens(ln), len(lines)))
+        if lines:
+            sections.append((header, lines))
+        if not sections and header_lines:
+            # Only header-like lines (e.g. a one-line notice); keep them as the body.
+            sections.append(("본문", header_lines))
+        return sections
+
+    def _split_line(self, line: _Atom, budget: int) -> List[_Atom]:
+        start, _, text, tokens, line_idx = line
+        if tokens <= budget:
+            return [line]
+        # Cut at word boundaries by the line's average tokens per word, then
+        # shrink a run proportionally until it fits; only runs are counted.
+        words = [(m.start(), m.end()) for m in _WORD_RE.finditer(text)]
+        per_word = tokens / max(1, len(words))
+        atoms: List[_Atom] = []
+        i = 0
+        while i < len(words):
+            j = min(len(words), i + max(1, int(budget / per_word)))
+            while True:
+                piece = text[words[i][0] : words[j - 1][1]]
+                piece_tokens = self.count_tokens(piece)
+                if piece_tokens <= budget or j - i == 1:
+                    break
+                j = i + max(1, min(j - i - 1, (j - i) * budget // piece_tokens))
+            atoms.append((start + words[i][0], start + words[j - 1][1], piece, piece_tokens, line_idx))
+            i = j
+        return atoms
+
+    @staticmethod
+    def _join(atoms: List[_Atom]) -> str:
+        parts: List[str] = []
+        prev_line = None
+        for atom in atoms:
+            if prev_line is not None:
+                parts.append(" " if atom[4] == prev_line else "\n")
+            parts.append(atom[2])
+            prev_line = atom[4]
+        return "".join(parts)
+
+    def _pack(self, atoms: List[_Atom], budget: int, overlap: int) -> List[List[_Atom]]:
+        groups: List[List[_Atom]] = []
+        current: List[_Atom] = []
+        used = 0
+        for atom in atoms:
+            if current and used + atom[3] > budget:
+                groups.append(current)
+                tail: List[_Atom] = []
+                tail_tokens = 0
+                for prev in reversed(current[1:]):
+                    if tail_tokens + prev[3] > overlap or tail_tokens + prev[3] + atom[3] > budget:
+                        break
+                    tail.insert(0, prev)
+                    tail_tokens += prev[3]
+                current = tail
+                used = tail_tokens
+            current.append(atom)
+            used += atom[3]
+        if current:
+            groups.append(current)
+        return groups
+
+    def _split_section(self, lines: List[_Atom]) -> List[Tuple[List[_Atom], str, int, List[Tuple[List[_Atom], str, int]]]]:
+        """[(parent lines, parent text, parent tokens, [(child atoms, child text, child tokens)])]."""
+        total = sum(line[3] for line in lines)
+        if total <= self.chunk_tokens:
+            section_text = self._join(lines)
+            return [(lines, section_text, total, [(lines, section_text, total)])]
+
+        out = []
+        parent_atoms = [a for line in lines for a in self._split_line(line, self.parent_max_tokens)]
+        for parent_lines in self._pack(parent_atoms, self.parent_max_tokens, 0):
+            atoms = [a for line in parent_lines for a in self._split_line(line, self.chunk_tokens)]
+            children = []
+            for group in self._pack(atoms, self.chunk_tokens, self.overlap_tokens):
+                children.append((group, self._join(group), sum(a[3] for a in group)))
+            if len(children) > 1:
+                children = [c for c in children if len(c[1]) >= self.min_chunk_chars] or children[:1]
+            out.append((parent_lines, self._join(parent_lines), sum(line[3] for line in parent_lines), children))
+        return out
+
+    def chunk(self, text: str, title: str = "") -> List[Chunk]:
+        chunks: List[Chunk] = []
+        p_idx = 0
+        for header, lines in self._sections(text or ""):
+            section_header = header or (title[:60] if title else "본문")
+            for parent_lines, parent_text, parent_tokens, children in self._split_section(lines):
+                chunks.append(
+                    Chunk(
+                        text=parent_text,
+                        level="parent",
+                        block_type=classify_block_type(section_header, parent_text),
+                        chunk_type="parent",
+                        section_header=section_header,
+                        node_path=f"s{p_idx}",
+                        parent_path=f"s{p_idx}",
+                        node_type="section",
+                        parent_index=p_idx,
+                        chunk_index=0,
+                        total_chunks=len(children),
+                        parent_text=parent_text,
+                        source_span=(parent_lines[0][0], parent_lines[-1][1]),
+                        token_count=parent_tokens,
+                    )
+                )
+                for c_idx, (group, piece, tokens) in enumerate(children):
+                    node_type = detect_node_type(piece)
+                    chunks.append(
+                        Chunk(
+                            text=piece,
+                            level="child",
+                            block_type=classify_block_type(section_header, piece),
+                            chunk_type=node_type,
+                            section_header=section_header,
+                            node_path=f"s{p_idx}.n{c_idx}",
+                            parent_path=f"s{p_idx}",
+                            node_type=node_type,
+                            parent_index=p_idx,
+                            chunk_index=c_idx,
+                            total_chunks=len(children),
+                            parent_text=parent_text,
+                            source_span=(group[0][0], group[-1][1]),
+                            token_count=tokens,
+                        )
+                    )
+                p_idx += 1
+        return chunks
+
+
+def build_chunker(name: Optional[str] = None):
+    from src.core.config import settings
+
+    name = (name or settings.CHUNKER).strip().lower()
+    if name == "legacy":
+        return KoreanNoticeChunker(chunk_size=settings.CHUNK_SIZE)
+    if name == "token":
+        return TokenNoticeChunker(
+            chunk_tokens=settings.CHUNK_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+            parent_max_tokens=settings.PARENT_MAX_TOKENS,
+        )
+    raise ValueError(f"Unknown CHUNKER: {name}")
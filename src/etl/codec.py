@@ -0,0 +1,248 @@
+"""JSON codec used by every JSONL reader/writer.
+
+Backend is chosen by `JSONL_CODEC` (auto | orjson | msgspec | json).
+`auto` prefers orjson, then msgspec, then the stdlib. Output is always
+UTF-8 without ASCII escaping (same as `json.dumps(..., ensure_ascii=False)`).
+"""
+
+import json
+import os
+from typing import Any, Dict, Tuple, Type, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _select_backend(name: str) -> str:
+    name = (name or "auto").strip().lower()
+    if name == "orjson" and orjson is not None:
+        return "orjson"
+    if name == "msgspec" and msgspec is not None:
+        return "msgspec"
+    if name == "json":
+        return "json"
+    if orjson is not None:
+        return "orjson"
+    if msgspec is not None:
+        return "msgspec"
+    return "json"
+
+
+BACKEND = _select_backend(os.getenv("JSONL_CODEC", "auto"))
+
+_decode_errors = [json.JSONDecodeError, UnicodeDecodeError]
+if orjson is not None:
+    _decode_errors.append(orjson.JSONDecodeError)
+if msgspec is not None:
+    _decode_errors.append(msgspec.DecodeError)
+DecodeError: Tuple[Type[Exception], ...] = tuple(_decode_errors)
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+    if BACKEND == "msgspec":
+        return _msgspec_decoder.decode(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    try:
+        if BACKEND == "orjson":
+            return orjson.dumps(obj).decode("utf-8")
+        if BACKEND == "msgspec":
+            return _msgspec_encoder.encode(obj).decode("utf-8")
+    except (TypeError, OverflowError, ValueError):
+        pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def dumps_line(obj: Any) -> str:
+    return dumps(obj) + "\n"
+
+
+# --- Typed notice decoding ---------------------------------------------------
+#
+# Fields ingestion reads from a notice row. The duplicated `raw` blob is
+# intentionally absent so msgspec skips it without materializing the strings;
+# of `normalized` and `assets` only the sub-fields in NOTICE_NESTED_FIELDS
+# (what the ingestion resolvers fall back on) are decoded. Add a field here
+# before reading it from rows returned by `decode_notice`.
+#
+# Compact archive rows (src/etl/notice_archive.py) carry those blobs as a
+# `_views` spec instead; the decoders rebuild the same nested sub-fields from
+# its refs and values, so both formats decode to the same dict.
+VIEWS_KEY = "_views"
+
+NOTICE_FIELDS = (
+    "doc_id",
+    "domain",
+    "source_type",
+    "version",
+    "is_current",
+    "school_id",
+    "school",
+    "school_name",
+    "dept_id",
+    "dept",
+    "dept_name",
+    "program_level",
+    "url",
+    "canonical_url",
+    "title",
+    "date",
+    "published_at",
+    "content",
+    "content_hash",
+    "attachments",
+    "images",
+    "summary",
+    "category",
+    "contact",
+    "target_group",
+    "deadlines",
+    "valid_until",
+    "is_expired",
+    "requires_action",
+    "deadline_confidence",
+    "evidence_text",
+    "collected_at",
+    "updated_at",
+    "normalized",
+    "assets",
+)
+
+NOTICE_NESTED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "normalized": ("title", "published_at", "content"),
+    "assets": ("attachments",),
+}
+
+# Fields needed to pick the latest version of a doc (doc id / its fallback inputs and version).
+NOTICE_KEY_FIELDS = (
+    "doc_id",
+    "version",
+    "url",
+    "canonical_url",
+    "title",
+    "date",
+    "published_at",
+    "dept_id",
+    "dept",
+    "normalized",
+)
+
+# The doc id fallback reads the normalized title/date, never the content.
+NOTICE_KEY_NESTED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "normalized": ("title", "published_at"),
+}
+
+
+def _fields_decoder(name: str, fields: Tuple[str, ...], nested: Dict[str, Tuple[str, ...]]):
+    if msgspec is None:
+        return None
+    spec = []
+    view_spec = []
+    for field in fields:
+        field_type: Any = Any
+        if field in nested:
+            sub = msgspec.defstruct(f"{name}_{field}", [(key, Any, msgspec.UNSET) for key in nested[field]])
+            # Non-object values (null, "", ...) in legacy rows still decode.
+            field_type = Union[sub, None, bool, int, float, str, list]
+            view = msgspec.defstruct(
+                f"{name}_{field}_view",
+                [("refs", Any, msgspec.UNSET), ("values", field_type, msgspec.UNSET)],
+            )
+            view_spec.append((field, Union[view, None, bool, int, float, str, list], msgspec.UNSET))
+        spec.append((field, field_type, msgspec.UNSET))
+    if view_spec:
+        views = msgspec.defstruct(f"{name}_views", view_spec)
+        spec.append((VIEWS_KEY, Union[views, None, bool, int, float, str, list], msgspec.UNSET))
+    return msgspec.json.Decoder(msgspec.defstruct(name, spec))
+
+
+_notice_decoder = _fields_decoder("NoticeRecord", NOTICE_FIELDS, NOTICE_NESTED_FIELDS)
+_notice_key_decoder = _fields_decoder("NoticeKeyRecord", NOTICE_KEY_FIELDS, NOTICE_KEY_NESTED_FIELDS)
+
+
+def _struct_to_dict(value: Any) -> Dict:
+    return {
+        key: getattr(value, key)
+        for key in value.__struct_fields__
+        if getattr(value, key) is not msgspec.UNSET
+    }
+
+
+def _views_to_dict(value: Any) -> Dict:
+    views = _struct_to_dict(value)
+    for field, view in views.items():
+        if isinstance(view, msgspec.Struct):
+            view = _struct_to_dict(view)
+            if isinstance(view.get("values"), msgspec.Struct):
+                view["values"] = _struct_to_dict(view["values"])
+            views[field] = view
+    return views
+
+
+def _apply_views(out: Dict, views: Any, nested: Dict[str, Tuple[str, ...]]) -> None:
+    """Rebuild the nested sub-fields of compact-row blobs from their `_views` spec."""
+    if not isinstance(views, dict):
+        return
+    for field, keys in nested.items():
+        spec = views.get(field)
+        if not isinstance(spec, dict) or isinstance(out.get(field), dict):
+            continue
+        refs = spec.get("refs")
+        values = spec.get("values")
+        blob = {}
+        if isinstance(refs, dict):
+            blob.update({key: out[source] for key, source in refs.items() if key in keys and source in out})
+        if isinstance(values, dict):
+            blob.update({key: value for key, value in values.items() if key in keys})
+        out[field] = blob
+
+
+def _decode_fields(
+    data: Union[str, bytes], fields: Tuple[str, ...], nested: Dict[str, Tuple[str, ...]], decoder
+) -> Dict:
+    if decoder is not None:
+        record = decoder.decode(data)
+        out: Dict = {}
+        for name in fields:
+            value = getattr(record, name)
+            if value is msgspec.UNSET:
+                continue
+            out[name] = _struct_to_dict(value) if isinstance(value, msgspec.Struct) else value
+        views = getattr(record, VIEWS_KEY, msgspec.UNSET)
+        if isinstance(views, msgspec.Struct):
+            _apply_views(out, _views_to_dict(views), nested)
+        return out
+    row = loads(data)
+    if not isinstance(row, dict):
+        raise json.JSONDecodeError("notice row must be an object", str(data)[:40], 0)
+    out = {name: row[name] for name in fields if name in row}
+    for field, keys in nested.items():
+        if isinstance(out.get(field), dict):
+            out[field] = {key: value for key, value in out[field].items() if key in keys}
+    _apply_views(out, row.get(VIEWS_KEY), nested)
+    return out
+
+
+def decode_notice(data: Union[str, bytes]) -> Dict:
+    """Decode a notice row keeping only `NOTICE_FIELDS` (and `NOTICE_NESTED_FIELDS` of its blobs)."""
+    return _decode_fields(data, NOTICE_FIELDS, NOTICE_NESTED_FIELDS, _notice_decoder)
+
+
+def decode_notice_key(data: Union[str, bytes]) -> Dict:
+    """Decode only `NOTICE_KEY_FIELDS`; content and blobs are skipped, not materialized."""
+    return _decode_fields(data, NOTICE_KEY_FIELDS, NOTICE_KEY_NESTED_FIELDS, _notice_key_decoder)
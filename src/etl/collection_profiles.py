@@ -0,0 +1,275 @@
+"""Named storage / index / search profiles for the notice collection.
+
+A profile bundles:
+- where the original dense vectors live (on disk or in RAM)
+- the quantization (binary, scalar int8 or none)
+- the HNSW graph parameters
+- the search-time ef, rescore and oversampling
+
+New collections are created with `COLLECTION_PROFILE` (or `--profile`).
+Existing collections change only through `apply`, which also records the
+profile name in the collection metadata. The retriever uses the recorded
+profile's search params.
+
+    python -m src.etl.collection_profiles list
+    python -m src.etl.collection_profiles apply --collection school_info --profile low-memory
+    python -m src.etl.collection_profiles bench --collection school_info_copy --target-recall 0.95
+
+`bench` applies each profile in turn to the collection (use a copy, or an
+idle collection), waits until it is green, and measures recall@k against
+exact search and the query latency. It then names the cheapest profile
+that meets the target recall and re-applies the profile recorded before
+the run.
+"""
+
+import argparse
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from qdrant_client import models
+
+DENSE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    on_disk: bool  # original dense vectors on disk (mmap) instead of RAM
+    quantization: str  # binary | scalar | none
+    hnsw_m: int
+    ef_construct: int
+    hnsw_on_disk: bool
+    sparse_on_disk: bool
+    search_ef: int
+    rescore: bool
+    oversampling: float
+
+    def dense_params(self) -> models.VectorParams:
+        return models.VectorParams(size=DENSE_SIZE, distance=models.Distance.COSINE, on_disk=self.on_disk)
+
+    def sparse_params(self) -> models.SparseVectorParams:
+        # BM25 values need the IDF modifier (see src/etl/sparse.py).
+        return models.SparseVectorParams(
+            modifier=models.Modifier.IDF,
+            index=models.SparseIndexParams(on_disk=self.sparse_on_disk),
+        )
+
+    def quantization_config(self):
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        return None
+
+    def hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.ef_construct, on_disk=self.hnsw_on_disk)
+
+    def search_params(self) -> models.SearchParams:
+        quantization = None
+        if self.quantization != "none":
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+
+# Cheapest (memory) first; `bench` recommends the first one meeting the target recall.
+PROFILES: Dict[str, CollectionProfile] = {
+    "low-memory": CollectionProfile(
+        on_disk=True,
+        quantization="binary",
+        hnsw_m=16,
+        ef_construct=100,
+        hnsw_on_disk=True,
+        sparse_on_disk=True,
+        search_ef=128,
+        rescore=True,
+        oversampling=3.0,
+    ),
+    "balanced": CollectionProfile(
+        on_disk=True,
+        quantization="scalar",
+        hnsw_m=16,
+        ef_construct=128,
+        hnsw_on_disk=False,
+        sparse_on_disk=False,
+        search_ef=128,
+        rescore=True,
+        oversampling=2.0,
+    ),
+    "low-latency": CollectionProfile(
+        on_disk=False,
+        quantization="scalar",
+        hnsw_m=32,
+        ef_construct=256,
+        hnsw_on_disk=False,
+        sparse_on_disk=False,
+        search_ef=64,
+        rescore=False,
+        oversampling=1.0,
+    ),
+}
+
+
+def get_profile(name: Optional[str] = None) -> CollectionProfile:
+    from src.core.config import settings
+
+    key = (name or settings.COLLECTION_PROFILE).strip().lower()
+    if key not in PROFILES:
+        raise ValueError(f"Unknown collection profile: {key} (expected one of {', '.join(PROFILES)})")
+    return PROFILES[key]
+
+
+def recorded_profile(client, collection_name: str) -> Optional[str]:
+    """Profile name stored in the collection metadata by `apply` / creation, if any."""
+    try:
+        metadata = client.get_collection(collection_name).config.metadata or {}
+    except Exception:
+        return None
+    name = metadata.get("profile")
+    return name if name in PROFILES else None
+
+
+def record_profile(client, collection_name: str, name: str) -> None:
+    try:
+        client.update_collection(collection_name=collection_name, metadata={"profile": name})
+    except Exception as exc:
+        # Collection metadata needs Qdrant >= 1.16; the profile then falls back to COLLECTION_PROFILE.
+        print(f"[WARN] Could not record profile on {collection_name}: {exc}")
+
+
+def apply_profile(client, collection_name: str, name: str) -> None:
+    profile = get_profile(name)
+    quantization = profile.quantization_config() or models.Disabled.DISABLED
+    client.update_collection(
+        collection_name=collection_name,
+        vectors_config={"dense": models.VectorParamsDiff(on_disk=profile.on_disk)},
+        sparse_vectors_config={"sparse": profile.sparse_params()},
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=quantization,
+    )
+    record_profile(client, collection_name, name)
+    print(f"[OK] Applied profile {name} to {collection_name}: {asdict(profile)}")
+
+
+def wait_for_green(client, collection_name: str, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return True
+        time.sleep(2)
+    return False
+
+
+def _sample_queries(client, collection_name: str, n: int) -> List[List[float]]:
+    records, _ = client.scroll(
+        collection_name=collection_name,
+        limit=n * 4,
+        with_payload=["level"],
+        with_vectors=["dense"],
+    )
+    return [
+        r.vector["dense"]
+        for r in records
+        if (r.payload or {}).get("level") != "parent" and isinstance(r.vector, dict) and "dense" in r.vector
+    ][:n]
+
+
+def _search_ids(client, collection_name: str, vector, limit: int, params: models.SearchParams) -> List:
+    hits = client.query_points(
+        collection_name=collection_name,
+        query=vector,
+        using="dense",
+        limit=limit,
+        search_params=params,
+        with_payload=False,
+    ).points
+    return [h.id for h in hits]
+
+
+def bench_profile(client, collection_name: str, name: str, queries, truth, limit: int) -> Dict[str, float]:
+    params = get_profile(name).search_params()
+    recalls: List[float] = []
+    latencies: List[float] = []
+    for vector, expected in zip(queries, truth):
+        started = time.perf_counter()
+        ids = _search_ids(client, collection_name, vector, limit, params)
+        latencies.append(time.perf_counter() - started)
+        recalls.append(len(set(ids) & set(expected)) / max(1, len(expected)))
+    return {
+        "recall": float(np.mean(recalls)) if recalls else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000 if latencies else 0.0,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Qdrant collection performance profiles")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Print the profiles")
+
+    a = sub.add_parser("apply", help="Apply a profile to a collection")
+    a.add_argument("--collection", default=settings.COLLECTION_NAME, help="Qdrant collection name or alias")
+    a.add_argument("--profile", required=True, choices=list(PROFILES))
+
+    b = sub.add_parser("bench", help="Recall/latency of each profile on a collection (applies them in turn)")
+    b.add_argument("--collection", required=True, help="Collection to benchmark (use a copy of production)")
+    b.add_argument("--profiles", default=",".join(PROFILES), help="Comma separated profile names")
+    b.add_argument("--queries", type=int, default=100, help="Dense queries, taken from stored vectors")
+    b.add_argument("--limit", type=int, default=10, help="k for recall@k")
+    b.add_argument("--target-recall", type=float, default=0.95, help="Recall the recommended profile must reach")
+    b.add_argument("--green-timeout", type=float, default=1800, help="Seconds to wait for re-indexing per profile")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.core.database import get_client
+
+    args = parse_args()
+    if args.command == "list":
+        for name, profile in PROFILES.items():
+            print(f"[INFO] {name}: {asdict(profile)}")
+        return
+
+    client = get_client()
+    if args.command == "apply":
+        apply_profile(client, args.collection, args.profile)
+        return
+
+    names = [n.strip() for n in args.profiles.split(",") if n.strip()]
+    queries = _sample_queries(client, args.collection, args.queries)
+    if not queries:
+        print(f"[ERROR] No dense vectors found in {args.collection}")
+        return
+    exact = models.SearchParams(exact=True)
+    truth = [_search_ids(client, args.collection, q, args.limit, exact) for q in queries]
+    previous = recorded_profile(client, args.collection)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        apply_profile(client, args.collection, name)
+        if not wait_for_green(client, args.collection, args.green_timeout):
+            print(f"[WARN] {args.collection} not green after {args.green_timeout:.0f}s; measuring anyway")
+        results[name] = bench_profile(client, args.collection, name, queries, truth, args.limit)
+        r = results[name]
+        print(
+            f"[OK] {name}: recall@{args.limit}={r['recall']:.3f} "
+            f"p50={r['p50_ms']:.1f}ms p95={r['p95_ms']:.1f}ms (queries={len(queries)})"
+        )
+
+    passing = [n for n in PROFILES if n in results and results[n]["recall"] >= args.target_recall]
+    if passing:
+        print(f"[DONE] cheapest profile with recall >= {args.target_recall}: {passing[0]}")
+    else:
+        print(f"[DONE] no profile reached recall {args.target_recall}")
+    if previous:
+        apply_profile(client, args.collection, previous)
+    else:
+        print(f"[WARN] {args.collection} had no recorded profile; it keeps {names[-1]}")
+
+
+if __name__ == "__main__":
+    main()
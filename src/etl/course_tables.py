@@ -0,0 +1,443 @@
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import settings
+from src.etl.utils import build_bm25_text, deterministic_uuid, normalize_whitespace
+
+# Canonical course table columns (Korean headers, same as crawler output).
+COURSE_COLUMNS = [
+    "source",
+    "개설연도",
+    "개설학기",
+    "학년",
+    "교과구분",
+    "개설대학",
+    "개설학과",
+    "강좌번호",
+    "과목코드",
+    "교과목명",
+    "학점",
+    "강의시수",
+    "실습시수",
+    "담당교수",
+    "강의시간",
+    "강의실",
+    "수강정원",
+    "비고",
+]
+
+# crawl_curriculum roadmap headers -> canonical headers
+CURRICULUM_COLUMN_MAPPING = {
+    "대학": "개설대학",
+    "학과": "개설학과",
+    "연도": "개설연도",
+    "학기": "개설학기",
+}
+
+INDEXED_COLUMNS = ["강좌번호", "교과목명", "개설학과", "학년", "개설학기"]
+
+# Typed payload for the row-level course collection.
+COURSE_PAYLOAD_SCHEMA = {
+    "source": "keyword",
+    "course_no": "keyword",
+    "course_code": "keyword",
+    "course_name": "keyword",
+    "dept_name": "keyword",
+    "college_name": "keyword",
+    "category": "keyword",
+    "semester": "keyword",
+    "professor": "keyword",
+    "year": "integer",
+    "grade": "integer",
+    "capacity": "integer",
+    "credits": "float",
+}
+
+
+def _safe_int(value: object) -> Optional[int]:
+    match = re.search(r"\d+", str(value or ""))
+    return int(match.group(0)) if match else None
+
+
+def _safe_float(value: object) -> Optional[float]:
+    match = re.search(r"\d+(?:\.\d+)?", str(value or ""))
+    return float(match.group(0)) if match else None
+
+
+def normalize_key(value: object) -> str:
+    """Lookup key: lowercase, whitespace-free."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    return re.sub(r"\s+", "", str(value)).lower()
+
+
+def normalize_semester(value: object) -> str:
+    raw = normalize_key(value)
+    if not raw:
+        return ""
+    if "여름" in raw or "summer" in raw:
+        return "여름학기"
+    if "겨울" in raw or "winter" in raw:
+        return "겨울학기"
+    number = _safe_int(raw)
+    if number in (1, 2):
+        return f"{number}학기"
+    return raw
+
+
+def detect_table_kind(columns: Iterable[str]) -> str:
+    cols = set(columns)
+    if "강좌번호" in cols and "교과목명" in cols:
+        return "schedule"
+    if {"교과목명", "학년", "학기"}.issubset(cols):
+        return "curriculum"
+    return ""
+
+
+def load_course_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype=str, encoding="utf-8-sig", keep_default_na=False)
+    kind = detect_table_kind(df.columns)
+    if not kind:
+        return pd.DataFrame(columns=COURSE_COLUMNS)
+    if kind == "curriculum":
+        df = df.rename(columns=CURRICULUM_COLUMN_MAPPING)
+    df["source"] = kind
+    for col in COURSE_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    df = df[COURSE_COLUMNS].copy()
+    for col in COURSE_COLUMNS:
+        df[col] = df[col].map(normalize_whitespace)
+    df["개설학기"] = df["개설학기"].map(normalize_semester)
+    return df[df["교과목명"] != ""]
+
+
+def build_course_frame(paths: List[Path]) -> pd.DataFrame:
+    frames = []
+    for path in paths:
+        try:
+            df = load_course_csv(path)
+        except (OSError, ValueError, UnicodeDecodeError) as exc:
+            print(f"[WARN] Course table load failed: {path} ({exc})")
+            continue
+        if df.empty:
+            print(f"[INFO] Skip non-course csv: {path}")
+            continue
+        print(f"[INFO] Loaded course table: {path} rows={len(df)} source={df['source'].iloc[0]}")
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=COURSE_COLUMNS)
+
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.drop_duplicates(
+        subset=["source", "개설연도", "개설학기", "개설학과", "강좌번호", "과목코드", "교과목명"],
+        keep="last",
+    )
+    # Typed columns for the columnar store.
+    merged["개설연도"] = pd.array([_safe_int(v) for v in merged["개설연도"]], dtype="Int32")
+    merged["학년"] = pd.array([_safe_int(v) for v in merged["학년"]], dtype="Int16")
+    merged["수강정원"] = pd.array([_safe_int(v) for v in merged["수강정원"]], dtype="Int32")
+    merged["학점"] = pd.array([_safe_float(v) for v in merged["학점"]], dtype="Float32")
+    for col in ["source", "개설학기", "교과구분", "개설대학", "개설학과"]:
+        merged[col] = merged[col].astype("category")
+    return merged.reset_index(drop=True)
+
+
+def iter_course_csv_files(inputs: List[str]) -> List[Path]:
+    files: List[Path] = []
+    for raw in inputs:
+        root = Path(raw)
+        if root.is_file() and root.suffix.lower() == ".csv":
+            files.append(root)
+        elif root.is_dir():
+            files.extend(p for p in root.rglob("*.csv") if p.is_file())
+    return sorted(set(files))
+
+
+class CourseTable:
+    """In-memory course table over the Parquet store with exact-match indexes."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame.reset_index(drop=True)
+        self._indexes: Dict[str, Dict[str, np.ndarray]] = {}
+        for col in INDEXED_COLUMNS:
+            keys = self.frame[col].astype(str).map(normalize_key)
+            self._indexes[col] = {
+                key: np.asarray(positions, dtype=np.int64)
+                for key, positions in pd.Series(keys).groupby(keys, sort=False).indices.items()
+                if key and key != "<na>"
+            }
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "CourseTable":
+        return cls(pd.read_parquet(path or default_store_path()))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _positions(self, column: str, value: object) -> np.ndarray:
+        key = normalize_key(value)
+        if column == "개설학기":
+            key = normalize_key(normalize_semester(value))
+        elif column == "학년":
+            number = _safe_int(value)
+            key = str(number) if number is not None else ""
+        return self._indexes[column].get(key, np.empty(0, dtype=np.int64))
+
+    def lookup(
+        self,
+        course_no: Optional[str] = None,
+        name: Optional[str] = None,
+        dept: Optional[str] = None,
+        grade: Optional[object] = None,
+        semester: Optional[str] = None,
+        year: Optional[int] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        selected: Optional[np.ndarray] = None
+        for column, value in [
+            ("강좌번호", course_no),
+            ("교과목명", name),
+            ("개설학과", dept),
+            ("학년", grade),
+            ("개설학기", semester),
+        ]:
+            if value is None or not str(value).strip():
+                continue
+            positions = self._positions(column, value)
+            selected = positions if selected is None else np.intersect1d(selected, positions)
+            if selected.size == 0:
+                return []
+
+        if selected is None:
+            return []
+        rows = self.frame.iloc[selected]
+        if year is not None:
+            rows = rows[rows["개설연도"] == int(year)]
+        return [self._row_to_dict(row) for row in rows.head(limit).to_dict(orient="records")]
+
+    @staticmethod
+    def _row_to_dict(row: Dict) -> Dict:
+        out = {}
+        for key, value in row.items():
+            if value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+                out[key] = None
+            elif isinstance(value, np.generic):
+                out[key] = value.item()
+            else:
+                out[key] = value
+        return out
+
+
+def default_store_path() -> Path:
+    return Path(os.getenv("COURSE_TABLE_PATH", str(settings.DATA_DIR / "tables" / "courses.parquet")))
+
+
+def write_course_store(frame: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    frame.to_parquet(tmp, index=False, compression="zstd")
+    tmp.replace(path)
+
+
+def _payload_value(value: object) -> object:
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def course_payload(row: Dict) -> Dict:
+    payload = {
+        "source": str(row.get("source", "")),
+        "course_no": str(row.get("강좌번호", "")),
+        "course_code": str(row.get("과목코드", "")),
+        "course_name": str(row.get("교과목명", "")),
+        "dept_name": str(row.get("개설학과", "")),
+        "college_name": str(row.get("개설대학", "")),
+        "category": str(row.get("교과구분", "")),
+        "semester": str(row.get("개설학기", "")),
+        "professor": str(row.get("담당교수", "")),
+        "lecture_time": str(row.get("강의시간", "")),
+        "room": str(row.get("강의실", "")),
+        "note": str(row.get("비고", "")),
+        "year": _payload_value(row.get("개설연도")),
+        "grade": _payload_value(row.get("학년")),
+        "capacity": _payload_value(row.get("수강정원")),
+        "credits": _payload_value(row.get("학점")),
+    }
+    return {key: value for key, value in payload.items() if value not in (None, "")}
+
+
+def course_text(payload: Dict) -> str:
+    code = payload.get("course_no") or payload.get("course_code", "")
+    parts = [
+        f"{payload.get('course_name', '')} ({code})" if code else payload.get("course_name", ""),
+        " ".join(str(payload.get(k, "")) for k in ["college_name", "dept_name"] if payload.get(k)),
+        " ".join(
+            f"{payload[k]}{suffix}"
+            for k, suffix in [("year", "년"), ("semester", ""), ("grade", "학년")]
+            if payload.get(k) not in (None, "")
+        ),
+    ]
+    for key, label in [
+        ("category", "교과구분"),
+        ("credits", "학점"),
+        ("professor", "담당교수"),
+        ("lecture_time", "강의시간"),
+        ("room", "강의실"),
+    ]:
+        if payload.get(key) not in (None, ""):
+            parts.append(f"{label}: {payload[key]}")
+    return normalize_whitespace(" / ".join(p for p in parts if p))
+
+
+def course_point_id(payload: Dict) -> str:
+    return deterministic_uuid(
+        [
+            payload.get("source", ""),
+            str(payload.get("year", "")),
+            payload.get("semester", ""),
+            payload.get("dept_name", ""),
+            payload.get("course_no", "") or payload.get("course_code", ""),
+            payload.get("course_name", ""),
+        ],
+        separator="|",
+    )
+
+
+class CourseCollectionIngestor:
+    """Row-level course points with typed payload in a dedicated collection."""
+
+    def __init__(self, collection_name: str, batch_size: int = 64, qdrant_timeout: float = 60.0):
+        from src.core.database import get_client
+        from src.etl.encoders import ConditionalDenseEncoder
+        from src.etl.sparse import SparseVectorizer
+
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.dense_encoder = ConditionalDenseEncoder(
+            cf_account_id=os.getenv("CF_ACCOUNT_ID") or settings.CLOUDFLARE_ACCOUNT_ID,
+            cf_api_token=os.getenv("CF_API_TOKEN") or settings.CLOUDFLARE_API_TOKEN,
+        )
+        self.sparse = SparseVectorizer()
+        self.client = get_client(timeout=qdrant_timeout, cloud_inference=self.sparse.needs_cloud_inference)
+        self._ensure_collection()
+
+    def _ensure_collection(self) -> None:
+        from qdrant_client import models
+
+        from src.etl.sparse import ensure_idf_modifier, sparse_vector_params
+
+        if self.client.collection_exists(self.collection_name):
+            ensure_idf_modifier(self.client, self.collection_name)
+        else:
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config={
+                    "dense": models.VectorParams(size=1024, distance=models.Distance.COSINE)
+                },
+                sparse_vectors_config={"sparse": sparse_vector_params()},
+            )
+            print(f"[INFO] Created course collection: {self.collection_name}")
+
+        schema_types = {
+            "keyword": models.PayloadSchemaType.KEYWORD,
+            "integer": models.PayloadSchemaType.INTEGER,
+            "float": models.PayloadSchemaType.FLOAT,
+        }
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field_name, schema in COURSE_PAYLOAD_SCHEMA.items():
+            if field_name in existing:
+                continue
+            self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=schema_types[schema],
+            )
+
+    def run(self, frame: pd.DataFrame) -> int:
+        from qdrant_client import models
+
+        total = 0
+        records = frame.to_dict(orient="records")
+        for start in range(0, len(records), self.batch_size):
+            payloads = [course_payload(row) for row in records[start : start + self.batch_size]]
+            texts = [course_text(p) for p in payloads]
+            vectors = self.dense_encoder.encode(texts)
+            points = []
+            for payload, text, vector in zip(payloads, texts, vectors):
+                payload["content"] = text
+                bm25_text = build_bm25_text(payload.get("course_name", ""), payload.get("dept_name", ""), text)
+                points.append(
+                    models.PointStruct(
+                        id=course_point_id(payload),
+                        vector={
+                            "dense": [float(x) for x in vector],
+                            "sparse": self.sparse.document(bm25_text),
+                        },
+                        payload=payload,
+                    )
+                )
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=False)
+            total += len(points)
+            print(f"[INFO] Upserted course points: {len(points)} (total={total})")
+        return total
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Course/curriculum CSV ingestion (Parquet store + Qdrant)")
+    parser.add_argument(
+        "--input",
+        nargs="+",
+        default=[str(settings.SCHEDULES_DIR), str(settings.CURRICULUM_DIR)],
+        help="CSV files or directories (searched recursively)",
+    )
+    parser.add_argument("--output", default=str(default_store_path()), help="Parquet store path")
+    parser.add_argument("--collection", default=settings.COURSE_COLLECTION_NAME, help="Qdrant course collection")
+    parser.add_argument("--batch-size", type=int, default=64, help="Upsert batch size")
+    parser.add_argument("--skip-qdrant", action="store_true", help="Only build the Parquet store")
+    parser.add_argument("--lookup", default="", help="Exact course name lookup after build (debug)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    files = iter_course_csv_files(args.input)
+    if not files:
+        print(f"[INFO] No course csv files found under: {args.input}")
+        return
+
+    frame = build_course_frame(files)
+    if frame.empty:
+        print("[INFO] No course rows loaded")
+        return
+    store_path = Path(args.output)
+    write_course_store(frame, store_path)
+    print(f"[OK] Course store -> {store_path} rows={len(frame)}")
+
+    if args.lookup:
+        started = time.perf_counter()
+        table = CourseTable.load(store_path)
+        rows = table.lookup(name=args.lookup)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"[INFO] lookup name={args.lookup} hits={len(rows)} ({elapsed_ms:.1f}ms incl. load)")
+
+    if not args.skip_qdrant:
+        ingestor = CourseCollectionIngestor(collection_name=args.collection, batch_size=args.batch_size)
+        total = ingestor.run(frame)
+        print(f"[DONE] course points={total}, collection={args.collection}")
+
+
+if __name__ == "__main__":
+    main()
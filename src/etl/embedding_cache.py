@@ -0,0 +1,173 @@
+"""Persistent content-addressed embedding cache.
+
+Vectors are stored as float16 blobs in SQLite, keyed by (model id, sha1
+of the exact text sent to the encoder), so unchanged chunks and boilerplate
+sections shared across notices are embedded once per model. Least recently
+used entries are evicted once the table grows past `max_entries`.
+
+    EMBEDDING_CACHE_PATH=.ingestion_cache/embeddings.sqlite3   # "" disables
+    EMBEDDING_CACHE_MAX_ENTRIES=500000
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-collapsed NFC text, for keys of outputs that do not depend on exact spacing."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", str(text or ""))).strip()
+
+
+def text_key(text: str) -> str:
+    # The exact text: encoders embed it verbatim, so any whitespace/Unicode variant is a different vector.
+    return hashlib.sha1(str(text or "").encode("utf-8")).hexdigest()
+
+
+def is_failed_embedding(vector, dim: Optional[int] = None) -> bool:
+    """Encoders signal a failed text with an all-zero vector; a wrong size or NaN counts as failed too."""
+    if vector is None:
+        return True
+    arr = np.asarray(vector, dtype=np.float32)
+    if arr.ndim != 1 or arr.size == 0 or (dim is not None and arr.shape[0] != dim):
+        return True
+    return not np.any(arr) or not np.all(np.isfinite(arr))
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_entries: int = 500_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, List[float]]:
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        if not unique:
+            return found
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(unique), 500):
+                part = unique[start : start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                    [(now, model, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vector in items.items():
+            arr = np.asarray(vector, dtype=np.float16)
+            rows.append((model, key, int(arr.shape[0]), arr.tobytes(), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        # Trim an extra 5% so eviction does not run on every insert near the limit.
+        excess += self.max_entries // 20
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE (model, key) IN (
+                SELECT model, key FROM embeddings ORDER BY last_used LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+
+    def encode(
+        self,
+        model: str,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], List[List[float]]],
+    ) -> List[List[float]]:
+        """Return vectors for `texts`, calling `encode_fn` only for texts not in the cache."""
+        if not texts:
+            return []
+        keys = [text_key(t) for t in texts]
+        found = self.get_many(model, keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        with self._lock:
+            # Embed workers share the cache; keep the counters exact.
+            self.hits += len(texts) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+
+        if missing:
+            vectors = encode_fn(list(missing.values()))
+            fresh: Dict[str, List[float]] = {}
+            for key, vector in zip(missing.keys(), vectors):
+                found[key] = vector
+                # Encoder failures are never cached.
+                if not is_failed_embedding(vector):
+                    fresh[key] = vector
+            self.put_many(model, fresh)
+        return [found[key] for key in keys]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(path: Optional[str], max_entries: int = 500_000) -> Optional[EmbeddingCache]:
+    if not path:
+        return None
+    try:
+        return EmbeddingCache(path, max_entries=max_entries)
+    except (sqlite3.Error, OSError) as exc:
+        print(f"[WARN] Embedding cache disabled ({path}): {exc}")
+        return None
@@ -1,10 +1,27 @@
-﻿import json
+﻿import asyncio
+import json
 import os
+import re
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
+import httpx
+import numpy as np
 import requests
 
+from src.etl.embedding_cache import EmbeddingCache, open_cache
+from src.etl.metadata_cache import content_key, open_metadata_cache
+from src.etl.rate_limit import bucket_for
+
+
+# Rate-limit bucket name; sharded ingestion installs one bucket under it that
+# all worker processes draw from.
+CF_EMBED_BUCKET = "cloudflare_embed"
+GROQ_BUCKET = "groq_chat"
+
 
 class CloudflareDenseEncoder:
     def __init__(
@@ -14,6 +31,8 @@ class CloudflareDenseEncoder:
         model: str = "@cf/baai/bge-m3",
         timeout: int = 30,
         max_retries: int = 3,
+        requests_per_second: float = 0.0,
+        cache: Optional[EmbeddingCache] = None,
     ):
         self.account_id = account_id
         self.api_token = api_token
@@ -24,9 +43,12 @@ class CloudflareDenseEncoder:
         self.url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/run/{self.model}"
         self.headers = {"Authorization": f"Bearer {self.api_token}"}
         self.session = requests.Session()
+        self.bucket = bucket_for(CF_EMBED_BUCKET, requests_per_second)
+        self.cache = cache
 
     def _post_with_retry(self, payload: Dict) -> Optional[requests.Response]:
         for attempt in range(self.max_retries):
+            self.bucket.acquire()
             try:
                 resp = self.session.post(
                     self.url,
@@ -49,6 +71,11 @@ class CloudflareDenseEncoder:
         return None
 
     def encode(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is not None:
+            return self.cache.encode(f"cloudflare:{self.model}", texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+
+    def _encode_uncached(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
 
@@ -78,19 +105,167 @@ class CloudflareDenseEncoder:
             return [[0.0] * self.dim for _ in texts]
 
 
+class _RetryableEmbedError(Exception):
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AsyncCloudflareDenseEncoder:
+    """Cloudflare BGE-M3 over httpx.AsyncClient.
+
+    Inputs are split into `sub_batch_size` requests sent concurrently (at most
+    `max_in_flight` at once, `requests_per_second` through a token bucket).
+    A failing sub-batch is retried on its own; once retries are exhausted it
+    is halved until the failing text is isolated, and only that text gets a
+    zero vector. `encode` is synchronous and safe to call from several
+    threads: requests run on one background event loop and share its limits.
+    """
+
+    def __init__(
+        self,
+        account_id: str,
+        api_token: str,
+        model: str = "@cf/baai/bge-m3",
+        timeout: float = 30.0,
+        max_retries: int = 4,
+        sub_batch_size: int = 8,
+        max_in_flight: int = 8,
+        requests_per_second: float = 20.0,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.account_id = account_id
+        self.api_token = api_token
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.sub_batch_size = max(1, sub_batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.dim = 1024
+        self.url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/run/{self.model}"
+        self.headers = {"Authorization": f"Bearer {self.api_token}"}
+        self.bucket = bucket_for(CF_EMBED_BUCKET, requests_per_second)
+        self.cache = cache
+        self.failed_texts = 0
+
+        # Created once here (not lazily) so concurrent embed workers share one loop and client.
+        limits = httpx.Limits(
+            max_connections=self.max_in_flight,
+            max_keepalive_connections=self.max_in_flight,
+        )
+        self._client: Optional[httpx.AsyncClient] = httpx.AsyncClient(
+            timeout=self.timeout, headers=self.headers, limits=limits
+        )
+        # Binds to the loop on first use (Python >= 3.10).
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="cf-embed-loop", daemon=True)
+        self._thread.start()
+
+    async def _post(self, texts: List[str]) -> List[List[float]]:
+        await self.bucket.acquire_async()
+        async with self._semaphore:
+            try:
+                resp = await self._client.post(self.url, json={"text": texts})
+            except httpx.HTTPError as exc:
+                raise _RetryableEmbedError(str(exc)) from exc
+
+        if resp.status_code == 429 or resp.status_code >= 500:
+            try:
+                retry_after = float(resp.headers.get("retry-after", 0) or 0)
+            except ValueError:
+                retry_after = 0.0
+            raise _RetryableEmbedError(f"HTTP {resp.status_code}", retry_after)
+        if resp.status_code in (401, 403):
+            raise RuntimeError(f"Cloudflare embedding auth failed: HTTP {resp.status_code}")
+        if resp.status_code >= 400:
+            raise ValueError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+
+        try:
+            data = resp.json()
+        except ValueError as exc:
+            raise _RetryableEmbedError("invalid JSON response") from exc
+        vectors = data.get("result", {}).get("data", []) if data.get("success") else []
+        if len(vectors) != len(texts) or any(len(v) != self.dim for v in vectors):
+            raise _RetryableEmbedError(f"expected {len(texts)} vectors of dim {self.dim}")
+        return vectors
+
+    async def _encode_sub_batch(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries):
+            try:
+                return await self._post(texts)
+            except _RetryableEmbedError as exc:
+                if attempt == self.max_retries - 1:
+                    break
+                await asyncio.sleep(max(exc.retry_after, min(2 ** attempt, 8)))
+            except ValueError:
+                break
+
+        if len(texts) > 1:
+            mid = len(texts) // 2
+            left, right = await asyncio.gather(
+                self._encode_sub_batch(texts[:mid]),
+                self._encode_sub_batch(texts[mid:]),
+            )
+            return left + right
+        self.failed_texts += 1
+        print(f"[WARN] Cloudflare embedding failed for one text ({len(texts[0])} chars); using zero vector")
+        return [[0.0] * self.dim]
+
+    async def encode_async(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        parts = [
+            [str(x or "") for x in texts[i : i + self.sub_batch_size]]
+            for i in range(0, len(texts), self.sub_batch_size)
+        ]
+        results = await asyncio.gather(*(self._encode_sub_batch(part) for part in parts))
+        return [vector for part in results for vector in part]
+
+    def _encode_uncached(self, texts: List[str]) -> List[List[float]]:
+        future = asyncio.run_coroutine_threadsafe(self.encode_async(texts), self._loop)
+        return future.result()
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is not None:
+            return self.cache.encode(f"cloudflare:{self.model}", texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+
+    def close(self) -> None:
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._client = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
 class LocalBGEM3DenseEncoder:
+    """GPU BGE-M3 (fp16) with token-budget batching.
+
+    Texts are tokenized once, sorted by length and packed into batches whose
+    padded size (rows x longest row) stays under `max_tokens`, so one long
+    chunk no longer pads a whole batch of short ones. Batches are copied to
+    the GPU from pinned memory; on OOM the budget is halved and the batch
+    re-packed. `encode` returns a float32 array in input order.
+    """
+
     def __init__(
         self,
         model_id: str = "BAAI/bge-m3",
-        batch_size: int = 8,
+        batch_size: int = 64,
         max_length: int = 512,
+        max_tokens: int = 8192,
+        cache: Optional[EmbeddingCache] = None,
     ):
         self.model_id = model_id
-        self.batch_size = batch_size
+        self.batch_size = max(1, batch_size)
         self.max_length = max_length
+        self.max_tokens = max(max_length, max_tokens)
         self.dim = 1024
+        self.cache = cache
         self._ready = False
         self._init_attempted = False
+        # Embed workers call encode concurrently; only one of them loads the model.
+        self._init_lock = threading.Lock()
         self._torch = None
         self._tokenizer = None
         self._model = None
@@ -98,7 +273,18 @@ class LocalBGEM3DenseEncoder:
     def _init_once(self) -> None:
         if self._init_attempted:
             return
-        self._init_attempted = True
+        with self._init_lock:
+            self._init_locked()
+
+    def _init_locked(self) -> None:
+        if self._init_attempted:
+            return
+        try:
+            self._load()
+        finally:
+            self._init_attempted = True
+
+    def _load(self) -> None:
         try:
             import torch
             from transformers import AutoModel, AutoTokenizer
@@ -131,46 +317,207 @@ class LocalBGEM3DenseEncoder:
         denom = mask.sum(dim=1).clamp(min=1e-9)
         return summed / denom
 
-    def encode(self, texts: List[str]) -> List[List[float]]:
+    def _pack(self, lengths: List[int], order: List[int], start: int, budget: int) -> List[int]:
+        """Indices (into `order`) of the next batch; `order` is sorted by length, longest first."""
+        width = max(1, lengths[order[start]])
+        rows = max(1, min(self.batch_size, budget // width))
+        return order[start : start + rows]
+
+    def _forward(self, input_ids: List[List[int]]):
+        torch = self._torch
+        padded = self._tokenizer.pad({"input_ids": input_ids}, padding=True, return_tensors="pt")
+        device = self._model.device
+        tensors = {
+            k: v.pin_memory().to(device, non_blocking=True) for k, v in padded.items()
+        }
+        with torch.inference_mode():
+            outputs = self._model(**tensors)
+            pooled = self._mean_pool(outputs.last_hidden_state, tensors["attention_mask"])
+            pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.float().cpu().numpy()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        if self.cache is not None:
+            vectors = self.cache.encode(f"local:{self.model_id}:{self.max_length}", texts, self._encode_uncached)
+            return np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+        return self._encode_uncached(texts)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
         if not texts:
-            return []
+            return out
         self._init_once()
         if not self._ready:
-            return [[0.0] * self.dim for _ in texts]
+            return out
+
+        encoded = self._tokenizer(
+            [str(x or "") for x in texts],
+            truncation=True,
+            max_length=self.max_length,
+            padding=False,
+        )["input_ids"]
+        lengths = [len(ids) for ids in encoded]
+        order = sorted(range(len(texts)), key=lambda i: lengths[i], reverse=True)
 
-        out_vectors: List[List[float]] = []
-        bs = self.batch_size
-        i = 0
-        while i < len(texts):
-            batch = [str(x or "") for x in texts[i : i + bs]]
+        budget = self.max_tokens
+        pos = 0
+        while pos < len(order):
+            batch = self._pack(lengths, order, pos, budget)
             try:
-                tokenized = self._tokenizer(
-                    batch,
-                    padding=True,
-                    truncation=True,
-                    max_length=self.max_length,
-                    return_tensors="pt",
-                )
-                tokenized = {k: v.to(self._model.device) for k, v in tokenized.items()}
-                with self._torch.no_grad():
-                    outputs = self._model(**tokenized)
-                    pooled = self._mean_pool(outputs.last_hidden_state, tokenized["attention_mask"])
-                    pooled = self._torch.nn.functional.normalize(pooled, p=2, dim=1)
-                out_vectors.extend(pooled.detach().float().cpu().tolist())
-                i += bs
+                out[batch] = self._forward([encoded[i] for i in batch])
+                pos += len(batch)
             except Exception as exc:
                 if self._torch is not None and self._torch.cuda.is_available():
                     self._torch.cuda.empty_cache()
-                if ("out of memory" in str(exc).lower() or "cuda" in str(exc).lower()) and bs > 1:
-                    bs = max(1, bs // 2)
+                message = str(exc).lower()
+                if ("out of memory" in message or "cuda" in message) and len(batch) > 1:
+                    budget = max(lengths[batch[0]], budget // 2)
+                    print(f"[WARN] GPU OOM; max_tokens budget -> {budget}")
                     time.sleep(0.2)
                     continue
-                out_vectors.extend([[0.0] * self.dim for _ in batch])
-                i += bs
+                pos += len(batch)
+        return out
+
+
+class OnnxBGEM3DenseEncoder:
+    """CPU BGE-M3 through ONNX Runtime (optionally int8 dynamic-quantized).
 
-        if len(out_vectors) < len(texts):
-            out_vectors.extend([[0.0] * self.dim for _ in range(len(texts) - len(out_vectors))])
-        return out_vectors[: len(texts)]
+    `model_dir` holds an `optimum-cli export onnx --model BAAI/bge-m3
+    --task feature-extraction` export (`model.onnx` + `tokenizer.json`).
+    With `quantize=True` a `model_int8.onnx` is created next to it on first
+    use. Texts are sorted by token length and padded per batch, and batches
+    run on a thread pool sharing one session. Pooling matches
+    `LocalBGEM3DenseEncoder` so vectors are interchangeable.
+    """
+
+    def __init__(
+        self,
+        model_dir: str = "models/bge-m3-onnx",
+        batch_size: int = 16,
+        max_length: int = 512,
+        workers: int = 0,
+        quantize: bool = True,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.model_dir = Path(model_dir)
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self.workers = workers if workers > 0 else max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.quantize = quantize
+        self.dim = 1024
+        self.cache = cache
+        self.model_id = f"{self.model_dir.name}{'-int8' if quantize else ''}"
+        self._ready = False
+        self._init_attempted = False
+        self._init_lock = threading.Lock()
+        self._np = None
+        self._session = None
+        self._tokenizer = None
+        self._input_names: List[str] = []
+        self._pad_id = 1
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _model_path(self) -> Path:
+        source = self.model_dir / "model.onnx"
+        if not self.quantize:
+            return source
+        target = self.model_dir / "model_int8.onnx"
+        if not target.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print(f"[INFO] Quantizing {source} -> {target} (int8, one-off)")
+            quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8, use_external_data_format=True)
+        return target
+
+    def _init_once(self) -> None:
+        if self._init_attempted:
+            return
+        with self._init_lock:
+            self._init_locked()
+
+    def _init_locked(self) -> None:
+        if self._init_attempted:
+            return
+        try:
+            self._load()
+        finally:
+            self._init_attempted = True
+
+    def _load(self) -> None:
+        try:
+            import numpy as np
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except Exception as exc:
+            print(f"[WARN] ONNX encoder unavailable: {exc}")
+            return
+
+        try:
+            tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.max_length)
+            tokenizer.no_padding()
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            session = ort.InferenceSession(
+                str(self._model_path()),
+                sess_options=options,
+                providers=["CPUExecutionProvider"],
+            )
+            self._np = np
+            self._tokenizer = tokenizer
+            self._session = session
+            self._input_names = [i.name for i in session.get_inputs()]
+            pad_id = tokenizer.token_to_id("<pad>")
+            self._pad_id = pad_id if pad_id is not None else 1
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="onnx-embed")
+            self._ready = True
+        except Exception as exc:
+            print(f"[WARN] ONNX encoder init failed ({self.model_dir}): {exc}")
+            self._ready = False
+
+    def _run_batch(self, encodings: List) -> List[List[float]]:
+        np = self._np
+        width = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), width), self._pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, enc in enumerate(encodings):
+            input_ids[row, : len(enc.ids)] = enc.ids
+            attention_mask[row, : len(enc.ids)] = 1
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        feeds = {k: v for k, v in feeds.items() if k in self._input_names}
+
+        output = self._session.run(None, feeds)[0]
+        if output.ndim == 3:
+            mask = attention_mask[..., None].astype(np.float32)
+            output = (output * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.clip(norms, 1e-12, None)).astype(np.float32).tolist()
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        if self.cache is not None:
+            return self.cache.encode(f"onnx:{self.model_id}:{self.max_length}", texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+
+    def _encode_uncached(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        self._init_once()
+        if not self._ready:
+            return [[0.0] * self.dim for _ in texts]
+
+        encodings = self._tokenizer.encode_batch([str(x or "") for x in texts])
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i].ids))
+        batches = [order[i : i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        results = self._pool.map(lambda idx: self._run_batch([encodings[i] for i in idx]), batches)
+
+        out_vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for idx, vectors in zip(batches, results):
+            for i, vector in zip(idx, vectors):
+                out_vectors[i] = vector
+        return out_vectors
 
 
 def _extract_json(text: str) -> Dict:
@@ -196,23 +543,38 @@ def _is_gpu_available() -> bool:
 
 
 class LocalQwenMetadataEnricher:
+    # Bump when the prompt or window handling changes; cached results are keyed by it.
+    PROMPT_VERSION = "qwen-v1"
+
     def __init__(
         self,
         model_id: str = "Qwen/Qwen2.5-14B-Instruct",
         max_new_tokens: int = 400,
         max_input_chars: int = 12000,
+        batch_tokens: int = 16384,
+        max_batch_size: int = 16,
     ):
         self.model_id = model_id
         self.max_new_tokens = max_new_tokens
         self.max_input_chars = max_input_chars
+        # Padded prompt tokens + new tokens per generate() call; halved on OOM.
+        self.batch_tokens = max(1024, batch_tokens)
+        self.max_batch_size = max(1, max_batch_size)
 
         self._ready = False
         self._init_attempted = False
+        # One model on the GPU: concurrent enrich workers take turns generating.
+        self._init_lock = threading.Lock()
+        self._generate_lock = threading.Lock()
         self._torch = None
         self._tokenizer = None
         self._model = None
 
     def _init_once(self) -> None:
+        with self._init_lock:
+            self._init_locked()
+
+    def _init_locked(self) -> None:
         if self._init_attempted:
             return
         self._init_attempted = True
@@ -228,6 +590,10 @@ class LocalQwenMetadataEnricher:
 
         try:
             tokenizer = AutoTokenizer.from_pretrained(self.model_id, use_fast=True)
+            # Batched generation needs left padding so every row ends at the prompt.
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
             model = AutoModelForCausalLM.from_pretrained(
                 self.model_id,
                 torch_dtype=torch.float16,
@@ -372,23 +738,119 @@ class LocalQwenMetadataEnricher:
                 return {}
         return {}
 
-    def enrich(self, title: str, content: str, date: str) -> Dict:
+    @staticmethod
+    def _is_oom(exc: Exception) -> bool:
+        return "out of memory" in str(exc).lower()
+
+    def _pack(self, order: List[int], lengths: List[int]) -> List[List[int]]:
+        """Group windows (sorted longest first) so rows * (longest prompt + new tokens) fits the budget."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        width = 0
+        for idx in order:
+            row_cost = lengths[idx] + self.max_new_tokens
+            new_width = max(width, row_cost)
+            if current and (
+                (len(current) + 1) * new_width > self.batch_tokens or len(current) >= self.max_batch_size
+            ):
+                batches.append(current)
+                current, new_width = [], row_cost
+            current.append(idx)
+            width = new_width
+        if current:
+            batches.append(current)
+        return batches
+
+    def _generate(self, prompts: List[str]) -> List[Dict]:
+        tokenized = self._tokenizer(
+            prompts, return_tensors="pt", padding=True, truncation=True, max_length=6144
+        )
+        tokenized = {k: v.to(self._model.device) for k, v in tokenized.items()}
+        with self._torch.no_grad():
+            outputs = self._model.generate(
+                **tokenized,
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+                temperature=0.0,
+                eos_token_id=self._tokenizer.eos_token_id,
+                pad_token_id=self._tokenizer.pad_token_id,
+            )
+        texts = self._tokenizer.batch_decode(
+            outputs[:, tokenized["input_ids"].shape[1] :], skip_special_tokens=True
+        )
+        return [_extract_json(text) for text in texts]
+
+    def _generate_safe(self, windows: List[Tuple[str, str, str]]) -> List[Dict]:
+        """Generate for (title, window, date) rows; split the batch on OOM, then shrink single inputs."""
+        try:
+            with self._generate_lock:
+                return self._generate([self._prompt(title=t, content=c, date=d) for t, c, d in windows])
+        except Exception as exc:
+            if self._torch is not None and self._torch.cuda.is_available():
+                self._torch.cuda.empty_cache()
+            if not self._is_oom(exc):
+                return [{} for _ in windows]
+        if len(windows) == 1:
+            title, window, date = windows[0]
+            with self._generate_lock:
+                return [self._infer_once(title=title, content=window, date=date)]
+        self.batch_tokens = max(1024, self.batch_tokens // 2)
+        print(f"[WARN] Qwen OOM with batch={len(windows)}; batch_tokens -> {self.batch_tokens}")
+        mid = len(windows) // 2
+        return self._generate_safe(windows[:mid]) + self._generate_safe(windows[mid:])
+
+    def enrich_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict]:
+        """Enrich (title, content, date) docs, packing windows of all docs into shared generate batches."""
         self._init_once()
         if not self._ready:
-            return {}
+            return [{} for _ in items]
 
-        content_text = content or ""
-        windows = self._split_windows(content_text, window_size=self.max_input_chars, overlap=1200)
-        merged: Dict = {}
+        windows: List[Tuple[int, Tuple[str, str, str]]] = []
+        for doc_idx, (title, content, date) in enumerate(items):
+            for window in self._split_windows(content or "", window_size=self.max_input_chars, overlap=1200):
+                windows.append((doc_idx, (title, window, date)))
+        if not windows:
+            return [{} for _ in items]
 
-        for window in windows:
-            parsed = self._infer_once(title=title, content=window, date=date)
-            merged = self._merge_metadata(merged, parsed)
+        prompts = [self._prompt(title=t, content=c, date=d) for _, (t, c, d) in windows]
+        lengths = [
+            len(ids)
+            for ids in self._tokenizer(prompts, truncation=True, max_length=6144)["input_ids"]
+        ]
+        order = sorted(range(len(windows)), key=lambda i: lengths[i], reverse=True)
+        parsed: List[Dict] = [{} for _ in windows]
+        for batch in self._pack(order, lengths):
+            for idx, result in zip(batch, self._generate_safe([windows[i][1] for i in batch])):
+                parsed[idx] = result
 
+        # Windows are merged per doc in content order, as in the one-doc path.
+        merged: List[Dict] = [{} for _ in items]
+        for (doc_idx, _), result in zip(windows, parsed):
+            merged[doc_idx] = self._merge_metadata(merged[doc_idx], result)
         return merged
 
+    def enrich(self, title: str, content: str, date: str) -> Dict:
+        return self.enrich_batch([(title, content, date)])[0]
+
+
+def _parse_reset_seconds(value: Optional[str]) -> float:
+    """Groq reset headers look like "7.66s", "2m59.56s", "1h2m3s" or "250ms"."""
+    if not value:
+        return 0.0
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value):
+        total += float(amount) * {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}[unit]
+    return total
+
 
 class GroqMetadataEnricher:
+    PROMPT_VERSION = "groq-v1"
+
     def __init__(
         self,
         api_key: str,
@@ -396,13 +858,16 @@ class GroqMetadataEnricher:
         timeout: int = 30,
         max_retries: int = 3,
         min_interval: float = 0.65,
+        requests_per_second: Optional[float] = None,
     ):
         self.api_key = api_key
         self.model = model
         self.timeout = timeout
         self.max_retries = max_retries
-        self.min_interval = min_interval
-        self.last_call = 0.0
+        if requests_per_second is None:
+            requests_per_second = 1.0 / min_interval if min_interval > 0 else 0.0
+        # Shared by every enrich worker thread (and process, see ingestion sharding).
+        self.bucket = bucket_for(GROQ_BUCKET, requests_per_second)
         self.url = "https://api.groq.com/openai/v1/chat/completions"
         self.session = requests.Session()
         self.headers = {
@@ -410,12 +875,19 @@ class GroqMetadataEnricher:
             "Content-Type": "application/json",
         }
 
-    def _rate_limit_wait(self) -> None:
-        now = time.time()
-        wait_s = self.min_interval - (now - self.last_call)
+    def _respect_rate_limit_headers(self, resp: requests.Response) -> None:
+        """Pause all callers when Groq says the request or token quota is spent."""
+        wait_s = _parse_reset_seconds(resp.headers.get("retry-after"))
+        for kind in ("requests", "tokens"):
+            remaining = resp.headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                exhausted = remaining is not None and int(float(remaining)) <= 0
+            except ValueError:
+                exhausted = False
+            if exhausted:
+                wait_s = max(wait_s, _parse_reset_seconds(resp.headers.get(f"x-ratelimit-reset-{kind}")))
         if wait_s > 0:
-            time.sleep(wait_s)
-        self.last_call = time.time()
+            self.bucket.pause(wait_s)
 
     def enrich(self, title: str, content: str, date: str) -> Dict:
         if not self.api_key:
@@ -438,7 +910,7 @@ class GroqMetadataEnricher:
         }
 
         for attempt in range(self.max_retries):
-            self._rate_limit_wait()
+            self.bucket.acquire()
             try:
                 resp = self.session.post(
                     self.url,
@@ -446,12 +918,14 @@ class GroqMetadataEnricher:
                     json=payload,
                     timeout=self.timeout,
                 )
+                self._respect_rate_limit_headers(resp)
                 if resp.status_code < 400:
                     out = resp.json()
                     text = out.get("choices", [{}])[0].get("message", {}).get("content", "")
                     return _extract_json(text)
                 if resp.status_code == 429 or 500 <= resp.status_code < 600:
-                    time.sleep(min(2 ** attempt, 8))
+                    if resp.status_code != 429 or not resp.headers.get("retry-after"):
+                        time.sleep(min(2 ** attempt, 8))
                     continue
                 return {}
             except requests.RequestException:
@@ -462,38 +936,152 @@ class GroqMetadataEnricher:
 
 
 class ConditionalMetadataEnricher:
-    """GPU server: local Qwen, non-GPU server: Groq."""
+    """GPU server: local Qwen, non-GPU server: Groq.
 
-    def __init__(self, groq_api_key: Optional[str] = None, qwen_model_id: Optional[str] = None):
+    Results are cached by (model, prompt version, content hash) at
+    `METADATA_CACHE_PATH` (set it to an empty string to disable).
+    """
+
+    def __init__(
+        self,
+        groq_api_key: Optional[str] = None,
+        qwen_model_id: Optional[str] = None,
+        cache_path: Optional[str] = None,
+    ):
         self.is_gpu = _is_gpu_available()
         self.backend = "qwen_local" if self.is_gpu else "groq"
+        if cache_path is None:
+            cache_path = os.getenv("METADATA_CACHE_PATH", ".ingestion_cache/metadata.sqlite3")
+        self.cache = open_metadata_cache(cache_path)
 
         if self.is_gpu:
             model_id = qwen_model_id or os.getenv("LOCAL_LLM_ID", "Qwen/Qwen2.5-14B-Instruct")
-            self.impl = LocalQwenMetadataEnricher(model_id=model_id)
+            self.impl = LocalQwenMetadataEnricher(
+                model_id=model_id,
+                batch_tokens=int(os.getenv("LOCAL_LLM_BATCH_TOKENS", 16384)),
+                max_batch_size=int(os.getenv("LOCAL_LLM_MAX_BATCH", 16)),
+            )
+            self.model_id = f"qwen_local:{model_id}"
         else:
-            self.impl = GroqMetadataEnricher(api_key=groq_api_key or "")
+            self.impl = GroqMetadataEnricher(
+                api_key=groq_api_key or "",
+                requests_per_second=float(os.getenv("GROQ_RPS", 1.5)),
+            )
+            self.model_id = f"groq:{self.impl.model}"
+        self.prompt_version = self.impl.PROMPT_VERSION
+
+    @property
+    def supports_batch(self) -> bool:
+        """True when enrich_batch packs many docs into one model call (local Qwen)."""
+        return hasattr(self.impl, "enrich_batch")
 
     def enrich(self, title: str, content: str, date: str) -> Dict:
-        return self.impl.enrich(title=title, content=content, date=date)
+        return self.enrich_batch([(title, content, date)])[0]
+
+    def enrich_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(items)
+        keys: List[str] = []
+        if self.cache is not None:
+            for i, (title, content, date) in enumerate(items):
+                key = content_key(title, content, date)
+                keys.append(key)
+                results[i] = self.cache.get(self.model_id, self.prompt_version, key)
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            todo = [items[i] for i in missing]
+            if self.supports_batch:
+                fresh = self.impl.enrich_batch(todo)
+            else:
+                fresh = [self.impl.enrich(title=t, content=c, date=d) for t, c, d in todo]
+            for i, result in zip(missing, fresh):
+                results[i] = result
+                if self.cache is not None:
+                    self.cache.put(self.model_id, self.prompt_version, keys[i], result)
+        return [result or {} for result in results]
 
 
 class ConditionalDenseEncoder:
-    """GPU server: local BGE-M3 (FP16), non-GPU server: Cloudflare BGE-M3."""
+    """GPU server: local BGE-M3 (FP16), non-GPU server: Cloudflare BGE-M3.
 
-    def __init__(self, cf_account_id: Optional[str] = None, cf_api_token: Optional[str] = None):
+    `DENSE_BACKEND` (auto | local_gpu | cloudflare | onnx_cpu) overrides the
+    choice; `auto` falls back to the ONNX CPU backend when no Cloudflare
+    credentials are set. All backends share the persistent embedding cache at
+    `EMBEDDING_CACHE_PATH` (set it to an empty string to disable).
+    """
+
+    def __init__(
+        self,
+        cf_account_id: Optional[str] = None,
+        cf_api_token: Optional[str] = None,
+        cache_path: Optional[str] = None,
+        backend: Optional[str] = None,
+    ):
         self.is_gpu = _is_gpu_available()
-        self.backend = "bge_m3_local_fp16" if self.is_gpu else "cloudflare_bge_m3"
         self.dim = 1024
+        if cache_path is None:
+            cache_path = os.getenv("EMBEDDING_CACHE_PATH", ".ingestion_cache/embeddings.sqlite3")
+        self.cache = open_cache(
+            cache_path,
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 500000)),
+        )
 
-        if self.is_gpu:
+        choice = (backend or os.getenv("DENSE_BACKEND", "auto")).strip().lower()
+        if choice == "auto":
+            if self.is_gpu:
+                choice = "local_gpu"
+            elif cf_account_id and cf_api_token:
+                choice = "cloudflare"
+            else:
+                choice = "onnx_cpu"
+
+        if choice == "local_gpu":
+            self.backend = "bge_m3_local_fp16"
             model_id = os.getenv("LOCAL_DENSE_MODEL_ID", "BAAI/bge-m3")
-            self.impl = LocalBGEM3DenseEncoder(model_id=model_id)
+            self.model_id = f"local:{model_id}"
+            self.impl = LocalBGEM3DenseEncoder(
+                model_id=model_id,
+                max_tokens=int(os.getenv("LOCAL_DENSE_MAX_TOKENS", 8192)),
+                cache=self.cache,
+            )
             return
 
+        if choice == "onnx_cpu":
+            quantize = os.getenv("LOCAL_ONNX_QUANTIZE", "1").strip().lower() not in ("0", "false", "no")
+            self.backend = "bge_m3_onnx_int8" if quantize else "bge_m3_onnx_fp32"
+            self.impl = OnnxBGEM3DenseEncoder(
+                model_dir=os.getenv("LOCAL_ONNX_MODEL_DIR", "models/bge-m3-onnx"),
+                batch_size=int(os.getenv("LOCAL_ONNX_BATCH_SIZE", 16)),
+                workers=int(os.getenv("LOCAL_ONNX_WORKERS", 0)),
+                quantize=quantize,
+                cache=self.cache,
+            )
+            self.model_id = f"onnx:{self.impl.model_id}"
+            return
+
+        if choice != "cloudflare":
+            raise ValueError(f"Unknown DENSE_BACKEND: {choice}")
         if not cf_account_id or not cf_api_token:
-            raise ValueError("Cloudflare credentials are required on non-GPU server.")
-        self.impl = CloudflareDenseEncoder(account_id=cf_account_id, api_token=cf_api_token)
+            raise ValueError("Cloudflare credentials are required for the cloudflare backend.")
+        self.backend = "cloudflare_bge_m3"
+        self.model_id = "cloudflare:@cf/baai/bge-m3"
+        if os.getenv("CF_EMBED_ASYNC", "1").strip().lower() in ("0", "false", "no"):
+            self.impl = CloudflareDenseEncoder(
+                account_id=cf_account_id,
+                api_token=cf_api_token,
+                requests_per_second=float(os.getenv("CF_EMBED_RPS", 20)),
+                cache=self.cache,
+            )
+            return
+        self.backend = "cloudflare_bge_m3_async"
+        self.impl = AsyncCloudflareDenseEncoder(
+            account_id=cf_account_id,
+            api_token=cf_api_token,
+            sub_batch_size=int(os.getenv("CF_EMBED_SUB_BATCH", 8)),
+            max_in_flight=int(os.getenv("CF_EMBED_MAX_IN_FLIGHT", 8)),
+            requests_per_second=float(os.getenv("CF_EMBED_RPS", 20)),
+            cache=self.cache,
+        )
 
     def encode(self, texts: List[str]) -> List[List[float]]:
         return self.impl.encode(texts)
@@ -1,143 +1,65 @@
 import argparse
 import hashlib
 import json
+import multiprocessing
 import os
 import random
 import re
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 
 from src.core.config import settings
-from src.etl.encoders import ConditionalDenseEncoder, ConditionalMetadataEnricher
+from src.core.database import get_client
+from src.etl.chunking import CHUNKERS, Chunk, build_chunker
+from src.etl.collection_profiles import PROFILES, get_profile, record_profile, recorded_profile
+from src.etl.encoders import (
+    CF_EMBED_BUCKET,
+    GROQ_BUCKET,
+    ConditionalDenseEncoder,
+    ConditionalMetadataEnricher,
+)
+from src.etl.embedding_cache import is_failed_embedding
+from src.etl.layout import (
+    LAYOUTS,
+    ensure_parents_collection,
+    parent_id_for,
+    parent_record,
+    parents_collection,
+    slim_child_payload,
+)
+from src.etl.payload_indexes import ensure_payload_indexes
+from src.etl.pipeline import Stage, run_pipeline
+from src.etl.rate_limit import SharedTokenBucket, install_shared_bucket
+from src.etl.rule_extractor import RULES_VERSION, extract as extract_rule_fields
+from src.etl.sparse import SPARSE_BACKENDS, SparseVectorizer, ensure_idf_modifier
+from src.etl.state_store import IngestionStateStore, state_path_for
 from src.etl.utils import (
     build_bm25_text,
-    chunk_text,
-    classify_block_type,
     deterministic_uuid,
-    iter_jsonl,
     iter_metadata_files,
+    iter_notice_keys,
+    iter_notice_rows_at,
+    normalize_lines,
     normalize_whitespace,
 )
 
+# Optimizer indexing threshold restored after a bulk load (Qdrant default).
+INDEXING_THRESHOLD_KB = 10000
+DENSE_DIM = 1024
+# Payload flag of points upserted without a dense vector (queued for --retry-failed).
+DENSE_FAILED_KEY = "dense_failed"
+DENSE_FAILED_ERROR = "dense encoder returned an all-zero or malformed vector"
 
-@dataclass
-class Chunk:
-    text: str
-    level: str
-    block_type: str
-    chunk_type: str
-    section_header: str
-    node_path: str
-    parent_path: str
-    node_type: str
-    parent_index: int
-    chunk_index: int
-    total_chunks: int
-    parent_text: str
-
-
-class KoreanNoticeChunker:
-    def __init__(self, chunk_size: int = 900):
-        self.chunk_size = chunk_size
-
-    @staticmethod
-    def _split_sections(text: str) -> List[Tuple[int, str, str]]:
-        lines = text.split("\n")
-        sections: List[Tuple[str, List[str]]] = []
-        current_header = "본문"
-        current_lines: List[str] = []
-        header_pattern = re.compile(
-            r"^\s*(?:\d+[.)]|[가-힣A-Za-z]{1,20}\s*[:.)]|[■●◆▶▷※]+|[0-9]+\s*-\s*)"
-        )
-
-        for line in lines:
-            ln = line.strip()
-            if not ln:
-                continue
-            is_header = len(ln) <= 60 and bool(header_pattern.match(ln))
-            if is_header:
-                if current_lines:
-                    sections.append((current_header, current_lines))
-                current_header = ln[:60]
-                current_lines = []
-            else:
-                current_lines.append(ln)
-
-        if current_lines:
-            sections.append((current_header, current_lines))
 
-        if not sections:
-            sections = [("본문", [text])]
-
-        return [
-            (s_idx, header, "\n".join(body_lines))
-            for s_idx, (header, body_lines) in enumerate(sections)
-        ]
-
-    @staticmethod
-    def _detect_node_type(text: str) -> str:
-        s = text.strip()
-        if re.match(r"^(\-|\*|\d+[.)])\s+", s):
-            return "list_item"
-        if "|" in s and len(s) < 500:
-            return "table_row"
-        return "paragraph"
-
-    def chunk(self, text: str, title: str = "") -> List[Chunk]:
-        sections = self._split_sections(text)
-        chunks: List[Chunk] = []
-
-        for s_idx, header, section_text in sections:
-            section_header = header or (title[:60] if title else "본문")
-            section_text_for_parent = section_text.strip() or section_header
-            pieces = chunk_text(section_text_for_parent, chunk_size=self.chunk_size, overlap=120)
-            if not pieces:
-                pieces = [section_text_for_parent]
-
-            parent_block_type = classify_block_type(section_header, section_text_for_parent)
-            chunks.append(
-                Chunk(
-                    text=section_text_for_parent,
-                    level="parent",
-                    block_type=parent_block_type,
-                    chunk_type="parent",
-                    section_header=section_header,
-                    node_path=f"s{s_idx}",
-                    parent_path=f"s{s_idx}",
-                    node_type="section",
-                    parent_index=s_idx,
-                    chunk_index=0,
-                    total_chunks=len(pieces),
-                    parent_text=section_text_for_parent,
-                )
-            )
-
-            for p_idx, piece in enumerate(pieces):
-                node_type = self._detect_node_type(piece)
-                block_type = classify_block_type(section_header, piece)
-                chunks.append(
-                    Chunk(
-                        text=piece,
-                        level="child",
-                        block_type=block_type,
-                        chunk_type=node_type,
-                        section_header=section_header,
-                        node_path=f"s{s_idx}.n{p_idx}",
-                        parent_path=f"s{s_idx}",
-                        node_type=node_type,
-                        parent_index=s_idx,
-                        chunk_index=p_idx,
-                        total_chunks=len(pieces),
-                        parent_text=section_text_for_parent,
-                    )
-                )
-
-        return chunks
+def bulk_collection_name(alias: str) -> str:
+    """Physical collection a --bulk-load rebuild of `alias` is written to."""
+    return f"{alias}_{time.strftime('%Y%m%d_%H%M%S')}"
 
 
 class QdrantIngestor:
@@ -150,113 +72,135 @@ class QdrantIngestor:
         qdrant_timeout: float,
         upsert_max_retries: int,
         skip_unchanged: bool,
+        enrich_workers: int = 1,
+        chunk_workers: int = 1,
+        embed_workers: int = 2,
+        upsert_workers: int = 2,
+        queue_size: int = 4,
+        enrich_batch_docs: int = 16,
+        dense_backend: Optional[str] = None,
+        sparse_backend: Optional[str] = None,
+        chunker: Optional[str] = None,
+        layout: Optional[str] = None,
+        profile: Optional[str] = None,
+        bulk_load: bool = False,
+        target_collection: Optional[str] = None,
+        workers: int = 1,
+        ensure_collection: bool = True,
     ):
+        # Constructor arguments, re-used to build one ingestor per worker process.
+        self._init_kwargs = {
+            k: v for k, v in locals().items() if k not in ("self", "workers", "ensure_collection")
+        }
+        self.workers = max(1, workers)
         self.input_dir = input_dir
+        # collection_name is what readers query (an alias after a bulk load);
+        # points are written to write_collection.
         self.collection_name = collection_name
+        self.bulk_load = bool(bulk_load)
+        self.write_collection = target_collection or (
+            bulk_collection_name(collection_name) if self.bulk_load else collection_name
+        )
+        self._init_kwargs["target_collection"] = self.write_collection
         self.batch_size = batch_size
         self.qdrant_timeout = qdrant_timeout
         self.upsert_max_retries = upsert_max_retries
         self.skip_unchanged = bool(skip_unchanged)
+        self.enrich_workers = max(1, enrich_workers)
+        self.chunk_workers = max(1, chunk_workers)
+        self.embed_workers = max(1, embed_workers)
+        self.upsert_workers = max(1, upsert_workers)
+        if self.bulk_load:
+            # Nothing is indexed while loading, so upserts can run wide.
+            self.upsert_workers = max(self.upsert_workers, 4)
+        self.queue_size = max(1, queue_size)
+        self.enrich_batch_docs = max(1, enrich_batch_docs)
+        self._lock = threading.Lock()
+        self._pending_chunks: Dict[str, int] = {}
+        self._stats: Dict[str, int] = {}
         self.upsert_base_delay_seconds = max(settings.QDRANT_UPSERT_BASE_DELAY_SECONDS, 0.1)
-        self.chunker = KoreanNoticeChunker(chunk_size=settings.CHUNK_SIZE)
-        self._doc_fingerprint_cache_path = self._build_cache_path()
-        self._doc_fingerprints: Dict[str, str] = (
-            self._load_doc_fingerprints() if self.skip_unchanged else {}
-        )
+        self.chunker = build_chunker(chunker)
+        self.layout = (layout or settings.COLLECTION_LAYOUT).strip().lower()
+        if self.layout not in LAYOUTS:
+            raise ValueError(f"Unknown collection layout: {self.layout} (expected one of {', '.join(LAYOUTS)})")
+        # Storage / HNSW / quantization profile of collections this run creates.
+        self.profile_name = (profile or settings.COLLECTION_PROFILE).strip().lower()
+        self.profile = get_profile(self.profile_name)
+        print(f"[INFO] Chunker={self.chunker.name} {self.chunker.fingerprint_params()}")
+        # A bulk load starts from an empty state of its own; it replaces the
+        # alias state only once the alias points at the new collection.
+        state_name = self.write_collection if self.bulk_load else self.collection_name
+        self.state = IngestionStateStore(state_path_for(state_name, self.input_dir))
+        self._doc_fingerprints: Dict[str, str] = self.state.fingerprints()
+        self._doc_blocks: Dict[str, List[str]] = self.state.block_ids()
+        self._pending_blocks: Dict[str, List[str]] = {}
+        self._seen_doc_ids: set = set()
+        print(f"[INFO] Loaded ingestion state docs={len(self._doc_fingerprints)} from {self.state.path}")
+        # Re-upserted or deleted points leave the retry queue; skip that bookkeeping while it is empty.
+        self._retry_queue_active = self.state.failed_embedding_count() > 0
 
         cf_account_id = os.getenv("CF_ACCOUNT_ID") or settings.CLOUDFLARE_ACCOUNT_ID
         cf_api_token = os.getenv("CF_API_TOKEN") or settings.CLOUDFLARE_API_TOKEN
         self.dense_encoder = ConditionalDenseEncoder(
             cf_account_id=cf_account_id,
             cf_api_token=cf_api_token,
+            backend=dense_backend,
         )
         print(f"[INFO] Dense encoder backend={self.dense_encoder.backend}")
+        self.embedding_model = self.dense_encoder.model_id
+        self.sparse = SparseVectorizer(sparse_backend)
+        print(f"[INFO] Sparse encoder backend={self.sparse.backend}")
 
         self.metadata_enricher: Optional[ConditionalMetadataEnricher] = None
         if enable_metadata:
             self.metadata_enricher = ConditionalMetadataEnricher(groq_api_key=settings.GROQ_API_KEY)
             print(f"[INFO] Metadata enricher backend={self.metadata_enricher.backend}")
-
-        self.client = QdrantClient(
-            url=settings.QDRANT_URL,
-            api_key=settings.QDRANT_API_KEY,
-            timeout=self.qdrant_timeout,
-            cloud_inference=True,
-        )
-        self._ensure_collection()
-
-    def _build_cache_path(self) -> Path:
-        cache_root = Path(".ingestion_cache")
-        cache_root.mkdir(parents=True, exist_ok=True)
-        safe_collection = re.sub(r"[^A-Za-z0-9._-]", "_", self.collection_name)
-        input_hash = hashlib.sha1(
-            str(Path(self.input_dir).resolve()).encode("utf-8")
-        ).hexdigest()[:10]
-        return cache_root / f"{safe_collection}_{input_hash}.json"
-
-    def _load_doc_fingerprints(self) -> Dict[str, str]:
-        path = self._doc_fingerprint_cache_path
-        if not path.exists():
-            return {}
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            print(f"[WARN] Fingerprint cache load failed: {path}")
-            return {}
-        if not isinstance(data, dict):
-            return {}
-        out: Dict[str, str] = {}
-        for key, value in data.items():
-            doc_id = str(key).strip()
-            fp = str(value).strip()
-            if doc_id and fp:
-                out[doc_id] = fp
-        print(f"[INFO] Loaded fingerprint cache docs={len(out)} from {path}")
-        return out
-
-    def _save_doc_fingerprints(self) -> None:
-        if not self.skip_unchanged:
-            return
-        path = self._doc_fingerprint_cache_path
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        try:
-            tmp.write_text(
-                json.dumps(self._doc_fingerprints, ensure_ascii=False, sort_keys=True),
-                encoding="utf-8",
-            )
-            tmp.replace(path)
-            print(f"[INFO] Saved fingerprint cache docs={len(self._doc_fingerprints)} to {path}")
-        except OSError as exc:
-            print(f"[WARN] Fingerprint cache save failed: {exc}")
+        # Local Qwen packs windows of many docs into one generate call, so rows are batched first.
+        self._batch_enrich = bool(self.metadata_enricher and self.metadata_enricher.supports_batch)
+        self.rule_confidence_threshold = settings.RULE_CONFIDENCE_THRESHOLD
+
+        self.client = get_client(timeout=self.qdrant_timeout, cloud_inference=self.sparse.needs_cloud_inference)
+        if ensure_collection:
+            if self.bulk_load:
+                self._create_collection(self.write_collection, deferred_indexing=True)
+            else:
+                self._ensure_collection()
 
     def _ensure_collection(self) -> None:
-        quantization = models.ScalarQuantization(
-            scalar=models.ScalarQuantizationConfig(
-                type=models.ScalarType.INT8,
-                quantile=0.99,
-                always_ram=True,
-            )
-        )
-
         if self.client.collection_exists(self.collection_name):
-            try:
-                self.client.update_collection(
-                    collection_name=self.collection_name,
-                    quantization_config=quantization,
-                )
-                print("[INFO] Applied Qdrant scalar int8 quantization to existing collection")
-            except Exception as exc:
-                print(f"[WARN] Could not update quantization for existing collection: {exc}")
+            # Storage/index settings of an existing collection change only through
+            # `python -m src.etl.collection_profiles apply`.
+            recorded = recorded_profile(self.client, self.collection_name)
+            if recorded != self.profile_name:
+                print(f"[INFO] Collection {self.collection_name} profile={recorded or 'unrecorded'} (not re-applied)")
+            ensure_idf_modifier(self.client, self.collection_name)
+            ensure_payload_indexes(self.client, self.collection_name)
+            if self.layout == "slim":
+                ensure_parents_collection(self.client, self.collection_name)
             return
+        self._create_collection(self.collection_name)
+
+    def _create_collection(self, name: str, deferred_indexing: bool = False) -> None:
+        """Create the notice collection; `deferred_indexing` builds no HNSW graph until re-enabled."""
+        hnsw = self.profile.hnsw_config()
+        if deferred_indexing:
+            hnsw.m = 0
         self.client.create_collection(
-            collection_name=self.collection_name,
-            vectors_config={
-                "dense": models.VectorParams(size=1024, distance=models.Distance.COSINE)
-            },
-            sparse_vectors_config={"sparse": models.SparseVectorParams()},
-            quantization_config=quantization,
+            collection_name=name,
+            vectors_config={"dense": self.profile.dense_params()},
+            sparse_vectors_config={"sparse": self.profile.sparse_params()},
+            quantization_config=self.profile.quantization_config(),
+            hnsw_config=hnsw,
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0) if deferred_indexing else None,
         )
-        print("[INFO] Created collection with Qdrant scalar int8 quantization")
+        record_profile(self.client, name, self.profile_name)
+        if deferred_indexing:
+            print(f"[INFO] Created bulk-load collection {name} profile={self.profile_name} (indexing deferred)")
+        else:
+            print(f"[INFO] Created collection {name} profile={self.profile_name}")
+        ensure_payload_indexes(self.client, name)
+        if self.layout == "slim":
+            ensure_parents_collection(self.client, name)
 
     @staticmethod
     def _first_non_empty(row: Dict, keys: List[str], default: str = "") -> str:
@@ -273,13 +217,14 @@ class QdrantIngestor:
         except (TypeError, ValueError):
             return default
 
-    def _resolve_content(self, row: Dict) -> str:
+    def _resolve_content(self, row: Dict, keep_lines: bool = False) -> str:
+        normalize = normalize_lines if keep_lines else normalize_whitespace
         normalized = row.get("normalized", {})
         if isinstance(normalized, dict):
-            content = normalize_whitespace(normalized.get("content", ""))
+            content = normalize(normalized.get("content", ""))
             if content:
                 return content
-        return normalize_whitespace(row.get("content", ""))
+        return normalize(row.get("content", ""))
 
     def _resolve_title(self, row: Dict) -> str:
         normalized = row.get("normalized", {})
@@ -312,7 +257,7 @@ class QdrantIngestor:
         date_value = self._resolve_date(row)
         attachments = self._resolve_attachments(row)
 
-        return {
+        payload = {
             "doc_id": self._first_non_empty(row, ["doc_id"], ""),
             "domain": self._first_non_empty(row, ["domain"], "notice"),
             "source_type": self._first_non_empty(row, ["source_type"], ""),
@@ -334,6 +279,10 @@ class QdrantIngestor:
             "dept": dept_id,
             "school": school_id,
         }
+        for key in ("contact", "fees", "required_docs"):
+            if row.get(key):
+                payload[key] = row[key]
+        return payload
 
     @staticmethod
     def _normalize_deadline_datetime(raw_value: str) -> Optional[str]:
@@ -472,20 +421,20 @@ class QdrantIngestor:
         }
 
     def _build_points(self, rows: List[Tuple[Dict, Chunk]]) -> List[models.PointStruct]:
-        texts = [chunk.text for _, chunk in rows]
-        dense_vectors = self.dense_encoder.encode(texts)
+        """Vector points of the batch; in the slim layout parents become payload-only parent records."""
+        slim = self.layout == "slim"
+        texts = [chunk.text for _, chunk in rows if not (slim and chunk.level == "parent")]
+        dense_vectors = self.dense_encoder.encode(texts) if texts else []
         points: List[models.PointStruct] = []
 
-        for idx, (row, chunk) in enumerate(rows):
+        idx = 0
+        for row, chunk in rows:
             payload = self._base_payload(row)
             doc_id = payload.get("doc_id", "") or deterministic_uuid(
                 [payload["url"], payload["date"], payload["dept_id"], payload["title"]],
                 separator="|",
             )
-            parent_id = deterministic_uuid(
-                [doc_id, chunk.section_header, str(chunk.parent_index)],
-                separator="|",
-            )
+            parent_id = parent_id_for(doc_id, chunk.section_header, chunk.parent_index)
             block_id = deterministic_uuid(
                 [parent_id, chunk.block_type, str(chunk.chunk_index), chunk.level],
                 separator="|",
@@ -507,6 +456,9 @@ class QdrantIngestor:
                     "chunk_index": chunk.chunk_index,
                 }
             )
+            if chunk.source_span is not None:
+                payload["source_span"] = list(chunk.source_span)
+                payload["token_count"] = chunk.token_count
 
             bm25_text = build_bm25_text(
                 title=payload["title"],
@@ -515,16 +467,27 @@ class QdrantIngestor:
             )
             payload["bm25_text"] = bm25_text
 
-            dense_vec = dense_vectors[idx] if idx < len(dense_vectors) else [0.0] * 1024
+            if slim and chunk.level == "parent":
+                points.append(models.PointStruct(id=parent_id, vector={}, payload=parent_record(payload, parent_id)))
+                continue
+
+            dense_vec = dense_vectors[idx] if idx < len(dense_vectors) else None
+            idx += 1
+            if hasattr(dense_vec, "tolist"):
+                dense_vec = dense_vec.tolist()
+            vector = {"sparse": self.sparse.document(bm25_text)}
+            if is_failed_embedding(dense_vec, DENSE_DIM):
+                # A zero vector would be indexed as a real point; upsert sparse-only
+                # and leave the dense vector to --retry-failed.
+                payload[DENSE_FAILED_KEY] = True
+            else:
+                vector["dense"] = dense_vec
 
             points.append(
                 models.PointStruct(
                     id=block_id,
-                    vector={
-                        "dense": dense_vec,
-                        "sparse": models.Document(text=bm25_text, model="qdrant/bm25"),
-                    },
-                    payload=payload,
+                    vector=vector,
+                    payload=slim_child_payload(payload) if slim else payload,
                 )
             )
         return points
@@ -573,11 +536,11 @@ class QdrantIngestor:
                 return True
         return False
 
-    def _upsert_with_retry(self, points: List[models.PointStruct]) -> None:
+    def _call_with_retry(self, action: str, fn) -> None:
         max_retries = self.upsert_max_retries
         for attempt in range(max_retries + 1):
             try:
-                self.client.upsert(collection_name=self.collection_name, points=points, wait=False)
+                fn()
                 return
             except Exception as exc:
                 status_code = self._status_code_from_error(exc)
@@ -588,12 +551,71 @@ class QdrantIngestor:
                 sleep_seconds = min((2 ** attempt) * self.upsert_base_delay_seconds, 12.0)
                 sleep_seconds += random.uniform(0.0, 0.25)
                 print(
-                    f"[WARN] Upsert retry attempt={attempt + 1}/{max_retries} "
+                    f"[WARN] {action} retry attempt={attempt + 1}/{max_retries} "
                     f"status={status_code} sleep={sleep_seconds:.2f}s "
                     f"error={exc.__class__.__name__}"
                 )
                 time.sleep(sleep_seconds)
 
+    def _upsert_with_retry(self, points: List[models.PointStruct]) -> None:
+        if self.layout == "slim":
+            parents = [p for p in points if p.payload.get("level") == "parent"]
+            points = [p for p in points if p.payload.get("level") != "parent"]
+            if parents:
+                self._call_with_retry(
+                    "Upsert parents",
+                    lambda: self.client.upsert(
+                        collection_name=parents_collection(self.write_collection), points=parents, wait=False
+                    ),
+                )
+        if points:
+            self._call_with_retry(
+                "Upsert",
+                lambda: self.client.upsert(collection_name=self.write_collection, points=points, wait=False),
+            )
+
+    def _delete_stale_points(self, stale_ids: List[str], rescan_doc_ids: List[str], keep: Dict[str, List[str]]) -> None:
+        """Delete points no longer produced by their doc.
+
+        `stale_ids` come from the block index. Docs changed since before the
+        index existed (`rescan_doc_ids`) are cleaned by filter: every point of
+        the doc except the block ids just written (`keep`).
+        """
+        # Stale ids may be children or (slim layout) parents; deleting a missing id is a no-op.
+        targets = [self.write_collection]
+        if self.layout == "slim":
+            targets.append(parents_collection(self.write_collection))
+        if stale_ids:
+            for name in targets:
+                self._call_with_retry(
+                    "Delete",
+                    lambda name=name: self.client.delete(
+                        collection_name=name,
+                        points_selector=models.PointIdsList(points=stale_ids),
+                        wait=False,
+                    ),
+                )
+            self._count("deleted_points", len(stale_ids))
+            if self._retry_queue_active:
+                self.state.clear_failed_embeddings(stale_ids)
+        for doc_id in rescan_doc_ids:
+            must_not = [models.HasIdCondition(has_id=keep[doc_id])] if keep.get(doc_id) else []
+            selector = models.FilterSelector(
+                filter=models.Filter(
+                    must=[models.FieldCondition(key="doc_id", match=models.MatchValue(value=doc_id))],
+                    must_not=must_not,
+                )
+            )
+            for name in targets:
+                self._call_with_retry(
+                    "Delete",
+                    lambda name=name: self.client.delete(
+                        collection_name=name,
+                        points_selector=selector,
+                        wait=False,
+                    ),
+                )
+
     def _row_doc_id(self, row: Dict) -> str:
         existing = str(row.get("doc_id", "")).strip()
         if existing:
@@ -625,33 +647,352 @@ class QdrantIngestor:
             "deadline_confidence": confidence,
             "deadlines": row.get("deadlines", []),
             "attachments": self._resolve_attachments(row),
-            "chunk_size": self.chunker.chunk_size,
         }
+        canonical.update(self.chunker.fingerprint_params())
+        canonical["rules"] = RULES_VERSION
+        if self.layout != "full":
+            canonical["layout"] = self.layout
         raw = json.dumps(canonical, ensure_ascii=False, sort_keys=True, default=str)
         return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-    def _update_fingerprint_cache_from_batch(self, rows: List[Tuple[Dict, Chunk]]) -> None:
-        if not self.skip_unchanged:
-            return
-        for row, _ in rows:
-            doc_id = str(row.get("doc_id", "")).strip()
-            fp = str(row.get("_fingerprint", "")).strip()
-            if doc_id and fp:
-                self._doc_fingerprints[doc_id] = fp
-
-    def _iter_latest_rows(self, file_path) -> List[Dict]:
-        latest: Dict[str, Dict[str, object]] = {}
-        for order, row in enumerate(iter_jsonl(file_path)):
-            doc_id = self._row_doc_id(row)
-            version = self._safe_int(row.get("version", 1), default=1)
+    def _update_fingerprint_cache_from_batch(
+        self, rows: List[Tuple[Dict, Chunk]], points: List[models.PointStruct]
+    ) -> Tuple[List[Tuple[str, str, List[str]]], List[str], List[str], Dict[str, List[str]]]:
+        """Collect docs whose last pending chunk is in this upserted batch.
+
+        Returns (completed (doc_id, fingerprint, block_ids), stale point ids,
+        doc ids to clean by filter, block ids kept per such doc).
+        """
+        completed: List[Tuple[str, str, List[str]]] = []
+        stale: List[str] = []
+        rescan: List[str] = []
+        keep: Dict[str, List[str]] = {}
+        with self._lock:
+            for (row, _), point in zip(rows, points):
+                doc_id = str(row.get("doc_id", "")).strip()
+                self._pending_blocks.setdefault(doc_id, []).append(str(point.id))
+                remaining = self._pending_chunks.get(doc_id, 0) - 1
+                if remaining > 0:
+                    self._pending_chunks[doc_id] = remaining
+                    continue
+                self._pending_chunks.pop(doc_id, None)
+
+                new_blocks = self._pending_blocks.pop(doc_id)
+                old_blocks = self._doc_blocks.get(doc_id)
+                if old_blocks is not None:
+                    current = set(new_blocks)
+                    stale.extend(b for b in old_blocks if b not in current)
+                elif row.get("_previously_ingested"):
+                    rescan.append(doc_id)
+                    keep[doc_id] = new_blocks
+                self._doc_blocks[doc_id] = sorted(set(new_blocks))
+
+                fp = str(row.get("_fingerprint", "")).strip()
+                if doc_id and fp:
+                    self._doc_fingerprints[doc_id] = fp
+                completed.append((doc_id, fp, new_blocks))
+        return completed, stale, rescan, keep
+
+    def _count(self, key: str, n: int = 1) -> int:
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + n
+            return self._stats[key]
+
+    def _iter_latest_rows(self, file_path) -> Iterator[Dict]:
+        """Newest version of each doc, in file order.
+
+        Pass one decodes only the doc id / version fields and remembers the
+        byte offset of each doc's winning line; pass two seeks to and fully
+        decodes just those lines, so memory holds one content at a time.
+        """
+        latest: Dict[str, Tuple[int, int]] = {}
+        for offset, key_row in iter_notice_keys(file_path):
+            doc_id = self._row_doc_id(key_row)
+            version = self._safe_int(key_row.get("version", 1), default=1)
             prev = latest.get(doc_id)
-            if (not prev) or version > int(prev["version"]) or (
-                version == int(prev["version"]) and order > int(prev["order"])
-            ):
-                latest[doc_id] = {"version": version, "order": order, "row": row}
+            # Later lines win ties, matching append order.
+            if prev is None or version >= prev[0]:
+                latest[doc_id] = (version, offset)
+
+        offsets = sorted(offset for _, offset in latest.values())
+        latest.clear()
+        return iter_notice_rows_at(file_path, offsets)
+
+    def _iter_source_rows(self, files: List[Path]):
+        for file_path in files:
+            print(f"[INFO] Processing: {file_path}")
+            for row in self._iter_latest_rows(file_path):
+                yield row
+
+    def _prepare_row(self, row: Dict) -> List[Dict]:
+        self._count("docs")
+        title = self._resolve_title(row)
+        content = self._resolve_content(row) or title
+        date = self._resolve_date(row)
+        if self.chunker.keeps_lines:
+            # Same offsets as `content`, so chunk source spans index the stored content.
+            row["_chunk_text"] = self._resolve_content(row, keep_lines=True) or title
+        row["content"] = content
+        doc_id = self._row_doc_id(row)
+        row["doc_id"] = doc_id
+        row["_fingerprint"] = self._row_fingerprint(row)
+
+        with self._lock:
+            self._seen_doc_ids.add(doc_id)
+        previous_fp = self._doc_fingerprints.get(doc_id)
+        if self.skip_unchanged and previous_fp == row["_fingerprint"]:
+            self._count("skipped_docs")
+            return []
+        row["_previously_ingested"] = previous_fp is not None
+
+        rules = extract_rule_fields(title, content, date)
+        row["_rule_fields"] = rules.as_metadata()
+        row["_rule_confidence"] = rules.confidence
+        if self._batch_enrich:
+            return [row]
+        if self._needs_enrichment(row):
+            enriched = self.metadata_enricher.enrich(title=title, content=content, date=date)
+            self._apply_enrichment(row, enriched)
+        self._apply_enrichment(row, row.pop("_rule_fields", {}))
+        row.update(self._derive_deadline_fields(row))
+        return [row]
+
+    def _needs_enrichment(self, row: Dict) -> bool:
+        """LLM only for docs without a summary whose rule extraction is low-confidence."""
+        if self.metadata_enricher is None or row.get("summary"):
+            return False
+        if row.get("_rule_confidence", 0.0) >= self.rule_confidence_threshold:
+            self._count("llm_skipped")
+            return False
+        self._count("llm_docs")
+        return True
+
+    @staticmethod
+    def _apply_enrichment(row: Dict, enriched: Dict) -> None:
+        if not enriched:
+            return
+        row["summary"] = row.get("summary") or enriched.get("summary", "")
+        row["deadlines"] = row.get("deadlines") or enriched.get("deadlines", [])
+        row["requires_action"] = row.get(
+            "requires_action", enriched.get("requires_action", False)
+        )
+        row["contact"] = row.get("contact") or enriched.get("contact", "")
+        row["category"] = row.get("category") or enriched.get("category", "")
+        row["target_group"] = row.get("target_group") or enriched.get("target_group", "")
+        row["valid_until"] = row.get("valid_until") or enriched.get("valid_until", "")
+        row["deadline_confidence"] = (
+            row.get("deadline_confidence")
+            if row.get("deadline_confidence") not in (None, "")
+            # None lets _derive_deadline_fields estimate it from the deadlines found.
+            else enriched.get("deadline_confidence")
+        )
+        row["evidence_text"] = (
+            row.get("evidence_text") or enriched.get("evidence_text", "")
+        )
+        row["fees"] = row.get("fees") or enriched.get("fees", [])
+        row["required_docs"] = row.get("required_docs") or enriched.get("required_docs", [])
+
+    def _enrich_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Batched enrichment: one enrich_batch call for every row of the batch that needs it."""
+        todo = [row for row in rows if self._needs_enrichment(row)]
+        if todo:
+            results = self.metadata_enricher.enrich_batch(
+                [(self._resolve_title(r), r["content"], self._resolve_date(r)) for r in todo]
+            )
+            for row, enriched in zip(todo, results):
+                self._apply_enrichment(row, enriched)
+        for row in rows:
+            self._apply_enrichment(row, row.pop("_rule_fields", {}))
+            row.update(self._derive_deadline_fields(row))
+        return rows
+
+    def _chunk_row(self, row: Dict) -> List[List[Tuple[Dict, Chunk]]]:
+        chunks = self.chunker.chunk(row.pop("_chunk_text", None) or row["content"], title=self._resolve_title(row))
+        doc_id = row["doc_id"]
+        if not chunks:
+            with self._lock:
+                self._doc_fingerprints[doc_id] = str(row["_fingerprint"])
+                old_blocks = self._doc_blocks.pop(doc_id, None)
+            if old_blocks:
+                self._delete_stale_points(old_blocks, [], {})
+            self.state.record_upserted([(doc_id, str(row["_fingerprint"]), [])], self.embedding_model)
+            return []
+        with self._lock:
+            self._pending_chunks[doc_id] = self._pending_chunks.get(doc_id, 0) + len(chunks)
+        self._count("upsert_docs")
+        return [[(row, chunk) for chunk in chunks]]
+
+    def _make_batcher(self, size: Optional[int] = None) -> Tuple:
+        size = size or self.batch_size
+        pending: List = []
+
+        def add(items: List) -> List[List]:
+            out = []
+            for item in items:
+                pending.append(item)
+                if len(pending) >= size:
+                    out.append(list(pending))
+                    pending.clear()
+            return out
+
+        def flush() -> List[List]:
+            out = [list(pending)] if pending else []
+            pending.clear()
+            return out
+
+        return add, flush
+
+    def _embed_batch(self, batch: List[Tuple[Dict, Chunk]]) -> List[Tuple[List, List]]:
+        return [(batch, self._build_points(batch))]
+
+    def _upsert_batch(self, item: Tuple[List, List]) -> None:
+        batch, points = item
+        try:
+            self._upsert_with_retry(points)
+        except Exception as exc:
+            self.state.mark_failed({str(row.get("doc_id", "")) for row, _ in batch}, f"{exc.__class__.__name__}: {exc}")
+            raise
+        self._track_failed_embeddings(points)
+        completed, stale, rescan, keep = self._update_fingerprint_cache_from_batch(batch, points)
+        if stale or rescan:
+            self._delete_stale_points(stale, rescan, keep)
+        self.state.record_upserted(completed, self.embedding_model)
+        # Slim-layout parents go to the parents collection; bulk load checks each collection separately.
+        parents = sum(1 for p in points if self.layout == "slim" and p.payload.get("level") == "parent")
+        self._count("vector_points", len(points) - parents)
+        self._count("parent_points", parents)
+        total = self._count("chunks", len(points))
+        print(f"[INFO] Upserted batch chunks: {len(points)} (total={total})")
+
+    def _track_failed_embeddings(self, points: List[models.PointStruct]) -> None:
+        """Queue points upserted without a dense vector; drop re-embedded ones from the queue."""
+        failed = [
+            (str(p.id), str(p.payload.get("doc_id", "")), str(p.payload.get("content", "")))
+            for p in points
+            if p.payload.get(DENSE_FAILED_KEY)
+        ]
+        if failed:
+            self._retry_queue_active = True
+            self.state.queue_failed_embeddings(failed, self.embedding_model, DENSE_FAILED_ERROR)
+            self._count("failed_embeddings", len(failed))
+            print(f"[WARN] Dense embedding failed for {len(failed)} points; upserted sparse-only and queued for retry")
+        if self._retry_queue_active:
+            self.state.clear_failed_embeddings(
+                str(p.id) for p in points if isinstance(p.vector, dict) and "dense" in p.vector
+            )
+
+    def retry_failed(self) -> None:
+        """Re-embed queued points and write only their dense vector (payload and sparse vector stay)."""
+        queued = self.state.failed_embeddings(self.embedding_model)
+        other_models = self.state.failed_embedding_count() - len(queued)
+        print(f"[INFO] Retry queue: points={len(queued)} model={self.embedding_model} state={self.state.path}")
+        if other_models:
+            print(f"[WARN] {other_models} queued points were embedded with another model; re-ingest their docs")
+        fixed = still_failed = missing = 0
+        for start in range(0, len(queued), self.batch_size):
+            part = queued[start : start + self.batch_size]
+            ids = [point_id for point_id, _, _, _ in part]
+            existing = {
+                str(r.id)
+                for r in self.client.retrieve(
+                    collection_name=self.write_collection, ids=ids, with_payload=False, with_vectors=False
+                )
+            }
+            gone = [point_id for point_id in ids if point_id not in existing]
+            if gone:
+                self.state.clear_failed_embeddings(gone)
+                missing += len(gone)
+            part = [item for item in part if item[0] in existing]
+            if not part:
+                continue
+
+            vectors = self.dense_encoder.encode([text for _, _, text, _ in part])
+            updates: List[models.PointVectors] = []
+            failed: List[Tuple[str, str, str]] = []
+            for (point_id, doc_id, text, _), vector in zip(part, vectors):
+                if hasattr(vector, "tolist"):
+                    vector = vector.tolist()
+                if is_failed_embedding(vector, DENSE_DIM):
+                    failed.append((point_id, doc_id, text))
+                else:
+                    updates.append(models.PointVectors(id=point_id, vector={"dense": vector}))
+            if updates:
+                update_ids = [str(u.id) for u in updates]
+                self._call_with_retry(
+                    "Update vectors",
+                    lambda: self.client.update_vectors(collection_name=self.write_collection, points=updates, wait=True),
+                )
+                self._call_with_retry(
+                    "Delete payload",
+                    lambda: self.client.delete_payload(
+                        collection_name=self.write_collection, keys=[DENSE_FAILED_KEY], points=update_ids, wait=True
+                    ),
+                )
+                self.state.clear_failed_embeddings(update_ids)
+                fixed += len(updates)
+            if failed:
+                self.state.queue_failed_embeddings(failed, self.embedding_model, DENSE_FAILED_ERROR)
+                still_failed += len(failed)
+            print(f"[INFO] Retried {start + len(part)}/{len(queued)}: fixed={fixed}, still_failed={still_failed}")
+        print(
+            f"[DONE] retry_failed fixed={fixed}, still_failed={still_failed}, missing_points={missing}, "
+            f"queued={self.state.failed_embedding_count()}, collection={self.write_collection}"
+        )
 
-        selected = sorted(latest.values(), key=lambda item: int(item["order"]))
-        return [item["row"] for item in selected]
+    def run_files(self, files: List[Path]) -> Dict[str, int]:
+        """Ingest `files` through the stage pipeline in this process and return its counters."""
+        add_to_batch, flush_batch = self._make_batcher()
+        if self._batch_enrich:
+            add_doc, flush_docs = self._make_batcher(self.enrich_batch_docs)
+            enrich_stages = [
+                Stage("prepare", self._prepare_row, workers=self.enrich_workers, queue_size=self.queue_size),
+                Stage("enrich_batch", lambda row: add_doc([row]), queue_size=self.queue_size, flush=flush_docs),
+                Stage("enrich", self._enrich_rows, workers=1, queue_size=self.queue_size),
+            ]
+        else:
+            enrich_stages = [
+                Stage("enrich", self._prepare_row, workers=self.enrich_workers, queue_size=self.queue_size),
+            ]
+        stages = enrich_stages + [
+            Stage("chunk", self._chunk_row, workers=self.chunk_workers, queue_size=self.queue_size),
+            Stage("batch", add_to_batch, workers=1, queue_size=self.queue_size, flush=flush_batch),
+            Stage("embed", self._embed_batch, workers=self.embed_workers, queue_size=self.queue_size),
+            Stage("upsert", self._upsert_batch, workers=self.upsert_workers, queue_size=self.queue_size),
+        ]
+        try:
+            run_pipeline(self._iter_source_rows(files), stages)
+        finally:
+            self.state.mark_seen(self._seen_doc_ids)
+        cache = getattr(self.dense_encoder, "cache", None)
+        if cache is not None:
+            print(f"[INFO] Embedding cache hits={cache.hits}, misses={cache.misses} ({cache.path})")
+        meta_cache = getattr(self.metadata_enricher, "cache", None)
+        if meta_cache is not None:
+            print(f"[INFO] Metadata cache hits={meta_cache.hits}, misses={meta_cache.misses} ({meta_cache.path})")
+        return dict(self._stats)
+
+    def _run_sharded(self, files: List[Path]) -> Dict[str, int]:
+        shards = shard_files(files, self.workers)
+        ctx = multiprocessing.get_context("spawn")
+        buckets = {
+            CF_EMBED_BUCKET: SharedTokenBucket(float(os.getenv("CF_EMBED_RPS", 20)), ctx=ctx),
+            GROQ_BUCKET: SharedTokenBucket(float(os.getenv("GROQ_RPS", 1.5)), ctx=ctx),
+        }
+        kwargs = dict(self._init_kwargs)
+        print(f"[INFO] Sharding files={len(files)} across workers={len(shards)}")
+
+        totals: Dict[str, int] = {}
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(buckets,),
+        ) as pool:
+            futures = [pool.submit(_run_shard, kwargs, shard) for shard in shards]
+            for future in as_completed(futures):
+                for key, value in future.result().items():
+                    totals[key] = totals.get(key, 0) + value
+        return totals
 
     def run(self) -> None:
         files = sorted(list(iter_metadata_files(self.input_dir)))
@@ -659,83 +1000,142 @@ class QdrantIngestor:
             print(f"[INFO] No metadata files found under: {self.input_dir}")
             return
 
-        total_docs = 0
-        upsert_docs = 0
-        skipped_docs = 0
-        total_chunks = 0
-
-        try:
-            for file_path in files:
-                print(f"[INFO] Processing: {file_path}")
-                batch_rows: List[Tuple[Dict, Chunk]] = []
-
-                for row in self._iter_latest_rows(file_path):
-                    total_docs += 1
-                    title = self._resolve_title(row)
-                    content = self._resolve_content(row) or title
-                    date = self._resolve_date(row)
-                    row["content"] = content
-                    doc_id = self._row_doc_id(row)
-                    row["doc_id"] = doc_id
-                    row["_fingerprint"] = self._row_fingerprint(row)
-
-                    if self.skip_unchanged and self._doc_fingerprints.get(doc_id) == row["_fingerprint"]:
-                        skipped_docs += 1
-                        continue
-
-                    if self.metadata_enricher and not row.get("summary"):
-                        enriched = self.metadata_enricher.enrich(title=title, content=content, date=date)
-                        if enriched:
-                            row["summary"] = row.get("summary") or enriched.get("summary", "")
-                            row["deadlines"] = row.get("deadlines") or enriched.get("deadlines", [])
-                            row["requires_action"] = row.get(
-                                "requires_action", enriched.get("requires_action", False)
-                            )
-                            row["contact"] = row.get("contact") or enriched.get("contact", "")
-                            row["category"] = row.get("category") or enriched.get("category", "")
-                            row["target_group"] = row.get("target_group") or enriched.get("target_group", "")
-                            row["valid_until"] = row.get("valid_until") or enriched.get("valid_until", "")
-                            row["deadline_confidence"] = (
-                                row.get("deadline_confidence")
-                                if row.get("deadline_confidence") not in (None, "")
-                                else enriched.get("deadline_confidence", 0.0)
-                            )
-                            row["evidence_text"] = (
-                                row.get("evidence_text") or enriched.get("evidence_text", "")
-                            )
-
-                    row.update(self._derive_deadline_fields(row))
-
-                    chunks = self.chunker.chunk(content, title=title)
-                    if not chunks:
-                        if self.skip_unchanged:
-                            self._doc_fingerprints[doc_id] = str(row["_fingerprint"])
-                        continue
-
-                    upsert_docs += 1
-                    for chunk in chunks:
-                        batch_rows.append((row, chunk))
-                        if len(batch_rows) >= self.batch_size:
-                            points = self._build_points(batch_rows)
-                            self._upsert_with_retry(points)
-                            self._update_fingerprint_cache_from_batch(batch_rows)
-                            total_chunks += len(points)
-                            print(f"[INFO] Upserted batch chunks: {len(points)} (total={total_chunks})")
-                            batch_rows = []
-
-                if batch_rows:
-                    points = self._build_points(batch_rows)
-                    self._upsert_with_retry(points)
-                    self._update_fingerprint_cache_from_batch(batch_rows)
-                    total_chunks += len(points)
-                    print(f"[INFO] Upserted final file batch: {len(points)} (total={total_chunks})")
-        finally:
-            self._save_doc_fingerprints()
+        run_id = self.state.start_run()
+        if self.workers > 1 and len(files) > 1:
+            stats = self._run_sharded(files)
+        else:
+            stats = self.run_files(files)
+        self.state.finish_run(run_id)
+        if self.bulk_load:
+            self._finish_bulk_load(stats.get("vector_points", 0), stats.get("parent_points", 0))
 
         print(
-            f"[DONE] docs={total_docs}, upsert_docs={upsert_docs}, "
-            f"skipped_docs={skipped_docs}, chunks={total_chunks}, collection={self.collection_name}"
+            f"[DONE] docs={stats.get('docs', 0)}, upsert_docs={stats.get('upsert_docs', 0)}, "
+            f"skipped_docs={stats.get('skipped_docs', 0)}, chunks={stats.get('chunks', 0)}, "
+            f"deleted_stale={stats.get('deleted_points', 0)}, "
+            f"collection={self.collection_name}"
         )
+        llm_docs, llm_skipped = stats.get("llm_docs", 0), stats.get("llm_skipped", 0)
+        if llm_docs or llm_skipped:
+            print(
+                f"[INFO] Metadata rules: llm_docs={llm_docs}, llm_skipped={llm_skipped} "
+                f"(skip rate {llm_skipped / (llm_docs + llm_skipped):.1%}, "
+                f"threshold={self.rule_confidence_threshold})"
+            )
+        if stats.get("failed_embeddings", 0):
+            print(
+                f"[WARN] Dense embedding failed for {stats['failed_embeddings']} points "
+                f"(queued={self.state.failed_embedding_count()}); re-embed them with --retry-failed"
+            )
+
+
+    def _finish_bulk_load(self, expected_points: int, expected_parents: int = 0) -> None:
+        """Build the deferred indexes, wait for green, then move the alias to the new collection.
+
+        `expected_points` counts points of the vector collection only; in the slim
+        layout `expected_parents` is checked against the parents collection.
+        """
+        name = self.write_collection
+        self.client.update_collection(
+            collection_name=name,
+            hnsw_config=self.profile.hnsw_config(),
+            optimizers_config=models.OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD_KB),
+        )
+        print(f"[INFO] Bulk load: indexing enabled on {name}, waiting for status green")
+        targets = [(name, expected_points)]
+        if self.layout == "slim":
+            targets.append((parents_collection(name), expected_parents))
+        for target, expected in targets:
+            if not self._wait_for_green(target, expected, settings.BULK_LOAD_GREEN_TIMEOUT_SECONDS):
+                print(
+                    f"[ERROR] {target} did not reach green within {settings.BULK_LOAD_GREEN_TIMEOUT_SECONDS:.0f}s; "
+                    f"alias {self.collection_name} left unchanged"
+                )
+                return
+        self._swap_alias(name)
+        self._promote_bulk_state()
+
+    def _wait_for_green(self, name: str, expected_points: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        last_report = 0.0
+        while time.monotonic() < deadline:
+            info = self.client.get_collection(name)
+            points = info.points_count or 0
+            if info.status == models.CollectionStatus.GREEN and points >= expected_points:
+                print(f"[OK] {name} is green: points={points}, indexed_vectors={info.indexed_vectors_count}")
+                return True
+            if time.monotonic() - last_report >= 30:
+                last_report = time.monotonic()
+                print(
+                    f"[INFO] Waiting for {name}: status={info.status}, points={points}/{expected_points}, "
+                    f"indexed_vectors={info.indexed_vectors_count}"
+                )
+            time.sleep(2)
+        return False
+
+    def _swap_alias(self, name: str) -> None:
+        """Atomically point the `collection_name` alias (and the parents alias in the slim
+        layout) at `name` and drop the collections they replaced."""
+        pairs = [(self.collection_name, name)]
+        if self.layout == "slim":
+            pairs.append((parents_collection(self.collection_name), parents_collection(name)))
+        current = {a.alias_name: a.collection_name for a in self.client.get_aliases().aliases}
+        operations: List = []
+        replaced: List[str] = []
+        for alias, target in pairs:
+            previous = current.get(alias)
+            if previous:
+                operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+                if previous != target:
+                    replaced.append(previous)
+            elif self.client.collection_exists(alias):
+                # One-time migration: a collection holds the name, so it has to go
+                # before the alias can exist. Searches fail until the alias is created.
+                print(f"[WARN] Replacing collection {alias} with an alias to {target}")
+                self.client.delete_collection(alias)
+            operations.append(
+                models.CreateAliasOperation(create_alias=models.CreateAlias(collection_name=target, alias_name=alias))
+            )
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+        for alias, target in pairs:
+            print(f"[OK] Alias {alias} -> {target}")
+        for previous in replaced:
+            self.client.delete_collection(previous)
+            print(f"[INFO] Deleted previous collection {previous}")
+
+    def _promote_bulk_state(self) -> None:
+        """Make the bulk-load state the alias state, so incremental runs continue from it."""
+        bulk_path = self.state.path
+        self.state.close()
+        alias_path = state_path_for(self.collection_name, self.input_dir)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{alias_path}{suffix}").unlink(missing_ok=True)
+        os.replace(bulk_path, alias_path)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{bulk_path}{suffix}").unlink(missing_ok=True)
+        self.state = IngestionStateStore(alias_path)
+        print(f"[INFO] Ingestion state now at {alias_path}")
+
+
+def shard_files(files: List[Path], n: int) -> List[List[Path]]:
+    """Split files into at most `n` shards of similar total size (largest first, greedy)."""
+    shards: List[List[Path]] = [[] for _ in range(max(1, min(n, len(files))))]
+    sizes = [0] * len(shards)
+    for path in sorted(files, key=lambda p: p.stat().st_size, reverse=True):
+        idx = sizes.index(min(sizes))
+        shards[idx].append(path)
+        sizes[idx] += path.stat().st_size
+    return [sorted(shard) for shard in shards if shard]
+
+
+def _init_worker(buckets: Dict[str, SharedTokenBucket]) -> None:
+    for name, bucket in buckets.items():
+        install_shared_bucket(name, bucket)
+
+
+def _run_shard(kwargs: Dict, files: List[Path]) -> Dict[str, int]:
+    ingestor = QdrantIngestor(**kwargs, ensure_collection=False)
+    return ingestor.run_files(files)
 
 
 def parse_args() -> argparse.Namespace:
@@ -747,6 +1147,90 @@ def parse_args() -> argparse.Namespace:
         help="Qdrant collection name",
     )
     parser.add_argument("--batch-size", type=int, default=16, help="Upsert batch size")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.INGEST_PROCESS_WORKERS,
+        help="Worker processes; files are sharded across them (each runs its own stage pipeline)",
+    )
+    parser.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=settings.INGEST_ENRICH_WORKERS,
+        help="Pipeline threads for parse/fingerprint/metadata enrichment (= concurrent LLM requests)",
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=settings.INGEST_CHUNK_WORKERS,
+        help="Pipeline threads for chunking",
+    )
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        default=settings.INGEST_EMBED_WORKERS,
+        help="Pipeline threads for dense embedding (batches in flight)",
+    )
+    parser.add_argument(
+        "--upsert-workers",
+        type=int,
+        default=settings.INGEST_UPSERT_WORKERS,
+        help="Pipeline threads for Qdrant upsert",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=settings.INGEST_QUEUE_SIZE,
+        help="Bounded queue size between pipeline stages",
+    )
+    parser.add_argument(
+        "--enrich-batch-docs",
+        type=int,
+        default=settings.INGEST_ENRICH_BATCH_DOCS,
+        help="Docs per batched local-Qwen enrichment call (windows are packed under LOCAL_LLM_BATCH_TOKENS)",
+    )
+    parser.add_argument(
+        "--dense-backend",
+        choices=["auto", "local_gpu", "cloudflare", "onnx_cpu"],
+        default=None,
+        help="Dense encoder backend (default: DENSE_BACKEND env or auto)",
+    )
+    parser.add_argument(
+        "--sparse-backend",
+        choices=list(SPARSE_BACKENDS),
+        default=None,
+        help="BM25 sparse vectors: local (qdrant/bm25-identical), local_kiwi, cloud (default: SPARSE_BACKEND env or local)",
+    )
+    parser.add_argument(
+        "--chunker",
+        choices=list(CHUNKERS),
+        default=None,
+        help="token (token-budgeted, records source_span) or legacy (character-based) (default: CHUNKER env or token)",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=list(LAYOUTS),
+        default=None,
+        help="Point layout: full (embedded parents, full payload) or slim (payload-only parents collection, "
+        "slim child payload) (default: COLLECTION_LAYOUT env or full)",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=None,
+        help="Storage/HNSW/quantization profile for newly created collections "
+        "(default: COLLECTION_PROFILE env or balanced; existing ones: src.etl.collection_profiles apply)",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Full rebuild into a fresh collection with indexing deferred, then swap the --collection alias to it",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Re-embed points whose dense embedding failed (state retry queue) and update only their dense vector",
+    )
     parser.add_argument(
         "--qdrant-timeout",
         type=float,
@@ -805,8 +1289,13 @@ def _is_gpu_server() -> bool:
 
 def main() -> None:
     args = parse_args()
+    if args.retry_failed and args.bulk_load:
+        print("[ERROR] --retry-failed cannot be combined with --bulk-load")
+        return
     gpu_available = _is_gpu_server()
     enable_metadata = args.enable_metadata if args.enable_metadata is not None else gpu_available
+    # The retry pass only re-embeds stored chunk texts.
+    enable_metadata = enable_metadata and not args.retry_failed
     print(f"[INFO] Metadata enrichment enabled={enable_metadata} (gpu={gpu_available})")
     ingestor = QdrantIngestor(
         input_dir=args.input,
@@ -816,7 +1305,23 @@ def main() -> None:
         qdrant_timeout=args.qdrant_timeout,
         upsert_max_retries=max(0, args.upsert_max_retries),
         skip_unchanged=args.skip_unchanged,
+        enrich_workers=args.enrich_workers,
+        chunk_workers=args.chunk_workers,
+        embed_workers=args.embed_workers,
+        upsert_workers=args.upsert_workers,
+        queue_size=args.queue_size,
+        enrich_batch_docs=args.enrich_batch_docs,
+        dense_backend=args.dense_backend,
+        sparse_backend=args.sparse_backend,
+        chunker=args.chunker,
+        layout=args.layout,
+        profile=args.profile,
+        bulk_load=args.bulk_load,
+        workers=args.workers,
     )
+    if args.retry_failed:
+        ingestor.retry_failed()
+        return
     ingestor.run()
 
 
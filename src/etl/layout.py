@@ -0,0 +1,91 @@
+"""Point layouts of the notice collection.
+
+full (default): parents are embedded and upserted next to their children,
+and every point carries the whole doc payload plus `bm25_text`.
+
+slim: parents are not embedded. They live as payload-only points in the
+`<collection>_parents` collection, keyed by `parent_id`, together with the
+doc-level fields. Children keep only what search, filters and reranking
+read (SLIM_CHILD_KEYS) and are hydrated from their parent at query time.
+"""
+
+from typing import Dict
+
+from qdrant_client import models
+
+from src.etl.payload_indexes import PAYLOAD_INDEXES
+from src.etl.utils import deterministic_uuid
+
+LAYOUTS = ("full", "slim")
+
+SLIM_CHILD_KEYS = tuple(
+    dict.fromkeys(
+        list(PAYLOAD_INDEXES)
+        + [
+            "block_id",
+            "parent_id",
+            "content",
+            "block_type",
+            "node_type",
+            "node_path",
+            "source_span",
+            "token_count",
+            "valid_until",
+            "is_expired",
+            "requires_action",
+            "dense_failed",
+        ]
+    )
+)
+
+# Parent fields that describe the parent chunk itself, never copied onto a child.
+_PARENT_CHUNK_KEYS = frozenset(
+    ["block_id", "content", "level", "chunk_index", "block_type", "node_type", "node_path", "source_span", "token_count"]
+)
+
+
+def parents_collection(collection_name: str) -> str:
+    return f"{collection_name}_parents"
+
+
+def parent_id_for(doc_id: str, section_header: str, parent_index: int) -> str:
+    """Same id ingestion assigns to a chunk's parent."""
+    return deterministic_uuid([doc_id, section_header, str(parent_index)], separator="|")
+
+
+def slim_child_payload(payload: Dict) -> Dict:
+    return {key: payload[key] for key in SLIM_CHILD_KEYS if key in payload}
+
+
+def parent_record(payload: Dict, parent_id: str) -> Dict:
+    """Payload of a parent in the parents collection: doc fields + parent chunk, no bm25_text."""
+    record = {key: value for key, value in payload.items() if key != "bm25_text"}
+    record["parent_id"] = parent_id
+    return record
+
+
+def hydrate_payload(child: Dict, parent: Dict) -> Dict:
+    """Child payload completed with the doc / section fields stored once on its parent."""
+    merged = {key: value for key, value in parent.items() if key not in _PARENT_CHUNK_KEYS}
+    merged.update(child)
+    merged["parent_content"] = parent.get("content", "")
+    return merged
+
+
+def needs_hydration(payload: Dict) -> bool:
+    return bool(payload.get("parent_id")) and "title" not in payload
+
+
+def ensure_parents_collection(client, collection_name: str) -> None:
+    """Create the payload-only parents collection of `collection_name` if missing."""
+    name = parents_collection(collection_name)
+    if client.collection_exists(name):
+        return
+    client.create_collection(collection_name=name, vectors_config={})
+    client.create_payload_index(
+        collection_name=name,
+        field_name="doc_id",
+        field_schema=models.PayloadSchemaType.KEYWORD,
+        wait=True,
+    )
+    print(f"[INFO] Created parents collection {name}")
@@ -0,0 +1,91 @@
+"""Persistent cache of LLM metadata enrichment results.
+
+Results are stored as JSON in SQLite, keyed by (model id, prompt version,
+sha1 of the normalized title/date/content), so unchanged notices are never
+sent to the LLM again and a prompt or model change re-enriches everything.
+Empty results (failed or unparsable generations) are not cached.
+
+    METADATA_CACHE_PATH=.ingestion_cache/metadata.sqlite3   # "" disables
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.etl.embedding_cache import normalize_text
+
+
+def content_key(title: str, content: str, date: str) -> str:
+    raw = "\x1f".join(normalize_text(part) for part in (title, date, content))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class MetadataCache:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS metadata (
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                key TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, prompt_version, key)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    def get(self, model: str, prompt_version: str, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM metadata WHERE model = ? AND prompt_version = ? AND key = ?",
+                (model, prompt_version, key),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            result = json.loads(row[0])
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, model: str, prompt_version: str, key: str, result: Dict) -> None:
+        if not result:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (model, prompt_version, key, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (model, prompt_version, key, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_metadata_cache(path: Optional[str]) -> Optional[MetadataCache]:
+    if not path:
+        return None
+    try:
+        return MetadataCache(path)
+    except (sqlite3.Error, OSError) as exc:
+        print(f"[WARN] Metadata cache disabled ({path}): {exc}")
+        return None
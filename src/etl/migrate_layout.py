@@ -0,0 +1,248 @@
+"""Migrate a full-layout notice collection to the slim layout, and measure both.
+
+`migrate` copies the stored vectors of children as-is (nothing is re-embedded).
+Children get the slim payload, and parent points become payload-only records
+in `<target>_parents`. `measure` reports the following per collection:
+- point counts
+- sampled payload size
+- estimated vector memory
+- segment RAM/disk from Qdrant telemetry, when the server exposes it
+- dense query latency (p50/p95), including parent hydration for slim collections
+
+    python -m src.etl.migrate_layout migrate --source school_info --target school_info_slim
+    python -m src.etl.migrate_layout measure --collection school_info --collection school_info_slim
+
+After a migration, point readers at the target (COLLECTION_NAME) and set
+COLLECTION_LAYOUT=slim for ingestion. Its first incremental run rewrites every
+doc once, because the layout is part of the doc fingerprint; dense vectors come
+from the embedding cache.
+"""
+
+import argparse
+import json
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from qdrant_client import models
+
+from src.core.config import settings
+from src.core.database import get_client
+from src.etl.layout import (
+    ensure_parents_collection,
+    hydrate_payload,
+    needs_hydration,
+    parent_id_for,
+    parent_record,
+    parents_collection,
+    slim_child_payload,
+)
+from src.etl.payload_indexes import ensure_payload_indexes
+
+_NODE_PATH_RE = re.compile(r"^s(\d+)$")
+
+
+def _parent_index(payload: Dict) -> Optional[int]:
+    for key in ("node_path", "parent_path"):
+        m = _NODE_PATH_RE.match(str(payload.get(key, "")))
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def migrate(client, source: str, target: str, batch_size: int) -> Dict[str, int]:
+    info = client.get_collection(source)
+    if not client.collection_exists(target):
+        client.create_collection(
+            collection_name=target,
+            vectors_config=info.config.params.vectors,
+            sparse_vectors_config=info.config.params.sparse_vectors,
+            quantization_config=info.config.quantization_config,
+        )
+        print(f"[INFO] Created {target} with the vector config of {source}")
+    ensure_payload_indexes(client, target)
+    ensure_parents_collection(client, target)
+    parents_name = parents_collection(target)
+
+    stats = {"children": 0, "parents": 0, "skipped_parents": 0}
+    parent_ids: set = set()
+    referenced: set = set()
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        children: List[models.PointStruct] = []
+        parents: List[models.PointStruct] = []
+        for record in records:
+            payload = record.payload or {}
+            if payload.get("level") == "parent":
+                p_idx = _parent_index(payload)
+                if p_idx is None:
+                    stats["skipped_parents"] += 1
+                    continue
+                pid = parent_id_for(str(payload.get("doc_id", "")), str(payload.get("section_header", "")), p_idx)
+                parent_ids.add(pid)
+                parents.append(models.PointStruct(id=pid, vector={}, payload=parent_record(payload, pid)))
+            else:
+                if payload.get("parent_id"):
+                    referenced.add(str(payload["parent_id"]))
+                children.append(
+                    models.PointStruct(id=record.id, vector=record.vector or {}, payload=slim_child_payload(payload))
+                )
+        if children:
+            client.upsert(collection_name=target, points=children, wait=True)
+        if parents:
+            client.upsert(collection_name=parents_name, points=parents, wait=True)
+        stats["children"] += len(children)
+        stats["parents"] += len(parents)
+        print(f"[INFO] Migrated children={stats['children']} parents={stats['parents']}")
+        if offset is None:
+            break
+    stats["orphan_parent_ids"] = len(referenced - parent_ids)
+    return stats
+
+
+def _percentile_ms(samples: List[float], q: float) -> float:
+    return float(np.percentile(samples, q)) * 1000 if samples else 0.0
+
+
+def _telemetry_usage(client, name: str) -> Optional[Tuple[int, int]]:
+    """(ram bytes, disk bytes) summed over the collection's local segments, if telemetry allows."""
+    aliases = {a.alias_name: a.collection_name for a in client.get_aliases().aliases}
+    physical = aliases.get(name, name)
+    headers = {"api-key": settings.QDRANT_API_KEY} if settings.QDRANT_API_KEY else {}
+    try:
+        response = httpx.get(
+            f"{settings.QDRANT_URL.rstrip('/')}/telemetry",
+            params={"details_level": 3},
+            headers=headers,
+            timeout=30,
+            verify=settings.QDRANT_VERIFY_SSL,
+        )
+        response.raise_for_status()
+        collections = response.json()["result"]["collections"]["collections"]
+    except Exception:
+        return None
+    ram = disk = 0
+    found = False
+    for collection in collections:
+        if collection.get("id") != physical:
+            continue
+        for shard in collection.get("shards") or []:
+            for segment in (shard.get("local") or {}).get("segments") or []:
+                seg_info = segment.get("info") or {}
+                ram += int(seg_info.get("ram_usage_bytes", 0) or 0)
+                disk += int(seg_info.get("disk_usage_bytes", 0) or 0)
+                found = True
+    return (ram, disk) if found else None
+
+
+def _payload_stats(client, name: str, sample: int) -> Tuple[int, float, List]:
+    """(points, avg payload bytes, sampled records with vectors)."""
+    points = client.get_collection(name).points_count or 0
+    records, _ = client.scroll(collection_name=name, limit=sample, with_payload=True, with_vectors=True)
+    sizes = [len(json.dumps(r.payload or {}, ensure_ascii=False).encode("utf-8")) for r in records]
+    return points, (float(np.mean(sizes)) if sizes else 0.0), records
+
+
+def measure(client, name: str, queries: List[List[float]], sample: int, limit: int) -> None:
+    info = client.get_collection(name)
+    points, avg_payload, records = _payload_stats(client, name, sample)
+    dense = (info.config.params.vectors or {}).get("dense")
+    dim = dense.size if dense is not None else 0
+    nnz = [len(r.vector["sparse"].indices) for r in records if isinstance(r.vector, dict) and "sparse" in r.vector]
+    line = (
+        f"[OK] {name}: points={points} payload_avg={avg_payload:.0f}B "
+        f"payload~{points * avg_payload / 1e6:.1f}MB dense~{points * dim * 4 / 1e6:.1f}MB "
+        f"sparse~{points * (float(np.mean(nnz)) if nnz else 0.0) * 8 / 1e6:.1f}MB"
+    )
+    if info.config.quantization_config is not None:
+        line += f" int8~{points * dim / 1e6:.1f}MB"
+    print(line)
+
+    parents_name = parents_collection(name)
+    if client.collection_exists(parents_name):
+        p_points, p_avg, _ = _payload_stats(client, parents_name, sample)
+        print(f"[OK] {parents_name}: points={p_points} payload_avg={p_avg:.0f}B payload~{p_points * p_avg / 1e6:.1f}MB")
+
+    for target in [name, parents_name]:
+        usage = _telemetry_usage(client, target) if client.collection_exists(target) else None
+        if usage:
+            print(f"[INFO] {target}: segments ram={usage[0] / 1e6:.1f}MB disk={usage[1] / 1e6:.1f}MB (telemetry)")
+
+    latencies: List[float] = []
+    for vector in queries:
+        started = time.perf_counter()
+        hits = client.query_points(
+            collection_name=name, query=vector, using="dense", limit=limit, with_payload=True
+        ).points
+        parent_ids = {str(h.payload["parent_id"]) for h in hits if needs_hydration(h.payload or {})}
+        if parent_ids:
+            parents = {
+                str(r.id): r.payload or {}
+                for r in client.retrieve(collection_name=parents_name, ids=list(parent_ids), with_payload=True)
+            }
+            for h in hits:
+                if needs_hydration(h.payload or {}):
+                    h.payload = hydrate_payload(h.payload, parents.get(str(h.payload["parent_id"]), {}))
+        latencies.append(time.perf_counter() - started)
+    if latencies:
+        print(
+            f"[INFO] {name}: query+hydrate n={len(latencies)} "
+            f"p50={_percentile_ms(latencies, 50):.1f}ms p95={_percentile_ms(latencies, 95):.1f}ms"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Slim collection layout migration and measurement")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    m = sub.add_parser("migrate", help="Copy a full-layout collection into a slim-layout one")
+    m.add_argument("--source", default=settings.COLLECTION_NAME, help="Full-layout collection (or alias)")
+    m.add_argument("--target", required=True, help="Slim-layout collection to create/fill")
+    m.add_argument("--batch-size", type=int, default=256, help="Points per scroll/upsert batch")
+
+    s = sub.add_parser("measure", help="Report payload/vector size and query latency per collection")
+    s.add_argument("--collection", action="append", required=True, help="Collection to measure (repeatable)")
+    s.add_argument("--queries", type=int, default=50, help="Dense queries, taken from stored vectors")
+    s.add_argument("--sample", type=int, default=200, help="Points sampled for payload/sparse size")
+    s.add_argument("--limit", type=int, default=10, help="Hits per query")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    client = get_client()
+    if args.command == "migrate":
+        started = time.perf_counter()
+        stats = migrate(client, args.source, args.target, max(1, args.batch_size))
+        print(f"[DONE] {stats} elapsed={time.perf_counter() - started:.1f}s target={args.target}")
+        if stats["orphan_parent_ids"] or stats["skipped_parents"]:
+            print("[WARN] Some children reference parents that were not migrated; they are returned unhydrated")
+        return
+
+    # Same query vectors for every collection: dense vectors of children sampled from the first one.
+    records, _ = client.scroll(
+        collection_name=args.collection[0],
+        limit=args.queries * 4,
+        with_payload=["level"],
+        with_vectors=["dense"],
+    )
+    queries = [
+        r.vector["dense"]
+        for r in records
+        if (r.payload or {}).get("level") != "parent" and isinstance(r.vector, dict) and "dense" in r.vector
+    ][: args.queries]
+    for name in args.collection:
+        measure(client, name, queries, args.sample, args.limit)
+
+
+if __name__ == "__main__":
+    main()
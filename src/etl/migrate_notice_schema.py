@@ -1,11 +1,27 @@
+"""Migrate crawled notice rows to the envelope schema (doc_id, version, is_current, raw/normalized/assets).
+
+Each file is migrated in two streaming passes: the first keeps only the
+last row index per doc_id, the second rewrites rows with version and
+is_current resolved. Plain `.jsonl`, seekable zstd `.jsonl.zst` and compact
+`.jsonl.gz` archives are migrated in their own format.
+
+    python -m src.etl.migrate_notice_schema --input data --in-place
+"""
+
 import argparse
 import datetime
 import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlsplit, urlunsplit
 
+from src.etl import codec, notice_archive, zstd_jsonl
+from src.etl.utils import iter_jsonl
+
 
 def utc_now_iso() -> str:
     return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
@@ -77,16 +93,15 @@ def build_content_hash(
     return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
 
-def iter_jsonl(path: Path) -> Iterable[Dict]:
-    with path.open("r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                continue
+def envelope_doc_id(row: Dict) -> str:
+    doc_id = str(row.get("doc_id", "") or "").strip()
+    if doc_id:
+        return doc_id
+    url = str(row.get("url", "") or "").strip()
+    canonical_url = canonicalize_url(str(row.get("canonical_url", "") or url))
+    school_id = str(row.get("school_id", row.get("school", "")) or "").strip()
+    dept_id = str(row.get("dept_id", row.get("dept", "")) or "").strip()
+    return build_doc_id(school_id, dept_id, canonical_url)
 
 
 def to_notice_envelope(row: Dict) -> Dict:
@@ -106,9 +121,7 @@ def to_notice_envelope(row: Dict) -> Dict:
     if not isinstance(images, list):
         images = []
 
-    doc_id = str(row.get("doc_id", "") or "").strip()
-    if not doc_id:
-        doc_id = build_doc_id(school_id, dept_id, canonical_url)
+    doc_id = envelope_doc_id(row)
 
     content_hash = str(row.get("content_hash", "") or "").strip()
     if not content_hash:
@@ -158,35 +171,70 @@ def to_notice_envelope(row: Dict) -> Dict:
     return out
 
 
-def migrate_rows(rows: List[Dict]) -> List[Dict]:
-    migrated = [to_notice_envelope(row) for row in rows]
-    doc_versions: Dict[str, Tuple[int, str]] = {}
+def _next_version(doc_versions: Dict[str, Tuple[int, str]], row: Dict) -> int:
+    doc_id = str(row.get("doc_id", "")).strip()
+    row_hash = str(row.get("content_hash", "")).strip()
+    prev = doc_versions.get(doc_id)
+    if prev is None:
+        version = 1
+    else:
+        prev_version, prev_hash = prev
+        version = prev_version if row_hash == prev_hash else prev_version + 1
+    doc_versions[doc_id] = (version, row_hash)
+    return version
 
-    for row in migrated:
-        doc_id = str(row.get("doc_id", "")).strip()
-        row_hash = str(row.get("content_hash", "")).strip()
-        prev = doc_versions.get(doc_id)
-        if prev is None:
-            version = 1
-        else:
-            prev_version, prev_hash = prev
-            version = prev_version if row_hash == prev_hash else prev_version + 1
-        row["version"] = version
-        row["is_current"] = False
-        doc_versions[doc_id] = (version, row_hash)
 
+def collect_last_index(path: Path) -> Tuple[Dict[str, int], int]:
+    """Pass 1: doc_id -> index of its last row, plus row count. Only ids are kept in memory."""
     last_index: Dict[str, int] = {}
-    for idx, row in enumerate(migrated):
-        last_index[str(row.get("doc_id", "")).strip()] = idx
-    for idx in last_index.values():
-        migrated[idx]["is_current"] = True
-    return migrated
+    rows = 0
+    for idx, row in enumerate(iter_jsonl(path)):
+        last_index[envelope_doc_id(row)] = idx
+        rows = idx + 1
+    return last_index, rows
 
 
-def write_jsonl(path: Path, rows: List[Dict]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+def iter_migrated_rows(path: Path, last_index: Dict[str, int]) -> Iterable[Dict]:
+    """Pass 2: stream envelopes with version/is_current resolved."""
+    doc_versions: Dict[str, Tuple[int, str]] = {}
+    for idx, row in enumerate(iter_jsonl(path)):
+        out = to_notice_envelope(row)
+        out["version"] = _next_version(doc_versions, out)
+        out["is_current"] = last_index.get(str(out.get("doc_id", "")).strip()) == idx
+        yield out
+
+
+def write_jsonl_atomic(path: Path, rows: Iterable[Dict]) -> int:
+    """Stream rows to a temp file next to `path`, then rename over it."""
+    if zstd_jsonl.is_zst_path(path):
+        return zstd_jsonl.write_lines_atomic(path, (codec.dumps_line(row) for row in rows))
+    if notice_archive.is_compact_path(path):
+        return notice_archive.write_compact_atomic(path, rows)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(codec.dumps_line(row))
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
+
+
+def migrate_file(path: Path, out_path: Optional[Path]) -> Tuple[int, int, float]:
+    """Two-pass streaming migration of one file. Returns (rows, input bytes, seconds)."""
+    started = time.perf_counter()
+    size = path.stat().st_size
+    last_index, rows = collect_last_index(path)
+    if out_path is None or not rows:
+        return rows, size, time.perf_counter() - started
+    rows = write_jsonl_atomic(out_path, iter_migrated_rows(path, last_index))
+    return rows, size, time.perf_counter() - started
 
 
 def parse_args() -> argparse.Namespace:
@@ -195,7 +243,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--glob",
         default="*.jsonl",
-        help="File glob relative to input root (default: *.jsonl, recursive)",
+        help="File glob relative to input root (default: *.jsonl, recursive; <glob>.zst and <glob>.gz also matched)",
     )
     parser.add_argument(
         "--in-place",
@@ -207,6 +255,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Analyze only, do not write files",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Number of worker processes (files are migrated in parallel)",
+    )
     return parser.parse_args()
 
 
@@ -218,38 +272,65 @@ def main() -> None:
         return
 
     files = sorted(
-        [
+        {
             p
-            for p in root.rglob(args.glob)
-            if p.is_file() and not p.name.endswith(".migrated.jsonl")
-        ]
+            for pattern in (args.glob, f"{args.glob}.zst", f"{args.glob}.gz")
+            for p in root.rglob(pattern)
+            if p.is_file() and ".migrated.jsonl" not in p.name
+        }
     )
     if not files:
         print(f"[INFO] No files matched under {root} with glob={args.glob}")
         return
 
-    total_rows = 0
-    touched_files = 0
+    jobs: List[Tuple[Path, Optional[Path]]] = []
     for path in files:
-        rows = list(iter_jsonl(path))
-        if not rows:
-            continue
-        migrated = migrate_rows(rows)
-        total_rows += len(migrated)
-        touched_files += 1
-
         if args.dry_run:
-            print(f"[DRY] {path} rows={len(migrated)}")
-            continue
-
-        if args.in_place:
+            out_path = None
+        elif args.in_place:
             out_path = path
+        elif zstd_jsonl.is_zst_path(path):
+            out_path = path.with_name(path.name[: -len(zstd_jsonl.ZST_SUFFIX)] + ".migrated.jsonl.zst")
+        elif notice_archive.is_compact_path(path):
+            out_path = path.with_name(path.name[: -len(notice_archive.COMPACT_SUFFIX)] + ".migrated.jsonl.gz")
         else:
             out_path = path.with_suffix(".migrated.jsonl")
-        write_jsonl(out_path, migrated)
-        print(f"[OK] {path} -> {out_path} rows={len(migrated)}")
+        jobs.append((path, out_path))
 
-    print(f"[DONE] files={touched_files}, rows={total_rows}")
+    total_rows = 0
+    total_bytes = 0
+    touched_files = 0
+    started = time.perf_counter()
+    workers = max(1, min(args.workers, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(migrate_file, path, out_path): (path, out_path) for path, out_path in jobs}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path, out_path = futures[future]
+            try:
+                rows, size, seconds = future.result()
+            except Exception as exc:
+                print(f"[ERROR] {path} migration failed: {exc}")
+                continue
+            total_bytes += size
+            if not rows:
+                continue
+            total_rows += rows
+            touched_files += 1
+            elapsed = max(time.perf_counter() - started, 1e-6)
+            progress = (
+                f"[{done}/{len(jobs)}] {total_rows / elapsed:,.0f} rows/s "
+                f"{total_bytes / elapsed / 1_000_000:.1f} MB/s"
+            )
+            if out_path is None:
+                print(f"[DRY] {path} rows={rows} {progress}")
+            else:
+                print(f"[OK] {path} -> {out_path} rows={rows} ({seconds:.2f}s) {progress}")
+
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    print(
+        f"[DONE] files={touched_files}, rows={total_rows}, elapsed={elapsed:.2f}s, "
+        f"throughput={total_rows / elapsed:,.0f} rows/s ({total_bytes / elapsed / 1_000_000:.1f} MB/s)"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,434 @@
+"""Compact notice archive format (notice-compact v1).
+
+Crawled notice envelopes repeat the body text three times (`content`,
+`raw.content_raw`, `normalized.content`) and the asset lists twice
+(top-level and `assets`). A compact archive is gzip-compressed JSONL whose
+first line is a format header; each row stores every large field once and
+replaces the `raw`/`normalized`/`assets` blobs with a `_views` spec:
+
+    {"_views": {"raw": {"refs": {"content_raw": "content"}, "values": {"date_raw": "2026.03.01"}}}}
+
+`refs` point at top-level keys with an identical value, `values` hold the
+few fields that differ. Readers get `NoticeView` objects that rebuild the
+blobs lazily, so existing code reading `row["normalized"]["content"]` keeps
+working. Convert existing archives with:
+
+    python -m src.etl.notice_archive convert --input data --delete-source
+
+Only crawler notice files (`<dept_id>.jsonl`) are converted; intermediate
+outputs such as `*.migrated.jsonl` are left alone. The crawler appends each
+post as its own gzip member, which compresses poorly; `repack` rewrites
+archives with at least `--min-members` appended members as one stream:
+
+    python -m src.etl.notice_archive repack --input data --min-members 50
+"""
+
+import argparse
+import gzip
+import os
+import time
+import zlib
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from src.etl import codec, zstd_jsonl
+
+FORMAT_NAME = "notice-compact"
+FORMAT_VERSION = 1
+COMPACT_SUFFIX = ".jsonl.gz"
+VIEWS_KEY = codec.VIEWS_KEY
+
+# view blob -> {sub key: top-level key expected to hold the same value}
+VIEW_SOURCES: Dict[str, Dict[str, str]] = {
+    "raw": {
+        "title_raw": "title",
+        "date_raw": "date",
+        "url_raw": "url",
+        "content_raw": "content",
+    },
+    "normalized": {
+        "title": "title",
+        "published_at": "published_at",
+        "canonical_url": "canonical_url",
+        "content": "content",
+    },
+    "assets": {
+        "images": "images",
+        "attachments": "attachments",
+    },
+}
+
+
+def format_header() -> Dict:
+    return {"_format": FORMAT_NAME, "_version": FORMAT_VERSION}
+
+
+def is_header(row: object) -> bool:
+    return isinstance(row, dict) and row.get("_format") == FORMAT_NAME
+
+
+def is_compact_path(path: Path) -> bool:
+    return path.name.endswith(COMPACT_SUFFIX)
+
+
+def is_notice_file(path: Path, suffix: str = ".jsonl") -> bool:
+    """Crawler output `<dept_id><suffix>`; dept ids carry no dots, intermediate files do."""
+    name = path.name
+    if not name.endswith(suffix) or name.startswith(".") or "-checkpoint" in name:
+        return False
+    return "." not in name[: -len(suffix)] and ".ipynb_checkpoints" not in path.parts
+
+
+def compact_row(row: Dict) -> Dict:
+    """Envelope -> compact row. Rows that are already compact pass through."""
+    if VIEWS_KEY in row:
+        return dict(row)
+    out = {k: v for k, v in row.items() if k not in VIEW_SOURCES}
+    views: Dict[str, Dict] = {}
+    for view_name, sources in VIEW_SOURCES.items():
+        blob = row.get(view_name)
+        if not isinstance(blob, dict):
+            if view_name in row:
+                out[view_name] = blob
+            continue
+        refs: Dict[str, str] = {}
+        values: Dict = {}
+        for key, value in blob.items():
+            source_key = sources.get(key)
+            if source_key and source_key in out and out[source_key] == value:
+                refs[key] = source_key
+            else:
+                values[key] = value
+        views[view_name] = {"refs": refs, "values": values}
+    if views:
+        out[VIEWS_KEY] = views
+    return out
+
+
+def _build_view(data: Dict, spec: Dict) -> Dict:
+    refs = spec.get("refs", {}) if isinstance(spec, dict) else {}
+    values = spec.get("values", {}) if isinstance(spec, dict) else {}
+    out = {key: data.get(source_key) for key, source_key in refs.items()}
+    out.update(values)
+    return out
+
+
+class NoticeView(MutableMapping):
+    """Dict-like envelope over a compact row; view blobs are built on first access."""
+
+    __slots__ = ("_data", "_specs", "_cache")
+
+    def __init__(self, compact: Dict):
+        self._data = {k: v for k, v in compact.items() if k != VIEWS_KEY}
+        specs = compact.get(VIEWS_KEY)
+        self._specs: Dict[str, Dict] = specs if isinstance(specs, dict) else {}
+        self._cache: Dict[str, Dict] = {}
+
+    def __getitem__(self, key):
+        if key in self._data:
+            return self._data[key]
+        if key in self._specs:
+            if key not in self._cache:
+                self._cache[key] = _build_view(self._data, self._specs[key])
+            return self._cache[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value) -> None:
+        # Views referencing `key` keep the value they had before the write.
+        for view_name, spec in self._specs.items():
+            if view_name not in self._cache and isinstance(spec, dict) and key in spec.get("refs", {}).values():
+                self._cache[view_name] = _build_view(self._data, spec)
+        self._specs.pop(key, None)
+        self._cache.pop(key, None)
+        self._data[key] = value
+
+    def __delitem__(self, key) -> None:
+        found = False
+        for store in (self._data, self._specs, self._cache):
+            if key in store:
+                del store[key]
+                found = True
+        if not found:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator:
+        yield from self._data
+        for key in self._specs:
+            if key not in self._data:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._data) + sum(1 for key in self._specs if key not in self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data or key in self._specs
+
+    def __repr__(self) -> str:
+        return f"NoticeView({self._data!r}, views={list(self._specs)})"
+
+    def to_compact(self) -> Dict:
+        out = dict(self._data)
+        if self._specs:
+            out[VIEWS_KEY] = self._specs
+        return out
+
+
+def expand_row(row: Dict) -> Dict:
+    """Compact row -> full envelope dict."""
+    if VIEWS_KEY not in row:
+        return dict(row)
+    return dict(NoticeView(row))
+
+
+def open_binary(path: Path, mode: str = "rb") -> IO[bytes]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode)
+    if zstd_jsonl.is_zst_path(path) and mode == "rb":
+        return zstd_jsonl.open_reader(path)
+    return path.open(mode)
+
+
+def iter_lines(path: Path) -> Iterator[bytes]:
+    """Stripped, non-empty JSONL lines; the compact header line is skipped."""
+    with open_binary(path) as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith(b'{"_format"'):
+                continue
+            yield line
+
+
+def iter_lines_with_offsets(path: Path) -> Iterator[Tuple[int, bytes]]:
+    """Like iter_lines, plus each line's decompressed byte offset (for `iter_lines_at`)."""
+    offset = 0
+    with open_binary(path) as f:
+        for raw in f:
+            start = offset
+            offset += len(raw)
+            line = raw.strip()
+            if not line or line.startswith(b'{"_format"'):
+                continue
+            yield start, line
+
+
+def iter_lines_at(path: Path, offsets: Iterable[int]) -> Iterator[Tuple[int, bytes]]:
+    """(offset, stripped line) for each decompressed byte offset, given in ascending order.
+
+    Plain and gzip files seek forward in one handle (gzip decompresses and
+    discards the gap). Seekable zstd files reopen at the frame holding the
+    offset when the gap exceeds one frame, so skipped frames are not decoded.
+    """
+    zst = zstd_jsonl.is_zst_path(path)
+    f: Optional[IO[bytes]] = None
+    pos = 0
+    try:
+        for offset in offsets:
+            if f is None or offset < pos or (zst and offset - pos > zstd_jsonl.DEFAULT_FRAME_BYTES):
+                if f is not None:
+                    f.close()
+                if zst:
+                    f = zstd_jsonl.open_reader(path, offset)
+                else:
+                    f = open_binary(path)
+                    f.seek(offset)
+            elif offset > pos:
+                if zst:
+                    f.read(offset - pos)
+                else:
+                    f.seek(offset)
+            raw = f.readline()
+            pos = offset + len(raw)
+            yield offset, raw.strip()
+    finally:
+        if f is not None:
+            f.close()
+
+
+def wrap_row(row: object) -> object:
+    if isinstance(row, dict) and VIEWS_KEY in row:
+        return NoticeView(row)
+    return row
+
+
+def append_compact_row(path: Path, row: Dict) -> None:
+    """Append one row to a compact archive as its own gzip member."""
+    exists = path.exists() and path.stat().st_size > 0
+    with gzip.open(path, "ab") as f:
+        if not exists:
+            f.write(codec.dumps_line(format_header()).encode("utf-8"))
+        f.write(codec.dumps_line(compact_row(row)).encode("utf-8"))
+
+
+def count_gzip_members(path: Path) -> int:
+    """Number of gzip members in `path` (1 for a freshly written archive, +1 per appended row)."""
+    members = 0
+    decoder = zlib.decompressobj(wbits=31)
+    with path.open("rb") as f:
+        while True:
+            data = f.read(1 << 20)
+            if not data:
+                break
+            while data:
+                decoder.decompress(data)
+                if not decoder.eof:
+                    break
+                members += 1
+                data = decoder.unused_data
+                decoder = zlib.decompressobj(wbits=31)
+    return members
+
+
+def _write_atomic(path: Path, lines: Iterable[str], compress: bool) -> int:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        opener = gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) if compress else tmp.open(
+            "w", encoding="utf-8"
+        )
+        with opener as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
+
+
+def _decoded_rows(path: Path) -> Iterator[Dict]:
+    for line in iter_lines(path):
+        try:
+            row = codec.loads(line)
+        except codec.DecodeError:
+            continue
+        if isinstance(row, dict):
+            yield row
+
+
+def write_compact_atomic(path: Path, rows: Iterable[Dict]) -> int:
+    """Write rows (envelopes or compact rows) as a single-stream compact archive. Returns row count."""
+
+    def _all() -> Iterator[str]:
+        yield codec.dumps_line(format_header())
+        for row in rows:
+            yield codec.dumps_line(compact_row(row))
+
+    return _write_atomic(path, _all(), compress=True) - 1
+
+
+def compact_file(src: Path, dst: Path) -> int:
+    """Write `src` rows as a single-stream compact archive at `dst` (may be `src` itself)."""
+    return write_compact_atomic(dst, _decoded_rows(src))
+
+
+def expand_file(src: Path, dst: Path) -> int:
+    lines = (codec.dumps_line(expand_row(row)) for row in _decoded_rows(src))
+    return _write_atomic(dst, lines, compress=False)
+
+
+def compact_path_for(path: Path) -> Path:
+    return path.with_name(path.name[: -len(".jsonl")] + COMPACT_SUFFIX)
+
+
+def expanded_path_for(path: Path) -> Path:
+    return path.with_name(path.name[: -len(COMPACT_SUFFIX)] + ".jsonl")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert notice jsonl archives to/from notice-compact")
+    parser.add_argument(
+        "command",
+        choices=["convert", "expand", "repack"],
+        help="convert: jsonl -> compact, expand: back, repack: merge appended gzip members",
+    )
+    parser.add_argument("--input", default="data", help="Input root directory")
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="Delete each source after converting it (otherwise readers see both files until you remove one)",
+    )
+    parser.add_argument(
+        "--min-members",
+        type=int,
+        default=50,
+        help="repack: only rewrite archives with at least this many appended gzip members",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    root = Path(args.input)
+    if not root.exists():
+        print(f"[ERROR] Input path not found: {root}")
+        return
+
+    if args.command == "convert":
+        files: List[Path] = sorted(p for p in root.rglob("*.jsonl") if p.is_file() and is_notice_file(p))
+    else:
+        files = sorted(p for p in root.rglob(f"*{COMPACT_SUFFIX}") if p.is_file() and is_notice_file(p, COMPACT_SUFFIX))
+    if args.command == "repack":
+        repack(files, max(1, args.min_members))
+        return
+    if not files:
+        print(f"[INFO] No files to {args.command} under {root}")
+        return
+
+    total_in = 0
+    total_out = 0
+    total_rows = 0
+    started = time.perf_counter()
+    for path in files:
+        dst: Optional[Path]
+        if args.command == "convert":
+            dst = compact_path_for(path)
+            rows = compact_file(path, dst)
+        else:
+            dst = expanded_path_for(path)
+            rows = expand_file(path, dst)
+        size_in = path.stat().st_size
+        size_out = dst.stat().st_size
+        total_in += size_in
+        total_out += size_out
+        total_rows += rows
+        if args.delete_source:
+            path.unlink()
+        ratio = size_out / size_in if size_in else 0.0
+        print(f"[OK] {path} -> {dst} rows={rows} size={size_in:,}B -> {size_out:,}B ({ratio:.0%})")
+
+    ratio = total_out / total_in if total_in else 0.0
+    print(
+        f"[DONE] files={len(files)}, rows={total_rows}, size={total_in:,}B -> {total_out:,}B "
+        f"({ratio:.0%}), elapsed={time.perf_counter() - started:.2f}s"
+    )
+    if not args.delete_source:
+        print("[WARN] Sources were kept; remove them (or re-run with --delete-source) to avoid reading rows twice")
+
+
+def repack(files: List[Path], min_members: int) -> None:
+    """Rewrite compact archives whose appended members reached `min_members` as one gzip stream."""
+    total_in = 0
+    total_out = 0
+    done = 0
+    started = time.perf_counter()
+    for path in files:
+        appended = count_gzip_members(path) - 1
+        if appended < min_members:
+            continue
+        size_in = path.stat().st_size
+        rows = compact_file(path, path)
+        size_out = path.stat().st_size
+        total_in += size_in
+        total_out += size_out
+        done += 1
+        print(f"[OK] {path} appended_members={appended} rows={rows} size={size_in:,}B -> {size_out:,}B")
+    print(
+        f"[DONE] repacked={done}/{len(files)}, size={total_in:,}B -> {total_out:,}B, "
+        f"elapsed={time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Declarative payload indexes for the notice collection.
+
+Every payload key the retriever filters or scrolls on, and every key the
+pre-filter spec names, gets an index so filtered searches and neighbor
+scrolls stay index lookups as the collection grows. `ensure_payload_indexes`
+is idempotent: it creates missing indexes, recreates ones with the wrong
+schema and leaves the rest alone. It runs whenever ingestion or
+`init_collection` sets up the collection.
+
+    python -m src.etl.payload_indexes check --collection school_info
+    python -m src.etl.payload_indexes ensure --collection school_info
+"""
+
+import argparse
+import sys
+from typing import Dict, Tuple
+
+from qdrant_client import models
+
+PAYLOAD_INDEXES: Dict[str, models.PayloadSchemaType] = {
+    # Routing / pre-filters
+    "school_id": models.PayloadSchemaType.KEYWORD,
+    "campus_id": models.PayloadSchemaType.KEYWORD,
+    "dept_id": models.PayloadSchemaType.KEYWORD,
+    "dept": models.PayloadSchemaType.KEYWORD,  # legacy key used by the retriever department filter
+    "program_level": models.PayloadSchemaType.KEYWORD,
+    "date": models.PayloadSchemaType.DATETIME,
+    "level": models.PayloadSchemaType.KEYWORD,
+    "is_current": models.PayloadSchemaType.BOOL,
+    # Neighbor scroll (url + chunk_index range) and per-doc stale-point deletes
+    "url": models.PayloadSchemaType.KEYWORD,
+    "chunk_index": models.PayloadSchemaType.INTEGER,
+    "doc_id": models.PayloadSchemaType.KEYWORD,
+}
+
+
+def diff_payload_indexes(client, collection_name: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """(missing key -> wanted schema, mismatched key -> existing schema)."""
+    schema = client.get_collection(collection_name).payload_schema or {}
+    missing: Dict[str, str] = {}
+    mismatched: Dict[str, str] = {}
+    for key, wanted in PAYLOAD_INDEXES.items():
+        info = schema.get(key)
+        if info is None:
+            missing[key] = wanted.value
+        elif info.data_type != wanted:
+            mismatched[key] = str(getattr(info.data_type, "value", info.data_type))
+    return missing, mismatched
+
+
+def ensure_payload_indexes(client, collection_name: str) -> int:
+    """Create missing (and recreate mis-typed) payload indexes; returns how many were created."""
+    try:
+        missing, mismatched = diff_payload_indexes(client, collection_name)
+    except Exception as exc:
+        print(f"[WARN] Could not read payload indexes of {collection_name}: {exc}")
+        return 0
+
+    created = 0
+    for key in list(mismatched) + list(missing):
+        wanted = PAYLOAD_INDEXES[key]
+        try:
+            if key in mismatched:
+                print(f"[WARN] Recreating payload index {collection_name}.{key}: {mismatched[key]} -> {wanted.value}")
+                client.delete_payload_index(collection_name=collection_name, field_name=key, wait=True)
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=key,
+                field_schema=wanted,
+                wait=True,
+            )
+            created += 1
+        except Exception as exc:
+            print(f"[WARN] Could not create payload index {collection_name}.{key} ({wanted.value}): {exc}")
+    if created:
+        print(f"[INFO] Created payload indexes on {collection_name}: {created}")
+    return created
+
+
+def parse_args() -> argparse.Namespace:
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Check or create Qdrant payload indexes")
+    parser.add_argument("command", choices=["check", "ensure"])
+    parser.add_argument("--collection", default=settings.COLLECTION_NAME, help="Qdrant collection name or alias")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.core.database import get_client
+
+    args = parse_args()
+    client = get_client()
+    if args.command == "ensure":
+        ensure_payload_indexes(client, args.collection)
+
+    missing, mismatched = diff_payload_indexes(client, args.collection)
+    for key, wanted in missing.items():
+        print(f"[WARN] missing index: {key} ({wanted})")
+    for key, existing in mismatched.items():
+        print(f"[WARN] wrong index type: {key} is {existing}, want {PAYLOAD_INDEXES[key].value}")
+    if missing or mismatched:
+        print(f"[ERROR] {args.collection}: {len(missing)} missing, {len(mismatched)} mismatched payload indexes")
+        sys.exit(1)
+    print(f"[OK] {args.collection}: all {len(PAYLOAD_INDEXES)} payload indexes present")
+
+
+if __name__ == "__main__":
+    main()
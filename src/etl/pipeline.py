@@ -0,0 +1,155 @@
+"""Threaded staged pipeline with bounded queues.
+
+Each stage runs `workers` threads that take items from the previous
+stage's queue, call `fn(item)` and put every returned item on the next
+queue. Queues are bounded (`queue_size`), so a slow stage applies
+back-pressure instead of buffering the whole input, and throughput is
+limited by the slowest stage rather than the sum of all stages.
+
+A stage may define `flush()`, called once after its input is exhausted
+(only for single-worker stages, e.g. batch assembly). The first exception
+raised by any stage stops the pipeline and is re-raised by `run_pipeline`.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Any], Optional[Iterable[Any]]]
+    workers: int = 1
+    queue_size: int = 4
+    flush: Optional[Callable[[], Optional[Iterable[Any]]]] = None
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self.workers = max(1, int(self.workers))
+        if self.flush is not None and self.workers != 1:
+            raise ValueError(f"Stage {self.name}: flush requires workers=1")
+
+    def _record(self, n_out: int, seconds: float) -> None:
+        with self._lock:
+            self.items_in += 1
+            self.items_out += n_out
+            self.busy_seconds += seconds
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _put(q: "queue.Queue", item: Any, stop: threading.Event) -> None:
+    while True:
+        if stop.is_set():
+            raise _Aborted()
+        try:
+            q.put(item, timeout=0.2)
+            return
+        except queue.Full:
+            continue
+
+
+def _get(q: "queue.Queue", stop: threading.Event) -> Any:
+    while True:
+        if stop.is_set():
+            raise _Aborted()
+        try:
+            return q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+
+
+def run_pipeline(source: Iterable[Any], stages: List[Stage], report: bool = True) -> List[Stage]:
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    queues = [queue.Queue(maxsize=max(1, s.queue_size)) for s in stages]
+    threads: List[threading.Thread] = []
+
+    def fail(exc: BaseException) -> None:
+        if not errors:
+            errors.append(exc)
+        stop.set()
+
+    def feed() -> None:
+        try:
+            for item in source:
+                _put(queues[0], item, stop)
+            for _ in range(stages[0].workers):
+                _put(queues[0], _DONE, stop)
+        except _Aborted:
+            pass
+        except BaseException as exc:
+            fail(exc)
+
+    remaining = [s.workers for s in stages]
+    remaining_lock = threading.Lock()
+
+    def work(idx: int) -> None:
+        stage = stages[idx]
+        in_q = queues[idx]
+        out_q = queues[idx + 1] if idx + 1 < len(stages) else None
+        try:
+            while True:
+                item = _get(in_q, stop)
+                if item is _DONE:
+                    break
+                started = time.perf_counter()
+                outputs = list(stage.fn(item) or ())
+                stage._record(len(outputs), time.perf_counter() - started)
+                if out_q is not None:
+                    for out in outputs:
+                        _put(out_q, out, stop)
+            if stage.flush is not None:
+                outputs = list(stage.flush() or ())
+                stage.items_out += len(outputs)
+                if out_q is not None:
+                    for out in outputs:
+                        _put(out_q, out, stop)
+            with remaining_lock:
+                remaining[idx] -= 1
+                last = remaining[idx] == 0
+            if last and out_q is not None:
+                for _ in range(stages[idx + 1].workers):
+                    _put(out_q, _DONE, stop)
+        except _Aborted:
+            pass
+        except BaseException as exc:
+            fail(exc)
+
+    threads.append(threading.Thread(target=feed, name="pipeline-source", daemon=True))
+    for idx, stage in enumerate(stages):
+        for n in range(stage.workers):
+            threads.append(threading.Thread(target=work, args=(idx,), name=f"pipeline-{stage.name}-{n}", daemon=True))
+
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(timeout=0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        raise
+    if errors:
+        raise errors[0]
+
+    if report:
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        for stage in stages:
+            utilization = stage.busy_seconds / (elapsed * stage.workers)
+            print(
+                f"[INFO] Stage {stage.name}: workers={stage.workers} in={stage.items_in} "
+                f"out={stage.items_out} busy={stage.busy_seconds:.1f}s util={utilization:.0%}"
+            )
+    return stages
@@ -0,0 +1,138 @@
+"""Token bucket rate limiters usable from threads, asyncio coroutines and worker processes."""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """`rate` tokens per second, bursting up to `capacity`.
+
+    `reserve(n)` takes the tokens immediately (the bucket may go negative) and
+    returns how long the caller must wait before using them, so concurrent
+    callers queue up in order instead of polling.
+    """
+
+    def __init__(self, rate: float, capacity: float = 0.0):
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity and capacity > 0 else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def reserve(self, n: float = 1.0) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, n: float = 1.0) -> None:
+        wait_s = self.reserve(n)
+        while wait_s > 0:
+            time.sleep(wait_s)
+            # A pause may have started while this caller was already queued.
+            wait_s = self.paused_for()
+
+    async def acquire_async(self, n: float = 1.0) -> None:
+        wait_s = self.reserve(n)
+        while wait_s > 0:
+            await asyncio.sleep(wait_s)
+            wait_s = self.paused_for()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for at least `seconds` (e.g. a server's Retry-After)."""
+        if not self.enabled or seconds <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._paused_until = max(self._paused_until, now + seconds)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in shared memory, for limits spanning worker processes.
+
+    Create it in the parent with a multiprocessing context and hand it to
+    workers through the pool initializer (see `install_shared_bucket`).
+    """
+
+    def __init__(self, rate: float, capacity: float = 0.0, ctx=None):
+        import multiprocessing
+
+        ctx = ctx or multiprocessing.get_context()
+        super().__init__(rate, capacity)
+        self._shared_tokens = ctx.Value("d", self.capacity, lock=False)
+        self._shared_updated = ctx.Value("d", time.time(), lock=False)
+        self._shared_paused_until = ctx.Value("d", 0.0, lock=False)
+        self._shared_lock = ctx.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1.0) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._shared_lock:
+            now = time.time()
+            tokens = min(
+                self.capacity,
+                self._shared_tokens.value + (now - self._shared_updated.value) * self.rate,
+            )
+            self._shared_updated.value = now
+            tokens -= n
+            self._shared_tokens.value = tokens
+            if tokens >= 0:
+                return 0.0
+            return -tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        if not self.enabled or seconds <= 0:
+            return
+        with self._shared_lock:
+            now = time.time()
+            tokens = min(
+                self.capacity,
+                self._shared_tokens.value + (now - self._shared_updated.value) * self.rate,
+            )
+            self._shared_updated.value = now
+            self._shared_tokens.value = min(tokens, -seconds * self.rate)
+            self._shared_paused_until.value = max(self._shared_paused_until.value, now + seconds)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._shared_paused_until.value - time.time())
+
+
+_installed: Dict[str, TokenBucket] = {}
+
+
+def install_shared_bucket(name: str, bucket: TokenBucket) -> None:
+    """Make `bucket_for(name, ...)` return `bucket` in this process."""
+    _installed[name] = bucket
+
+
+def bucket_for(name: str, rate: float, capacity: float = 0.0) -> TokenBucket:
+    """The installed shared bucket for `name`, or a new process-local one."""
+    return _installed.get(name) or TokenBucket(rate, capacity)
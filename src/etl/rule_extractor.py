@@ -0,0 +1,325 @@
+"""Deterministic notice field extractor run before LLM enrichment.
+
+Pulls deadlines (Korean date formats: `2025.03.15.(금) 18:00`, `3월 15일`,
+`오후 6시`, ranges with `~` / `-` / `부터`, dates followed by `까지`),
+contact phones/emails, fees and required-document lists with precompiled
+regexes. `confidence` says whether the rules covered the notice: only
+documents below `RULE_CONFIDENCE_THRESHOLD` are sent to the LLM
+(STRUCTURE_ARCHITECTURE.md section 6).
+
+Coverage and the LLM skip rate on the corpus:
+
+    python -m src.etl.rule_extractor --input data --limit 2000
+"""
+
+import argparse
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Bump when extraction rules change; part of the ingestion fingerprint.
+RULES_VERSION = "rules-v2"
+
+_DATE_RE = re.compile(
+    r"(?<![\d.])"
+    r"(?:(?P<y>20\d{2})\s*(?:[.\-/]|년)\s*)?"
+    r"(?P<m>1[0-2]|0?[1-9])\s*(?P<sep>[.\-/]|월)\s*"
+    r"(?P<d>3[01]|[12]\d|0?[1-9])(?!\d)\s*(?P<day>일)?\.?"
+    r"(?P<wd>\s*\(\s*[월화수목금토일](?:요일)?\s*\))?"
+    r"(?:\s*(?P<ampm>오전|오후|AM|PM|am|pm)?\s*(?P<hh>2[0-4]|[01]?\d)\s*"
+    r"(?::\s*(?P<mi>[0-5]\d)|시(?:\s*(?P<mi2>[0-5]?\d)\s*분)?))?"
+)
+_RANGE_SEP_RE = re.compile(r"\s*(?:~|∼|〜|-|–|부터)\s*")
+_UNTIL_RE = re.compile(r"\s*까지")
+_DEADLINE_KEYWORD_RE = re.compile(
+    r"(마감|기한|(?:신청|접수|모집|제출|등록|납부)\s*(?:기간|일정|일시|기한)|접수|신청|제출|deadline|due)",
+    re.IGNORECASE,
+)
+_ACTION_RE = re.compile(r"(신청|제출|접수|등록|지원|참가|응시|납부|apply|submit)", re.IGNORECASE)
+_PHONE_RE = re.compile(r"(?<!\d)(0\d{1,2}[-.)\s]\d{3,4}[-.\s]\d{4})(?!\d)")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_FEE_RE = re.compile(
+    r"(?P<label>수수료|참가비|등록금|납부금|응시료|수강료|회비|비용|fee)[^\n\d]{0,15}?"
+    r"(?:(?P<free>무료)|(?P<amount>\d{1,3}(?:,\d{3})+|\d+)\s*(?P<unit>만\s*원|천\s*원|원))",
+    re.IGNORECASE,
+)
+_DOCS_HEADER_RE = re.compile(r"(제출\s*서류|구비\s*서류|필요\s*서류|required\s*doc)", re.IGNORECASE)
+# Ingestion hands over whitespace-normalized content, so list items and
+# sections are found by their markers rather than by line breaks.
+_DOCS_STOP_RE = re.compile(
+    r"\n\s*\n|문의|연락처|담당|※|유의\s*사항|(?<=\s)\d{1,2}\.\s|\s[가-하]\.\s|\d{1,2}\s*월\s*\d|20\d{2}[.\-/년]"
+)
+_DOCS_SPLIT_RE = re.compile(r"\s*(?:[,·/\n]|(?:^|\s)[-•○◦▪*](?=\s)|[①-⑳]|\d{1,2}\)|\s및\s)\s*")
+_CONTEXT_CHARS = 40
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class RuleExtraction:
+    deadlines: List[Dict[str, str]] = field(default_factory=list)
+    phones: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    fees: List[str] = field(default_factory=list)
+    required_docs: List[str] = field(default_factory=list)
+    requires_action: bool = False
+    deadline_confidence: float = 0.0
+    evidence_text: str = ""
+    # How completely the rules covered the notice; the LLM runs below the threshold.
+    confidence: float = 0.0
+
+    @property
+    def contact(self) -> str:
+        return ", ".join(self.phones + self.emails)
+
+    def as_metadata(self) -> Dict:
+        """Same keys as LLM enrichment output, plus fees / required_docs."""
+        out: Dict = {
+            "deadlines": self.deadlines,
+            "requires_action": self.requires_action,
+            "contact": self.contact,
+            "evidence_text": self.evidence_text,
+            "fees": self.fees,
+            "required_docs": self.required_docs,
+        }
+        if self.deadlines:
+            out["deadline_confidence"] = self.deadline_confidence
+        return out
+
+
+def _reference_date(date: str) -> Optional[datetime]:
+    m = re.search(r"(20\d{2})[.\-/](\d{1,2})[.\-/](\d{1,2})", date or "")
+    if not m:
+        return None
+    try:
+        return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+def _next_year(dt: datetime) -> Optional[datetime]:
+    try:
+        return dt.replace(year=dt.year + 1)
+    except ValueError:
+        return None  # Feb 29
+
+
+def _to_datetime(
+    match: "re.Match",
+    ref: Optional[datetime],
+    year_hint: Optional[int],
+    range_start: Optional[datetime] = None,
+) -> Optional[datetime]:
+    year = match.group("y")
+    if not year and match.group("sep") == "-":
+        return None  # "10-12" is far more often a count or range than a date
+    if year:
+        y = int(year)
+    elif year_hint:
+        y = year_hint
+    elif ref is not None:
+        y = ref.year
+    else:
+        return None
+
+    hh, mi = 23, 59
+    if match.group("hh") is not None:
+        hh = int(match.group("hh"))
+        mi = int(match.group("mi") or match.group("mi2") or 0)
+        ampm = (match.group("ampm") or "").lower()
+        if ampm in ("오후", "pm") and hh < 12:
+            hh += 12
+        if hh == 24:
+            hh, mi = 23, 59
+    try:
+        dt = datetime(y, int(match.group("m")), int(match.group("d")), hh, mi)
+    except ValueError:
+        return None
+    # A yearless date before its range start ("12.20 ~ 1.5") or well before
+    # the notice date belongs to the next year.
+    if not year and (
+        (range_start is not None and dt < range_start) or (ref is not None and dt < ref - timedelta(days=60))
+    ):
+        return _next_year(dt)
+    return dt
+
+
+def _is_bare_dot_date(match: "re.Match") -> bool:
+    """Yearless `M.D` with no day/weekday/time marker: "평점 3.5" rather than a date."""
+    return (
+        not match.group("y")
+        and match.group("sep") == "."
+        and not match.group("day")
+        and not match.group("wd")
+        and match.group("hh") is None
+    )
+
+
+def _context_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """The surrounding line, clipped to _CONTEXT_CHARS on each side."""
+    left = max(text.rfind("\n", 0, start) + 1, start - _CONTEXT_CHARS)
+    right = text.find("\n", end)
+    right = min(len(text) if right < 0 else right, end + _CONTEXT_CHARS)
+    return left, right
+
+
+def _extract_deadlines(text: str, ref: Optional[datetime]) -> Tuple[List[Tuple[float, str, datetime, str]], bool]:
+    """([(score, label, datetime, evidence line)], has_deadline_signal)."""
+    matches = list(_DATE_RE.finditer(text))
+    candidates: List[Tuple[float, str, datetime, str]] = []
+    prev_dt: Optional[datetime] = None
+    prev_end = -1
+    for i, m in enumerate(matches):
+        is_range_end = prev_dt is not None and bool(_RANGE_SEP_RE.fullmatch(text, prev_end, m.start()))
+        dt = _to_datetime(
+            m,
+            ref,
+            prev_dt.year if prev_dt and not m.group("y") else None,
+            prev_dt if is_range_end else None,
+        )
+        if dt is None:
+            prev_dt, prev_end = None, -1
+            continue
+        is_until = bool(_UNTIL_RE.match(text, m.end()))
+        ends_range = bool(_RANGE_SEP_RE.match(text, m.end())) and not is_until
+        has_partner = is_range_end or (
+            i + 1 < len(matches) and bool(_RANGE_SEP_RE.fullmatch(text, m.end(), matches[i + 1].start()))
+        )
+        if _is_bare_dot_date(m) and not is_until and not has_partner:
+            prev_dt, prev_end = None, -1
+            continue
+        ctx_start, ctx_end = _context_bounds(text, m.start(), m.end())
+        keyword = _DEADLINE_KEYWORD_RE.search(text, ctx_start, m.start())
+
+        score = 0.0
+        if is_until:
+            score = 0.85 if keyword else 0.75
+        elif is_range_end:
+            score = 0.9 if keyword else 0.6
+        elif keyword and not ends_range:
+            score = 0.75
+        if score > 0:
+            label = _SPACE_RE.sub(" ", keyword.group(0)) if keyword else ""
+            candidates.append((score, label, dt, text[ctx_start:ctx_end].strip()))
+        prev_dt, prev_end = dt, m.end()
+
+    has_signal = bool(_DEADLINE_KEYWORD_RE.search(text)) or "까지" in text
+    return candidates, has_signal
+
+
+def _extract_fees(text: str) -> List[str]:
+    fees: List[str] = []
+    for m in _FEE_RE.finditer(text):
+        if m.group("free"):
+            value = f"{m.group('label')} 무료"
+        else:
+            value = f"{m.group('label')} {m.group('amount')}{_SPACE_RE.sub('', m.group('unit'))}"
+        if value not in fees:
+            fees.append(value)
+    return fees[:5]
+
+
+def _extract_required_docs(text: str) -> List[str]:
+    for header in _DOCS_HEADER_RE.finditer(text):
+        tail = text[header.end() : header.end() + 300].lstrip(" \t:：-")
+        first_line = tail.partition("\n")[0]
+        if first_line.strip():
+            tail = first_line  # inline list on the header's own line
+        stop = _DOCS_STOP_RE.search(tail)
+        if stop:
+            tail = tail[: stop.start()]
+        docs = []
+        for part in _DOCS_SPLIT_RE.split(tail):
+            part = part.strip(" .-")
+            if 1 < len(part) <= 40:
+                docs.append(part)
+        if docs:
+            return list(dict.fromkeys(docs))[:10]
+    return []
+
+
+def extract(title: str, content: str, date: str = "") -> RuleExtraction:
+    text = f"{title or ''}\n{content or ''}"
+    ref = _reference_date(date)
+    out = RuleExtraction()
+
+    candidates, has_signal = _extract_deadlines(text, ref)
+    seen = set()
+    for score, label, dt, _ in sorted(candidates, key=lambda c: c[2]):
+        key = dt.strftime("%Y-%m-%dT%H:%M")
+        if key in seen:
+            continue
+        seen.add(key)
+        out.deadlines.append({"label": label, "datetime": key})
+    if candidates:
+        best = max(candidates, key=lambda c: (c[0], c[2]))
+        out.deadline_confidence = best[0]
+        out.evidence_text = best[3][:200]
+
+    out.phones = list(dict.fromkeys(_SPACE_RE.sub("-", p) for p in _PHONE_RE.findall(text)))[:3]
+    out.emails = list(dict.fromkeys(_EMAIL_RE.findall(text)))[:3]
+    out.fees = _extract_fees(text)
+    out.required_docs = _extract_required_docs(content or "")
+    out.requires_action = bool(out.deadlines) and bool(_ACTION_RE.search(text))
+
+    if out.deadlines:
+        out.confidence = out.deadline_confidence
+    elif not has_signal:
+        out.confidence = 0.8  # nothing deadline-like to extract
+    else:
+        out.confidence = 0.3  # deadline wording without a parsable date
+    return out
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rule-based notice extractor coverage report")
+    parser.add_argument("--input", default="data", help="Notice jsonl root directory")
+    parser.add_argument("--limit", type=int, default=2000, help="Number of notices to scan")
+    parser.add_argument("--threshold", type=float, default=0.7, help="LLM is skipped at or above this confidence")
+    parser.add_argument("--show", type=int, default=0, help="Print extractions for the first N notices")
+    return parser.parse_args()
+
+
+def main() -> None:
+    from src.etl.utils import iter_metadata_files, iter_notice_rows
+
+    args = parse_args()
+    rows: List[Dict] = []
+    for path in sorted(iter_metadata_files(args.input)):
+        for row in iter_notice_rows(path):
+            rows.append(row)
+            if len(rows) >= args.limit:
+                break
+        if len(rows) >= args.limit:
+            break
+    if not rows:
+        print(f"[ERROR] No notices found under: {args.input}")
+        return
+
+    counts = {"deadlines": 0, "contact": 0, "fees": 0, "required_docs": 0, "llm_skipped": 0}
+    started = time.perf_counter()
+    for idx, row in enumerate(rows):
+        res = extract(
+            str(row.get("title") or ""),
+            str(row.get("content") or ""),
+            str(row.get("published_at") or row.get("date") or ""),
+        )
+        counts["deadlines"] += bool(res.deadlines)
+        counts["contact"] += bool(res.contact)
+        counts["fees"] += bool(res.fees)
+        counts["required_docs"] += bool(res.required_docs)
+        counts["llm_skipped"] += res.confidence >= args.threshold
+        if idx < args.show:
+            print(f"[INFO] {row.get('title', '')[:40]!r} conf={res.confidence:.2f} {res.as_metadata()}")
+    elapsed = time.perf_counter() - started
+
+    n = len(rows)
+    print(f"[INFO] docs={n} elapsed={elapsed:.2f}s ({n / max(elapsed, 1e-9):.0f} docs/s)")
+    for key, value in counts.items():
+        print(f"[INFO] {key}={value} ({value / n:.1%})")
+    print(f"[DONE] llm_skip_rate={counts['llm_skipped'] / n:.1%} at threshold={args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
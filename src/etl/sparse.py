@@ -0,0 +1,190 @@
+"""Local BM25 sparse vectors compatible with Qdrant's `qdrant/bm25` model.
+
+Reproduces fastembed's `Bm25` (the reference implementation behind
+`models.Document(model="qdrant/bm25")`): strip non-word characters,
+lowercase, split on whitespace, drop punctuation/English stopwords/tokens
+longer than 40 chars, Snowball-stem, hash with `abs(mmh3.hash(token))`.
+Document values are the BM25 term-frequency part
+
+    tf * (k + 1) / (tf + k * (1 - b + b * doc_len / avg_len))
+
+and query values are 1.0 per unique token; IDF is applied by Qdrant, so the
+sparse vector must be configured with `modifier=IDF`.
+
+Backends (`SPARSE_BACKEND` / `--sparse-backend`):
+  local       qdrant/bm25-identical vectors computed in-process (default)
+  local_kiwi  Korean morphemes from kiwipiepy instead of whitespace eojeol
+              (not interchangeable with qdrant/bm25; re-ingest when switching)
+  cloud       `models.Document` resolved by Qdrant Cloud Inference
+"""
+
+import os
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Union
+
+import mmh3
+from qdrant_client import models
+
+CLOUD_MODEL = "qdrant/bm25"
+SPARSE_BACKENDS = ("local", "local_kiwi", "cloud")
+
+# Qdrant/bm25 english.txt (NLTK English stopwords).
+ENGLISH_STOPWORDS: FrozenSet[str] = frozenset(
+    """
+    i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself
+    yourselves he him his himself she she's her hers herself it it's its itself they them their
+    theirs themselves what which who whom this that that'll these those am is are was were be
+    been being have has had having do does did doing a an the and but if or because as until
+    while of at by for with about against between into through during before after above below
+    to from up down in out on off over under again further then once here there when where why
+    how all any both each few more most other some such no nor not only own same so than too
+    very s t can will just don don't should should've now d ll m o re ve y ain aren aren't couldn
+    couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma mightn
+    mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren weren't
+    won won't wouldn wouldn't
+    """.split()
+)
+
+# Content-bearing kiwi tags: nouns, verb/adjective stems, roots, foreign words, numbers, hanja.
+KIWI_TAGS = ("NNG", "NNP", "NNB", "NR", "NP", "VV", "VA", "XR", "SL", "SN", "SH")
+
+_NON_ALNUM_RE = re.compile(r"[^\w\s]", flags=re.UNICODE)
+_NON_WORD_RE = re.compile(r"[^\w]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1)
+def _punctuation() -> FrozenSet[str]:
+    return frozenset(
+        chr(i) for i in range(sys.maxunicode) if unicodedata.category(chr(i)).startswith("P")
+    )
+
+
+def simple_tokenize(text: str) -> List[str]:
+    text = _NON_ALNUM_RE.sub(" ", text or "")
+    text = _NON_WORD_RE.sub(" ", text.lower())
+    return _SPACE_RE.sub(" ", text).strip().split()
+
+
+def token_id(token: str) -> int:
+    return abs(mmh3.hash(token))
+
+
+class Bm25SparseEncoder:
+    def __init__(
+        self,
+        k: float = 1.2,
+        b: float = 0.75,
+        avg_len: float = 256.0,
+        token_max_length: int = 40,
+        morphemes: bool = False,
+    ):
+        from py_rust_stemmers import SnowballStemmer
+
+        self.k = k
+        self.b = b
+        self.avg_len = avg_len
+        self.token_max_length = token_max_length
+        self.stopwords = ENGLISH_STOPWORDS
+        self.punctuation = _punctuation()
+        self.stemmer = SnowballStemmer("english")
+        self._kiwi = None
+        if morphemes:
+            from kiwipiepy import Kiwi
+
+            self._kiwi = Kiwi()
+
+    def _raw_tokens(self, text: str) -> List[str]:
+        if self._kiwi is None:
+            return simple_tokenize(text)
+        tokens: List[str] = []
+        for morph in self._kiwi.tokenize(text or ""):
+            if morph.tag in KIWI_TAGS:
+                tokens.extend(simple_tokenize(morph.form))
+        return tokens
+
+    def tokens(self, text: str) -> List[str]:
+        out: List[str] = []
+        for token in self._raw_tokens(text):
+            lower = token.lower()
+            if token in self.punctuation or lower in self.stopwords:
+                continue
+            if len(token) > self.token_max_length:
+                continue
+            stemmed = self.stemmer.stem_word(lower)
+            if stemmed:
+                out.append(stemmed)
+        return out
+
+    def term_frequencies(self, tokens: List[str]) -> Dict[int, float]:
+        counter: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            counter[token] += 1
+        doc_len = len(tokens)
+        norm = self.k * (1 - self.b + self.b * doc_len / self.avg_len)
+        out: Dict[int, float] = {}
+        for token, count in counter.items():
+            out[token_id(token)] = count * (self.k + 1) / (count + norm)
+        return out
+
+    def document(self, text: str) -> models.SparseVector:
+        tf = self.term_frequencies(self.tokens(text))
+        return models.SparseVector(indices=list(tf.keys()), values=list(tf.values()))
+
+    def query(self, text: str) -> models.SparseVector:
+        ids = sorted({token_id(token) for token in self.tokens(text)})
+        return models.SparseVector(indices=ids, values=[1.0] * len(ids))
+
+
+SparseInput = Union[models.SparseVector, models.Document]
+
+
+class SparseVectorizer:
+    """Builds the `sparse` named vector for points and queries for one backend."""
+
+    def __init__(self, backend: Optional[str] = None):
+        backend = (backend or os.getenv("SPARSE_BACKEND", "local")).strip().lower()
+        if backend not in SPARSE_BACKENDS:
+            raise ValueError(f"Unknown SPARSE_BACKEND: {backend}")
+        self.backend = backend
+        self._encoder: Optional[Bm25SparseEncoder] = None
+        if backend != "cloud":
+            self._encoder = Bm25SparseEncoder(morphemes=backend == "local_kiwi")
+
+    @property
+    def needs_cloud_inference(self) -> bool:
+        return self._encoder is None
+
+    def document(self, text: str) -> SparseInput:
+        if self._encoder is None:
+            return models.Document(text=text, model=CLOUD_MODEL)
+        return self._encoder.document(text)
+
+    def query(self, text: str) -> SparseInput:
+        if self._encoder is None:
+            return models.Document(text=text, model=CLOUD_MODEL)
+        return self._encoder.query(text)
+
+
+def sparse_vector_params() -> models.SparseVectorParams:
+    return models.SparseVectorParams(modifier=models.Modifier.IDF)
+
+
+def ensure_idf_modifier(client, collection_name: str, vector_name: str = "sparse") -> None:
+    """BM25 values only score correctly with the IDF modifier; enable it on older collections."""
+    try:
+        info = client.get_collection(collection_name)
+        params = (info.config.params.sparse_vectors or {}).get(vector_name)
+        if params is not None and params.modifier == models.Modifier.IDF:
+            return
+        client.update_collection(
+            collection_name=collection_name,
+            sparse_vectors_config={vector_name: models.SparseVectorParams(modifier=models.Modifier.IDF)},
+        )
+        print(f"[INFO] Enabled IDF modifier on {collection_name}.{vector_name}")
+    except Exception as exc:
+        print(f"[WARN] Could not enable IDF modifier on {collection_name}.{vector_name}: {exc}")
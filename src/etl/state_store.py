@@ -0,0 +1,338 @@
+"""SQLite ingestion state store (`.ingestion_cache/<collection>_<hash>.sqlite3`).
+
+One row per doc: fingerprint, block ids written to Qdrant, embedding model,
+status, last upsert time and last time the doc was seen in the input.
+Ingestion commits after every upserted batch (WAL mode), so an interrupted
+run resumes from the last committed batch instead of starting over. The
+legacy JSON fingerprint cache (and `.blocks.json` index) is imported on
+first open.
+
+Chunks whose dense embedding failed (the encoder returned an all-zero or
+malformed vector) are queued in `failed_embeddings`, keyed by point id, with
+the text to re-embed. `python -m src.etl.ingestion --retry-failed` drains it.
+
+Stale docs (failed / embedded with another model / no longer in the input):
+
+    python -m src.etl.state_store stale --collection school_notice --input data
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STATUS_UPSERTED = "upserted"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL DEFAULT '',
+    block_ids TEXT NOT NULL DEFAULT '[]',
+    embedding_model TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    error TEXT NOT NULL DEFAULT '',
+    last_upserted_at TEXT NOT NULL DEFAULT '',
+    last_seen_at TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_docs_status ON docs(status);
+CREATE TABLE IF NOT EXISTS failed_embeddings (
+    point_id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL DEFAULT '',
+    embedding_model TEXT NOT NULL DEFAULT '',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    first_failed_at TEXT NOT NULL DEFAULT '',
+    last_failed_at TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def state_path_for(collection_name: str, input_dir: str, root: str = ".ingestion_cache") -> Path:
+    safe_collection = re.sub(r"[^A-Za-z0-9._-]", "_", collection_name)
+    input_hash = hashlib.sha1(str(Path(input_dir).resolve()).encode("utf-8")).hexdigest()[:10]
+    return Path(root) / f"{safe_collection}_{input_hash}.sqlite3"
+
+
+class IngestionStateStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._import_legacy_json()
+
+    def _import_legacy_json(self) -> None:
+        legacy = self.path.with_suffix(".json")
+        blocks_path = self.path.with_suffix(".blocks.json")
+        if not legacy.exists() and not blocks_path.exists():
+            return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+        if count:
+            return
+
+        def _read(path: Path) -> Dict:
+            try:
+                data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            except (OSError, json.JSONDecodeError):
+                print(f"[WARN] Legacy state load failed: {path}")
+                return {}
+            return data if isinstance(data, dict) else {}
+
+        fingerprints = _read(legacy)
+        blocks = _read(blocks_path)
+        rows = []
+        for doc_id in set(fingerprints) | set(blocks):
+            block_ids = blocks.get(doc_id)
+            rows.append(
+                (
+                    str(doc_id),
+                    str(fingerprints.get(doc_id, "")),
+                    json.dumps(block_ids) if isinstance(block_ids, list) else "",
+                    STATUS_UPSERTED if doc_id in fingerprints else "",
+                )
+            )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO docs (doc_id, fingerprint, block_ids, status) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        print(f"[INFO] Imported legacy fingerprint cache docs={len(rows)} into {self.path}")
+
+    def fingerprints(self) -> Dict[str, str]:
+        """doc_id -> fingerprint of docs whose last ingestion completed."""
+        rows = self._conn.execute(
+            "SELECT doc_id, fingerprint FROM docs WHERE status = ? AND fingerprint != ''",
+            (STATUS_UPSERTED,),
+        ).fetchall()
+        return dict(rows)
+
+    def block_ids(self) -> Dict[str, List[str]]:
+        """doc_id -> block ids written by the last ingestion. Docs with unknown blocks are absent."""
+        out: Dict[str, List[str]] = {}
+        for doc_id, raw in self._conn.execute("SELECT doc_id, block_ids FROM docs WHERE block_ids != ''"):
+            try:
+                out[doc_id] = list(json.loads(raw))
+            except (TypeError, ValueError):
+                continue
+        return out
+
+    def start_run(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (_now(),))
+            self._conn.commit()
+            return int(cur.lastrowid)
+
+    def finish_run(self, run_id: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (_now(), run_id))
+            self._conn.commit()
+
+    def record_upserted(self, docs: Iterable[Tuple[str, str, List[str]]], embedding_model: str) -> None:
+        """Commit (doc_id, fingerprint, block_ids) of docs fully written to Qdrant."""
+        now = _now()
+        rows = [
+            (doc_id, fp, json.dumps(sorted(set(blocks))), embedding_model, STATUS_UPSERTED, now, now)
+            for doc_id, fp, blocks in docs
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO docs (doc_id, fingerprint, block_ids, embedding_model, status, error,
+                                  last_upserted_at, last_seen_at)
+                VALUES (?, ?, ?, ?, ?, '', ?, ?)
+                ON CONFLICT(doc_id) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    block_ids = excluded.block_ids,
+                    embedding_model = excluded.embedding_model,
+                    status = excluded.status,
+                    error = '',
+                    last_upserted_at = excluded.last_upserted_at,
+                    last_seen_at = excluded.last_seen_at
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def mark_failed(self, doc_ids: Iterable[str], error: str) -> None:
+        now = _now()
+        rows = [(doc_id, STATUS_FAILED, error[:500], now) for doc_id in doc_ids]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO docs (doc_id, status, error, last_seen_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(doc_id) DO UPDATE SET
+                    status = excluded.status, error = excluded.error, last_seen_at = excluded.last_seen_at
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def mark_seen(self, doc_ids: Iterable[str]) -> None:
+        now = _now()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE docs SET last_seen_at = ? WHERE doc_id = ?",
+                [(now, doc_id) for doc_id in doc_ids],
+            )
+            self._conn.commit()
+
+    def queue_failed_embeddings(self, items: Iterable[Tuple[str, str, str]], embedding_model: str, error: str) -> None:
+        """Queue (point_id, doc_id, text) of points upserted without a dense vector."""
+        now = _now()
+        rows = [(point_id, doc_id, text, embedding_model, error[:500], now, now) for point_id, doc_id, text in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO failed_embeddings (point_id, doc_id, text, embedding_model, attempts, error,
+                                               first_failed_at, last_failed_at)
+                VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+                ON CONFLICT(point_id) DO UPDATE SET
+                    doc_id = excluded.doc_id,
+                    text = excluded.text,
+                    embedding_model = excluded.embedding_model,
+                    attempts = failed_embeddings.attempts + 1,
+                    error = excluded.error,
+                    last_failed_at = excluded.last_failed_at
+                """,
+                rows,
+            )
+            self._conn.commit()
+
+    def clear_failed_embeddings(self, point_ids: Iterable[str]) -> None:
+        """Drop points that now have a dense vector (or no longer exist) from the retry queue."""
+        ids = [(point_id,) for point_id in point_ids]
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM failed_embeddings WHERE point_id = ?", ids)
+            self._conn.commit()
+
+    def failed_embeddings(self, embedding_model: Optional[str] = None) -> List[Tuple[str, str, str, int]]:
+        """(point_id, doc_id, text, attempts) of queued points, oldest first."""
+        sql = "SELECT point_id, doc_id, text, attempts FROM failed_embeddings"
+        params: Tuple = ()
+        if embedding_model:
+            sql += " WHERE embedding_model = ?"
+            params = (embedding_model,)
+        return self._conn.execute(sql + " ORDER BY first_failed_at, point_id", params).fetchall()
+
+    def failed_embedding_count(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM failed_embeddings").fetchone()
+        return int(count)
+
+    def last_run_started(self) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT started_at FROM runs WHERE finished_at != '' ORDER BY run_id DESC LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def stale(
+        self,
+        embedding_model: Optional[str] = None,
+        older_than_days: Optional[float] = None,
+        include_unseen: bool = True,
+    ) -> List[Tuple[str, str, str]]:
+        """(doc_id, reason, detail) for docs that need re-ingestion or cleanup."""
+        out: List[Tuple[str, str, str]] = []
+        for doc_id, error in self._conn.execute(
+            "SELECT doc_id, error FROM docs WHERE status = ?", (STATUS_FAILED,)
+        ):
+            out.append((doc_id, "failed", error))
+        if embedding_model:
+            for doc_id, model in self._conn.execute(
+                "SELECT doc_id, embedding_model FROM docs WHERE status = ? AND embedding_model != ?",
+                (STATUS_UPSERTED, embedding_model),
+            ):
+                out.append((doc_id, "embedding_model", model or "unknown"))
+        if older_than_days is not None:
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+            for doc_id, ts in self._conn.execute(
+                "SELECT doc_id, last_upserted_at FROM docs WHERE status = ? AND last_upserted_at < ?",
+                (STATUS_UPSERTED, cutoff),
+            ):
+                out.append((doc_id, "old", ts or "unknown"))
+        last_run = self.last_run_started() if include_unseen else None
+        if last_run:
+            for doc_id, ts in self._conn.execute(
+                "SELECT doc_id, last_seen_at FROM docs WHERE last_seen_at < ?", (last_run,)
+            ):
+                out.append((doc_id, "not_in_input", ts or "unknown"))
+        return out
+
+    def summary(self) -> Dict[str, int]:
+        counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM docs GROUP BY status").fetchall())
+        counts["failed_embeddings"] = self.failed_embedding_count()
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            # Fold the WAL back into the main file so the database is a single file again.
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.close()
+
+
+def parse_args() -> argparse.Namespace:
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Inspect the ingestion state store")
+    parser.add_argument("command", choices=["stale", "summary"])
+    parser.add_argument("--collection", default=settings.COLLECTION_NAME, help="Qdrant collection name")
+    parser.add_argument("--input", default="data", help="Input directory the ingestion ran on")
+    parser.add_argument("--state", default="", help="State store path (default: derived from collection/input)")
+    parser.add_argument("--model", default="", help="Current embedding model id; other models are stale")
+    parser.add_argument("--older-than-days", type=float, default=None, help="Upserted longer ago than this")
+    parser.add_argument("--limit", type=int, default=50, help="Rows to print per reason")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    path = Path(args.state) if args.state else state_path_for(args.collection, args.input)
+    if not path.exists() and not path.with_suffix(".json").exists():
+        print(f"[ERROR] State store not found: {path}")
+        return
+    store = IngestionStateStore(path)
+    if args.command == "summary":
+        print(f"[INFO] {path}: {store.summary()} last_run={store.last_run_started()}")
+        return
+
+    rows = store.stale(embedding_model=args.model or None, older_than_days=args.older_than_days)
+    by_reason: Dict[str, List[Tuple[str, str, str]]] = {}
+    for row in rows:
+        by_reason.setdefault(row[1], []).append(row)
+    for reason, items in by_reason.items():
+        print(f"[INFO] {reason}: {len(items)} docs")
+        for doc_id, _, detail in items[: args.limit]:
+            print(f"  {doc_id}\t{detail}")
+    print(f"[DONE] stale={len(rows)}")
+
+
+if __name__ == "__main__":
+    main()
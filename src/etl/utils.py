@@ -1,15 +1,30 @@
 ﻿import hashlib
-import json
 import re
 import uuid
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from src.etl import codec, notice_archive, zstd_jsonl
+
+_WS_RE = re.compile(r"\s+")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
 
 
 def normalize_whitespace(text: str) -> str:
     if not text:
         return ""
-    return re.sub(r"\s+", " ", str(text)).strip()
+    return _WS_RE.sub(" ", str(text)).strip()
+
+
+def normalize_lines(text: str) -> str:
+    """`normalize_whitespace` that keeps one newline per line break.
+
+    Same length and offsets as `normalize_whitespace(text)`; only the
+    separators at line breaks are "\n" instead of " ".
+    """
+    if not text:
+        return ""
+    return "\n".join(line for line in (normalize_whitespace(ln) for ln in str(text).splitlines()) if line)
 
 
 def build_bm25_text(title: str, section_header: str, chunk_text: str) -> str:
@@ -33,37 +48,42 @@ def deterministic_uuid(fields: List[str], separator: str = "|") -> str:
     return str(uuid.UUID(digest[:32]))
 
 
+_BLOCK_TYPE_RULES = [
+    ("deadline", [r"deadline", r"due\s*date", r"\ub9c8\uac10", r"\uae30\ud55c", r"\uae4c\uc9c0"]),
+    (
+        "eligibility",
+        [r"eligib", r"\ub300\uc0c1", r"\uc790\uaca9", r"\uc9c0\uc6d0\s*\uc790\uaca9", r"\uc2e0\uccad\s*\uc790\uaca9"],
+    ),
+    (
+        "required_docs",
+        [
+            r"required\s*doc",
+            r"\uc81c\ucd9c\s*\uc11c\ub958",
+            r"\uad6c\ube44\s*\uc11c\ub958",
+            r"\ud544\uc694\s*\uc11c\ub958",
+        ],
+    ),
+    ("procedure", [r"procedure", r"step", r"\uc2e0\uccad\s*\ubc29\ubc95", r"\uc808\ucc28", r"\ubc29\ubc95"]),
+    (
+        "contact",
+        [r"contact", r"email", r"\ubb38\uc758", r"\uc5f0\ub77d\ucc98", r"\ub2f4\ub2f9\uc790", r"\uc804\ud654"],
+    ),
+    ("fee", [r"fee", r"\uc218\uc218\ub8cc", r"\ube44\uc6a9", r"\ub4f1\ub85d\uae08", r"\ub0a9\ubd80"]),
+    ("policy", [r"policy", r"\uc720\uc758\uc0ac\ud56d", r"\uc548\ub0b4\uc0ac\ud56d", r"\uaddc\uc815", r"\uc815\ucc45"]),
+    ("attachment_summary", [r"attachment", r"\ucca8\ubd80", r"\ubd99\uc784"]),
+]
+# One alternation per block type, compiled once; rules are tried in priority order.
+_BLOCK_TYPE_RES = [
+    (block_type, re.compile("|".join(f"(?:{p})" for p in patterns)))
+    for block_type, patterns in _BLOCK_TYPE_RULES
+]
+
+
 def classify_block_type(section_header: str, text: str) -> str:
     source = f"{section_header or ''} {text or ''}".lower()
-    rules = [
-        ("deadline", [r"deadline", r"due\s*date", r"\ub9c8\uac10", r"\uae30\ud55c", r"\uae4c\uc9c0"]),
-        (
-            "eligibility",
-            [r"eligib", r"\ub300\uc0c1", r"\uc790\uaca9", r"\uc9c0\uc6d0\s*\uc790\uaca9", r"\uc2e0\uccad\s*\uc790\uaca9"],
-        ),
-        (
-            "required_docs",
-            [
-                r"required\s*doc",
-                r"\uc81c\ucd9c\s*\uc11c\ub958",
-                r"\uad6c\ube44\s*\uc11c\ub958",
-                r"\ud544\uc694\s*\uc11c\ub958",
-            ],
-        ),
-        ("procedure", [r"procedure", r"step", r"\uc2e0\uccad\s*\ubc29\ubc95", r"\uc808\ucc28", r"\ubc29\ubc95"]),
-        (
-            "contact",
-            [r"contact", r"email", r"\ubb38\uc758", r"\uc5f0\ub77d\ucc98", r"\ub2f4\ub2f9\uc790", r"\uc804\ud654"],
-        ),
-        ("fee", [r"fee", r"\uc218\uc218\ub8cc", r"\ube44\uc6a9", r"\ub4f1\ub85d\uae08", r"\ub0a9\ubd80"]),
-        ("policy", [r"policy", r"\uc720\uc758\uc0ac\ud56d", r"\uc548\ub0b4\uc0ac\ud56d", r"\uaddc\uc815", r"\uc815\ucc45"]),
-        ("attachment_summary", [r"attachment", r"\ucca8\ubd80", r"\ubd99\uc784"]),
-    ]
-
-    for block_type, patterns in rules:
-        for pattern in patterns:
-            if re.search(pattern, source):
-                return block_type
+    for block_type, pattern in _BLOCK_TYPE_RES:
+        if pattern.search(source):
+            return block_type
     return "general"
 
 
@@ -75,31 +95,38 @@ def chunk_text(text: str, chunk_size: int = 900, overlap: int = 120) -> List[str
     if not cleaned:
         return []
 
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", cleaned) if p.strip()]
+    paragraphs = [p.strip() for p in _PARAGRAPH_SPLIT_RE.split(cleaned) if p.strip()]
     if not paragraphs:
         paragraphs = [cleaned]
 
+    # The current chunk is kept as a list of paragraphs plus its joined length
+    # and only joined when emitted.
     chunks: List[str] = []
-    current = ""
+    current: List[str] = []
+    current_len = 0
     for para in paragraphs:
-        candidate = f"{current}\n\n{para}".strip() if current else para
-        if len(candidate) <= chunk_size:
-            current = candidate
+        candidate_len = current_len + 2 + len(para) if current else len(para)
+        if candidate_len <= chunk_size:
+            current.append(para)
+            current_len = candidate_len
             continue
 
         if current:
-            chunks.append(current)
-            tail = current[-overlap:] if overlap > 0 else ""
-            current = f"{tail}\n\n{para}".strip() if tail else para
+            joined = "\n\n".join(current)
+            chunks.append(joined)
+            tail = joined[-overlap:].lstrip() if overlap > 0 else ""
+            current = [tail, para] if tail else [para]
+            current_len = len(tail) + 2 + len(para) if tail else len(para)
         else:
             for i in range(0, len(para), chunk_size):
                 piece = para[i : i + chunk_size]
                 if piece:
                     chunks.append(piece)
-            current = ""
+            current = []
+            current_len = 0
 
     if current:
-        chunks.append(current)
+        chunks.append("\n\n".join(current))
 
     return [c for c in chunks if c and len(c.strip()) >= 10]
 
@@ -110,7 +137,8 @@ def iter_metadata_files(input_dir: str) -> Iterator[Path]:
         return iter(())
     return (
         p
-        for p in root.rglob("*.jsonl")
+        for pattern in ("*.jsonl", f"*{notice_archive.COMPACT_SUFFIX}", f"*{zstd_jsonl.ZST_SUFFIX}")
+        for p in root.rglob(pattern)
         if p.is_file()
         and ".ipynb_checkpoints" not in p.parts
         and not p.name.endswith("-checkpoint.jsonl")
@@ -118,12 +146,45 @@ def iter_metadata_files(input_dir: str) -> Iterator[Path]:
 
 
 def iter_jsonl(path: Path) -> Iterable[Dict]:
-    with path.open("r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                continue
+    """Rows of a plain, zstd (.jsonl.zst) or compact (notice-compact) jsonl file.
+
+    Compact rows are returned as NoticeView, which rebuilds raw/normalized/assets lazily.
+    """
+    for line in notice_archive.iter_lines(path):
+        try:
+            yield notice_archive.wrap_row(codec.loads(line))
+        except codec.DecodeError:
+            continue
+
+
+def iter_notice_rows(path: Path) -> Iterable[Dict]:
+    """Like iter_jsonl, but decodes only codec.NOTICE_FIELDS (skips raw and most of normalized/assets)."""
+    for line in notice_archive.iter_lines(path):
+        try:
+            yield codec.decode_notice(line)
+        except codec.DecodeError:
+            continue
+
+
+def iter_notice_keys(path: Path) -> Iterable[Tuple[int, Dict]]:
+    """(line offset, row with only codec.NOTICE_KEY_FIELDS) for every notice row."""
+    for offset, line in notice_archive.iter_lines_with_offsets(path):
+        try:
+            yield offset, codec.decode_notice_key(line)
+        except codec.DecodeError:
+            continue
+
+
+def iter_notice_rows_at(path: Path, offsets: Iterable[int]) -> Iterable[Dict]:
+    """iter_notice_rows for the lines at the given (ascending) offsets only."""
+    for _, line in notice_archive.iter_lines_at(path, offsets):
+        try:
+            yield codec.decode_notice(line)
+        except codec.DecodeError:
+            continue
+
+
+def write_jsonl(path: Path, rows: Iterable[Dict]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(codec.dumps_line(row))
@@ -0,0 +1,360 @@
+"""Seekable zstd JSONL (`*.jsonl.zst`).
+
+Files follow the zstd seekable format: independent zstd frames (each a run
+of whole JSONL lines) followed by a skippable seek-table frame listing the
+compressed/decompressed size of every frame. Plain `zstd -d` and any
+streaming decoder read them as ordinary `.zst`; readers that know the seek
+table can jump to a decompressed byte offset by decoding a single frame.
+
+Appending (crawler `save_post`) adds one small frame and rewrites the seek
+table; an append interrupted before the table is written is recovered by
+the next one. `recompress` re-packs crawler notice files (`<dept_id>.jsonl`
+/ `.jsonl.zst`) into large frames. `--min-small-frames`
+skips files with fewer small (appended) frames, so scheduled runs do not
+rewrite, and re-commit, every archive each day:
+
+    python -m src.etl.zstd_jsonl recompress --input data --min-small-frames 64
+"""
+
+import argparse
+import io
+import os
+import struct
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Tuple
+
+import zstandard
+
+ZST_SUFFIX = ".jsonl.zst"
+ZSTD_MAGIC = 0xFD2FB528
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+FOOTER_SIZE = 9
+DEFAULT_FRAME_BYTES = 1 << 20
+DEFAULT_LEVEL = 9
+
+# (compressed offset, decompressed offset, compressed size, decompressed size)
+FrameEntry = Tuple[int, int, int, int]
+
+
+def is_zst_path(path: Path) -> bool:
+    return path.name.endswith(ZST_SUFFIX)
+
+
+def _read_seek_table(f: IO[bytes]) -> Tuple[List[FrameEntry], int]:
+    """Return (frames, seek table start offset). Empty list when the file has no seek table."""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    if size < FOOTER_SIZE + 8:
+        return [], size
+    f.seek(size - FOOTER_SIZE)
+    num_frames, descriptor, magic = struct.unpack("<IBI", f.read(FOOTER_SIZE))
+    if magic != SEEKABLE_MAGIC:
+        return [], size
+    entry_size = 12 if descriptor & 0x80 else 8
+    table_size = 8 + num_frames * entry_size + FOOTER_SIZE
+    table_start = size - table_size
+    if table_start < 0:
+        return [], size
+    f.seek(table_start)
+    skippable_magic, frame_size = struct.unpack("<II", f.read(8))
+    if skippable_magic != SKIPPABLE_MAGIC or frame_size != table_size - 8:
+        return [], size
+
+    frames: List[FrameEntry] = []
+    c_off = 0
+    d_off = 0
+    for _ in range(num_frames):
+        c_size, d_size = struct.unpack("<II", f.read(8))
+        if entry_size == 12:
+            f.read(4)
+        frames.append((c_off, d_off, c_size, d_size))
+        c_off += c_size
+        d_off += d_size
+    if c_off != table_start:
+        return [], size
+    return frames, table_start
+
+
+def _scan_frames(f: IO[bytes]) -> List[FrameEntry]:
+    """Frames of a file without a seek table, found by decoding them in order.
+
+    Stops at the first frame that is not a complete zstd data frame (an old
+    seek table, or an append interrupted mid-write).
+    """
+    frames: List[FrameEntry] = []
+    c_off = 0
+    d_off = 0
+    f.seek(0)
+    pending = b""
+    while True:
+        if len(pending) < 4:
+            pending += f.read(DEFAULT_FRAME_BYTES)
+        if len(pending) < 4 or struct.unpack("<I", pending[:4])[0] != ZSTD_MAGIC:
+            return frames
+        decoder = zstandard.ZstdDecompressor().decompressobj()
+        chunk, pending = pending, b""
+        c_size = 0
+        d_size = 0
+        try:
+            while True:
+                d_size += len(decoder.decompress(chunk))
+                if decoder.eof:
+                    pending = decoder.unused_data
+                    c_size += len(chunk) - len(pending)
+                    break
+                c_size += len(chunk)
+                chunk = f.read(DEFAULT_FRAME_BYTES)
+                if not chunk:
+                    return frames
+        except zstandard.ZstdError:
+            return frames
+        frames.append((c_off, d_off, c_size, d_size))
+        c_off += c_size
+        d_off += d_size
+
+
+def read_seek_table(path: Path) -> List[FrameEntry]:
+    with path.open("rb") as f:
+        frames, _ = _read_seek_table(f)
+    return frames
+
+
+def _seek_table_bytes(frames: List[FrameEntry]) -> bytes:
+    entries = b"".join(struct.pack("<II", c_size, d_size) for _, _, c_size, d_size in frames)
+    footer = struct.pack("<IBI", len(frames), 0, SEEKABLE_MAGIC)
+    body = entries + footer
+    return struct.pack("<II", SKIPPABLE_MAGIC, len(body)) + body
+
+
+class SeekableZstdWriter:
+    """Write JSONL lines as independent zstd frames plus a seek table."""
+
+    def __init__(
+        self,
+        path: Path,
+        append: bool = False,
+        frame_bytes: int = DEFAULT_FRAME_BYTES,
+        level: int = DEFAULT_LEVEL,
+    ):
+        self.path = path
+        self.frame_bytes = max(1, frame_bytes)
+        self._compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+        self._buffer = bytearray()
+        self._frames: List[FrameEntry] = []
+        self._c_off = 0
+        self._d_off = 0
+
+        if append and path.exists():
+            self._file = path.open("r+b")
+            frames, table_start = _read_seek_table(self._file)
+            if not frames and table_start > 0:
+                # Interrupted append (frames written, table not) or a plain .zst:
+                # keep the complete frames and write a fresh table after them.
+                frames = _scan_frames(self._file)
+                if not frames:
+                    raise ValueError(f"{path} has no seek table or readable frames; run recompress first")
+            self._frames = frames
+            if frames:
+                last_c, last_d, last_cs, last_ds = frames[-1]
+                self._c_off = last_c + last_cs
+                self._d_off = last_d + last_ds
+            self._file.seek(self._c_off)
+            self._file.truncate()
+        else:
+            self._file = path.open("wb")
+
+    def write(self, data: bytes) -> None:
+        self._buffer += data
+        if len(self._buffer) >= self.frame_bytes:
+            self._flush_frame()
+
+    def write_line(self, line: str) -> None:
+        self.write(line.encode("utf-8"))
+
+    def _flush_frame(self) -> None:
+        if not self._buffer:
+            return
+        raw = bytes(self._buffer)
+        compressed = self._compressor.compress(raw)
+        self._file.write(compressed)
+        self._frames.append((self._c_off, self._d_off, len(compressed), len(raw)))
+        self._c_off += len(compressed)
+        self._d_off += len(raw)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._flush_frame()
+        self._file.write(_seek_table_bytes(self._frames))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+    def __enter__(self) -> "SeekableZstdWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def open_reader(path: Path, offset: int = 0) -> IO[bytes]:
+    """Buffered decompressed stream, positioned at decompressed byte `offset`."""
+    f = path.open("rb")
+    skip = offset
+    if offset > 0:
+        frames, _ = _read_seek_table(f)
+        if frames:
+            idx = max(bisect_right([d_off for _, d_off, _, _ in frames], offset) - 1, 0)
+            c_off, d_off, _, _ = frames[idx]
+            f.seek(c_off)
+            skip = offset - d_off
+        else:
+            f.seek(0)
+    else:
+        f.seek(0)
+    reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True)
+    buffered = io.BufferedReader(reader, buffer_size=DEFAULT_FRAME_BYTES)
+    while skip > 0:
+        chunk = buffered.read(min(skip, DEFAULT_FRAME_BYTES))
+        if not chunk:
+            break
+        skip -= len(chunk)
+    return buffered
+
+
+def append_lines(path: Path, lines: Iterable[str]) -> None:
+    """Append lines as one new frame (creating the file if needed)."""
+    with SeekableZstdWriter(path, append=True, frame_bytes=1 << 62) as writer:
+        for line in lines:
+            writer.write_line(line)
+
+
+def write_lines_atomic(path: Path, lines: Iterable[str], level: int = DEFAULT_LEVEL) -> int:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        with SeekableZstdWriter(tmp, level=level) as writer:
+            for line in lines:
+                writer.write_line(line)
+                count += 1
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
+
+
+def recompress_file(
+    src: Path,
+    dst: Path,
+    level: int = DEFAULT_LEVEL,
+    frame_bytes: int = DEFAULT_FRAME_BYTES,
+) -> int:
+    """Re-pack `src` (.jsonl or .jsonl.zst) into `dst` with large frames. Returns line count."""
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    count = 0
+    try:
+        source = open_reader(src) if is_zst_path(src) else src.open("rb")
+        with source, SeekableZstdWriter(tmp, frame_bytes=frame_bytes, level=level) as writer:
+            for line in source:
+                if not line.strip():
+                    continue
+                writer.write(line if line.endswith(b"\n") else line + b"\n")
+                count += 1
+        os.replace(tmp, dst)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return count
+
+
+def zst_path_for(path: Path) -> Path:
+    if is_zst_path(path):
+        return path
+    return path.with_name(path.name[: -len(".jsonl")] + ZST_SUFFIX)
+
+
+def _needs_repack(path: Path, frame_bytes: int, min_small_frames: int = 1) -> bool:
+    frames = read_seek_table(path)
+    if not frames:
+        return True
+    small = sum(1 for _, _, _, d_size in frames[:-1] if d_size < frame_bytes // 2)
+    return small >= max(1, min_small_frames)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Seekable zstd JSONL maintenance")
+    parser.add_argument("command", choices=["recompress"], help="recompress: jsonl -> jsonl.zst, re-pack zst")
+    parser.add_argument("--input", default="data", help="Input root directory")
+    parser.add_argument("--level", type=int, default=DEFAULT_LEVEL, help="zstd compression level")
+    parser.add_argument(
+        "--frame-bytes",
+        type=int,
+        default=DEFAULT_FRAME_BYTES,
+        help="Target decompressed bytes per frame (seek granularity)",
+    )
+    parser.add_argument(
+        "--min-small-frames",
+        type=int,
+        default=1,
+        help="Re-pack a .jsonl.zst only once it has this many small (appended) frames",
+    )
+    parser.add_argument("--keep-source", action="store_true", help="Keep .jsonl sources after compression")
+    parser.add_argument("--nice", type=int, default=10, help="Process niceness for background runs")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.nice and hasattr(os, "nice"):
+        os.nice(args.nice)
+    root = Path(args.input)
+    if not root.exists():
+        print(f"[ERROR] Input path not found: {root}")
+        return
+
+    from src.etl.notice_archive import is_notice_file
+
+    # Only crawler notice files; intermediates such as *.migrated.jsonl are left alone.
+    files = sorted(
+        p
+        for suffix in (".jsonl", ZST_SUFFIX)
+        for p in root.rglob(f"*{suffix}")
+        if p.is_file() and is_notice_file(p, suffix)
+    )
+    total_in = 0
+    total_out = 0
+    done = 0
+    started = time.perf_counter()
+    for path in files:
+        dst: Optional[Path] = zst_path_for(path)
+        if path != dst and dst.exists():
+            print(f"[WARN] Skip {path}: {dst} already exists")
+            continue
+        if path == dst and not _needs_repack(path, args.frame_bytes, args.min_small_frames):
+            continue
+        size_in = path.stat().st_size
+        rows = recompress_file(path, dst, level=args.level, frame_bytes=args.frame_bytes)
+        size_out = dst.stat().st_size
+        if path != dst and not args.keep_source:
+            path.unlink()
+        total_in += size_in
+        total_out += size_out
+        done += 1
+        print(f"[OK] {path} -> {dst} rows={rows} size={size_in:,}B -> {size_out:,}B")
+
+    print(
+        f"[DONE] files={done}, size={total_in:,}B -> {total_out:,}B, "
+        f"elapsed={time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import json
 from mcp.server.fastmcp import FastMCP
 from tools.retriever import campus_search_tool
+from tools.course_lookup import course_lookup_tool
 from tools.web_search_tool import web_search_tool
 from tools.kakao_map import (
     search_places_tool,
@@ -19,6 +20,19 @@ async def search_documents(query: str, department: str = None, limit: int = 5) -
     """캠퍼스 문서 검색 (학칙, 공지사항 등)"""
     return await campus_search_tool(query, department, limit)
 
+@mcp.tool()
+async def lookup_course(
+    course_no: str = None,
+    name: str = None,
+    dept: str = None,
+    grade: str = None,
+    semester: str = None,
+    year: int = None,
+    limit: int = 10,
+) -> str:
+    """강좌 정확 조회 (강좌번호/교과목명/개설학과/학년/학기 → 담당교수, 학점 등)"""
+    return await course_lookup_tool(course_no, name, dept, grade, semester, year, limit)
+
 @mcp.tool()
 async def search_internet(query: str, max_results: int = 5) -> str:
     """일반 웹 검색 (뉴스, 정보 등)"""
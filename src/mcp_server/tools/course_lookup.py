@@ -0,0 +1,74 @@
+import json
+import time
+from typing import Any, Dict, Optional
+
+from src.etl.course_tables import CourseTable, default_store_path
+
+
+class CourseLookup:
+    """
+    강좌/교육과정 정확 조회
+    - Parquet 강좌 테이블 + 인덱스(강좌번호, 교과목명, 개설학과, 학년/학기)
+    - 벡터 검색 없이 "담당교수", "학점" 등 정확 조회 응답
+    """
+
+    def __init__(self):
+        self._table: Optional[CourseTable] = None
+        self._loaded_mtime = 0.0
+
+    def _get_table(self) -> Optional[CourseTable]:
+        path = default_store_path()
+        if not path.exists():
+            return None
+        mtime = path.stat().st_mtime
+        if self._table is None or mtime != self._loaded_mtime:
+            self._table = CourseTable.load(path)
+            self._loaded_mtime = mtime
+        return self._table
+
+    def lookup(
+        self,
+        course_no: str = None,
+        name: str = None,
+        dept: str = None,
+        grade: str = None,
+        semester: str = None,
+        year: int = None,
+        limit: int = 10,
+    ) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        table = self._get_table()
+        if table is None:
+            return {"status": "error", "error": "course table not built", "results": []}
+
+        rows = table.lookup(
+            course_no=course_no,
+            name=name,
+            dept=dept,
+            grade=grade,
+            semester=semester,
+            year=year,
+            limit=limit,
+        )
+        return {
+            "status": "success",
+            "results_count": len(rows),
+            "processing_time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+            "results": rows,
+        }
+
+
+course_lookup = CourseLookup()
+
+
+async def course_lookup_tool(
+    course_no: str = None,
+    name: str = None,
+    dept: str = None,
+    grade: str = None,
+    semester: str = None,
+    year: int = None,
+    limit: int = 10,
+) -> str:
+    result = course_lookup.lookup(course_no, name, dept, grade, semester, year, limit)
+    return json.dumps(result, ensure_ascii=False, default=str)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import re
@@ -5,8 +6,12 @@ import time
 from typing import Any, Dict, List, Optional
 
 import httpx
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 from src.core.config import settings
+from src.core.database import get_async_client
+from src.etl.collection_profiles import PROFILES, get_profile
+from src.etl.layout import hydrate_payload, needs_hydration, parents_collection
+from src.etl.sparse import SparseVectorizer
 
 
 class HybridRetriever:
@@ -19,13 +24,10 @@ class HybridRetriever:
     """
 
     def __init__(self):
-        self.qdrant_client = QdrantClient(
-            url=os.getenv("QDRANT_URL"),
-            api_key=os.getenv("QDRANT_API_KEY"),
-            timeout=30,
-            cloud_inference=True,
-        )
+        self.sparse = SparseVectorizer()
+        self.qdrant_client = get_async_client(timeout=30, cloud_inference=self.sparse.needs_cloud_inference)
         self.collection_name = os.getenv("COLLECTION_NAME", settings.COLLECTION_NAME)
+        self._dense_search_params: Optional[models.SearchParams] = None
 
         self.account_id = os.getenv("CF_ACCOUNT_ID") or os.getenv("CLOUDFLARE_ACCOUNT_ID")
         self.api_token = os.getenv("CF_API_TOKEN") or os.getenv("CLOUDFLARE_API_TOKEN")
@@ -58,9 +60,8 @@ class HybridRetriever:
             pass
         return [0.0] * 1024
 
-    @staticmethod
-    def _build_sparse_query(text: str) -> models.Document:
-        return models.Document(text=text, model="qdrant/bm25")
+    def _build_sparse_query(self, text: str):
+        return self.sparse.query(text)
 
     @staticmethod
     def _decompose_query(query: str) -> List[str]:
@@ -100,7 +101,46 @@ class HybridRetriever:
         reranked.sort(key=lambda x: x.get("rerank_score", 0.0), reverse=True)
         return reranked
 
-    def _pack_neighbors(self, item: Dict[str, Any]) -> Dict[str, Any]:
+    async def _search_params(self) -> models.SearchParams:
+        """hnsw_ef / rescore / oversampling of the profile recorded on the collection."""
+        if self._dense_search_params is None:
+            name = None
+            try:
+                info = await self.qdrant_client.get_collection(self.collection_name)
+                name = (info.config.metadata or {}).get("profile")
+            except Exception:
+                pass
+            try:
+                profile = get_profile(name if name in PROFILES else None)
+            except ValueError:
+                profile = PROFILES["balanced"]
+            self._dense_search_params = profile.search_params()
+        return self._dense_search_params
+
+    async def _hydrate(self, items: List[Dict[str, Any]]) -> None:
+        """Fill slim-layout children with the doc/section fields stored on their parent."""
+        parent_ids = {
+            str(it["payload"]["parent_id"]) for it in items if needs_hydration(it.get("payload", {}))
+        }
+        if not parent_ids:
+            return
+        try:
+            records = await self.qdrant_client.retrieve(
+                collection_name=parents_collection(self.collection_name),
+                ids=list(parent_ids),
+                with_payload=True,
+                with_vectors=False,
+            )
+        except Exception:
+            return
+        parents = {str(r.id): r.payload or {} for r in records}
+        for it in items:
+            payload = it.get("payload", {})
+            parent = parents.get(str(payload.get("parent_id", "")))
+            if parent and needs_hydration(payload):
+                it["payload"] = hydrate_payload(payload, parent)
+
+    async def _pack_neighbors(self, item: Dict[str, Any]) -> Dict[str, Any]:
         payload = item.get("payload", {})
         doc_url = payload.get("url")
         idx = payload.get("chunk_index")
@@ -120,7 +160,7 @@ class HybridRetriever:
             ),
         ]
         filt = models.Filter(must=must)
-        neighbors, _ = self.qdrant_client.scroll(
+        neighbors, _ = await self.qdrant_client.scroll(
             collection_name=self.collection_name,
             scroll_filter=filt,
             with_payload=True,
@@ -148,7 +188,13 @@ class HybridRetriever:
             )
 
         prefetch = [
-            models.Prefetch(query=dense_vec, using="dense", limit=max(50, limit * 6), filter=search_filter)
+            models.Prefetch(
+                query=dense_vec,
+                using="dense",
+                limit=max(50, limit * 6),
+                filter=search_filter,
+                params=await self._search_params(),
+            )
         ]
         prefetch.append(
             models.Prefetch(
@@ -159,7 +205,7 @@ class HybridRetriever:
             )
         )
 
-        results = self.qdrant_client.query_points(
+        results = await self.qdrant_client.query_points(
             collection_name=self.collection_name,
             prefetch=prefetch,
             query=models.FusionQuery(fusion=models.Fusion.RRF),
@@ -202,9 +248,10 @@ class HybridRetriever:
                     # keep best original hybrid score
                     merged[key]["score"] = max(float(merged[key]["score"]), float(item["score"]))
 
+        await self._hydrate(list(merged.values()))
         reranked = self._rerank(query, list(merged.values()))
         selected = reranked[: max(limit * 2, 6)]
-        packed = [self._pack_neighbors(it) for it in selected]
+        packed = await asyncio.gather(*(self._pack_neighbors(it) for it in selected))
         final = packed[:limit]
 
         parsed_results = []
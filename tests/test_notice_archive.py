@@ -0,0 +1,84 @@
+from src.etl import codec, notice_archive
+from src.etl.utils import iter_jsonl, iter_notice_keys, iter_notice_rows
+
+
+def _envelope(doc_id="d1", content="body"):
+    return {
+        "doc_id": doc_id,
+        "title": "장학금 신청 안내",
+        "date": "2025.03.01",
+        "published_at": "2025-03-01",
+        "url": "https://example.ac.kr/notice/1?x=1#top",
+        "canonical_url": "https://example.ac.kr/notice/1?x=1",
+        "content": content,
+        "attachments": [{"name": "form.hwp", "url": "https://example.ac.kr/f/1"}],
+        "images": [],
+        "raw": {
+            "title_raw": "장학금 신청 안내",
+            "date_raw": "2025.03.01",
+            "url_raw": "https://example.ac.kr/notice/1?x=1#top",
+            "content_raw": content + "\n\n(원문)",
+        },
+        "normalized": {
+            "title": "장학금 신청 안내",
+            "published_at": "2025-03-01",
+            "canonical_url": "https://example.ac.kr/notice/1?x=1",
+            "content": content + " (정규화)",
+        },
+        "assets": {"images": [], "attachments": [{"name": "form.hwp", "url": "https://example.ac.kr/f/1"}]},
+    }
+
+
+def test_compact_row_stores_views_and_expands_back():
+    env = _envelope()
+    compact = notice_archive.compact_row(env)
+    assert "raw" not in compact and "normalized" not in compact and "assets" not in compact
+    assert compact["_views"]["normalized"]["refs"]["title"] == "title"
+    assert compact["_views"]["normalized"]["values"] == {"content": "body (정규화)"}
+
+    view = notice_archive.NoticeView(compact)
+    assert dict(view) == env
+    assert notice_archive.expand_row(compact) == env
+    assert notice_archive.compact_row(view.to_compact()) == compact
+
+
+def test_notice_view_keeps_views_across_writes():
+    view = notice_archive.NoticeView(notice_archive.compact_row(_envelope()))
+    view["title"] = "changed"
+    assert view["normalized"]["title"] == "장학금 신청 안내"
+    assert view["raw"]["title_raw"] == "장학금 신청 안내"
+
+
+def test_decode_notice_matches_full_envelope():
+    env = _envelope()
+    compact_line = codec.dumps(notice_archive.compact_row(env))
+    full_line = codec.dumps(env)
+    assert codec.decode_notice(compact_line) == codec.decode_notice(full_line)
+    assert codec.decode_notice(compact_line)["normalized"]["content"] == "body (정규화)"
+    assert codec.decode_notice_key(compact_line) == codec.decode_notice_key(full_line)
+
+
+def test_archive_round_trip_and_repack(tmp_path):
+    path = tmp_path / "dept.jsonl.gz"
+    rows = [_envelope(f"d{i}", f"body {i}") for i in range(3)]
+    assert notice_archive.write_compact_atomic(path, rows[:1]) == 1
+    for row in rows[1:]:
+        notice_archive.append_compact_row(path, row)
+    assert notice_archive.count_gzip_members(path) == 3
+
+    assert [dict(r) for r in iter_jsonl(path)] == rows
+    decoded = list(iter_notice_rows(path))
+    assert decoded == [codec.decode_notice(codec.dumps(row)) for row in rows]
+    assert [key["doc_id"] for _, key in iter_notice_keys(path)] == ["d0", "d1", "d2"]
+
+    notice_archive.repack([path], min_members=2)
+    assert notice_archive.count_gzip_members(path) == 1
+    assert [dict(r) for r in iter_jsonl(path)] == rows
+
+
+def test_is_notice_file(tmp_path):
+    assert notice_archive.is_notice_file(tmp_path / "cse.jsonl")
+    assert notice_archive.is_notice_file(tmp_path / "cse.jsonl.gz", notice_archive.COMPACT_SUFFIX)
+    assert not notice_archive.is_notice_file(tmp_path / "cse.migrated.jsonl")
+    assert not notice_archive.is_notice_file(tmp_path / "cse-checkpoint.jsonl")
+    assert not notice_archive.is_notice_file(tmp_path / ".ipynb_checkpoints" / "cse.jsonl")
@@ -0,0 +1,55 @@
+import pytest
+
+from src.etl.sparse import Bm25SparseEncoder
+
+# Token ids are abs(mmh3.hash(stem)) and values the qdrant/bm25 TF part
+#   tf * (k + 1) / (tf + k * (1 - b + b * doc_len / avg_len))
+# with k=1.2, b=0.75, avg_len=256, as computed by fastembed's Bm25.
+ENGLISH = "The quick brown foxes jumped over the lazy dogs"
+ENGLISH_TOKENS = ["quick", "brown", "fox", "jump", "lazi", "dog"]
+ENGLISH_DOC = {
+    771291085: 1.6652868125369606,
+    741580288: 1.6652868125369606,
+    1621867415: 1.6652868125369606,
+    1913189942: 1.6652868125369606,
+    226376294: 1.6652868125369606,
+    1312749093: 1.6652868125369606,
+}
+
+MIXED = "장학금 신청 기간: 3월 15일까지! Apply online, apply early."
+MIXED_TOKENS = ["장학금", "신청", "기간", "3월", "15일까지", "appli", "onlin", "appli", "earli"]
+MIXED_DOC = {
+    1530414734: 1.6520973892637139,
+    421028397: 1.6520973892637139,
+    1650050872: 1.6520973892637139,
+    1293285513: 1.6520973892637139,
+    976378345: 1.6520973892637139,
+    804460016: 1.8870832635282293,
+    424595651: 1.6520973892637139,
+    1724426273: 1.6520973892637139,
+}
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    return Bm25SparseEncoder()
+
+
+@pytest.mark.parametrize(
+    "text, tokens, expected",
+    [(ENGLISH, ENGLISH_TOKENS, ENGLISH_DOC), (MIXED, MIXED_TOKENS, MIXED_DOC)],
+)
+def test_document_vectors(encoder, text, tokens, expected):
+    assert encoder.tokens(text) == tokens
+    vector = encoder.document(text)
+    assert dict(zip(vector.indices, vector.values)) == pytest.approx(expected)
+
+
+def test_query_vectors_are_unit_weighted(encoder):
+    vector = encoder.query(MIXED)
+    assert vector.indices == sorted(MIXED_DOC)
+    assert vector.values == [1.0] * len(MIXED_DOC)
+
+
+def test_long_tokens_and_stopwords_are_dropped(encoder):
+    assert encoder.tokens("the " + "a" * 41 + " and of scholarship") == ["scholarship"]
@@ -0,0 +1,89 @@
+import zstandard
+
+from src.etl import zstd_jsonl
+
+
+def _lines(n, prefix="i"):
+    return [f'{{"{prefix}":{i}}}\n' for i in range(n)]
+
+
+def _read_all(path, offset=0):
+    with zstd_jsonl.open_reader(path, offset) as f:
+        return f.read().decode("utf-8")
+
+
+def test_seek_table_round_trip(tmp_path):
+    path = tmp_path / "a.jsonl.zst"
+    lines = _lines(200)
+    assert zstd_jsonl.write_lines_atomic(path, lines) == 200
+
+    frames = zstd_jsonl.read_seek_table(path)
+    assert frames
+    c_off = d_off = 0
+    for frame in frames:
+        assert frame[:2] == (c_off, d_off)
+        c_off += frame[2]
+        d_off += frame[3]
+    assert d_off == len("".join(lines).encode("utf-8"))
+    # Plain zstd decoders skip the seek table frame.
+    with path.open("rb") as f:
+        plain = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+    assert plain.decode("utf-8") == "".join(lines)
+
+
+def test_small_frames_and_offset_reads(tmp_path):
+    path = tmp_path / "a.jsonl.zst"
+    lines = _lines(300)
+    with zstd_jsonl.SeekableZstdWriter(path, frame_bytes=256) as writer:
+        for line in lines:
+            writer.write_line(line)
+    assert len(zstd_jsonl.read_seek_table(path)) > 5
+
+    text = "".join(lines)
+    for index in (0, 1, 57, 150, 299):
+        offset = len("".join(lines[:index]).encode("utf-8"))
+        assert _read_all(path, offset) == text[offset:]
+
+
+def test_append_adds_a_frame(tmp_path):
+    path = tmp_path / "a.jsonl.zst"
+    zstd_jsonl.append_lines(path, _lines(3))
+    zstd_jsonl.write_lines_atomic(path, _lines(10))
+    before = zstd_jsonl.read_seek_table(path)
+    zstd_jsonl.append_lines(path, _lines(2, prefix="j"))
+
+    frames = zstd_jsonl.read_seek_table(path)
+    assert frames[:-1] == before
+    assert frames[-1][3] == len("".join(_lines(2, prefix="j")))
+    assert _read_all(path) == "".join(_lines(10) + _lines(2, prefix="j"))
+
+
+def test_append_recovers_an_interrupted_append(tmp_path):
+    path = tmp_path / "a.jsonl.zst"
+    zstd_jsonl.write_lines_atomic(path, _lines(10))
+    frames = zstd_jsonl.read_seek_table(path)
+    end = frames[-1][0] + frames[-1][2]
+    partial = zstandard.ZstdCompressor().compress(b'{"lost":1}\n')[:6]
+    with path.open("r+b") as f:
+        f.truncate(end)
+        f.seek(end)
+        f.write(partial)
+    assert zstd_jsonl.read_seek_table(path) == []
+
+    zstd_jsonl.append_lines(path, _lines(1, prefix="j"))
+    assert len(zstd_jsonl.read_seek_table(path)) == len(frames) + 1
+    assert _read_all(path) == "".join(_lines(10) + _lines(1, prefix="j"))
+
+
+def test_recompress_repacks_small_frames(tmp_path):
+    path = tmp_path / "a.jsonl.zst"
+    zstd_jsonl.write_lines_atomic(path, _lines(10))
+    for i in range(4):
+        zstd_jsonl.append_lines(path, [f'{{"j":{i}}}\n'])
+    assert zstd_jsonl._needs_repack(path, zstd_jsonl.DEFAULT_FRAME_BYTES, 4)
+    assert not zstd_jsonl._needs_repack(path, zstd_jsonl.DEFAULT_FRAME_BYTES, 5)
+
+    expected = _read_all(path)
+    assert zstd_jsonl.recompress_file(path, path) == 14
+    assert len(zstd_jsonl.read_seek_table(path)) == 1
+    assert _read_all(path) == expected